@@ -0,0 +1,53 @@
+import time
+from typing import Dict, Optional, Set
+
+
+class BalanceSnapshot:
+    """绑定账号余额的本地快照
+
+    由后台任务分页遍历API的玩家列表写入，/查询账号 在快照足够新时直接读取，不再请求API。
+    文件格式：{"accounts": {passport: 账号信息 + synced_at}, "sync": 同步进度}；
+    同步进度中的 next_page 为已连续完成的页之后的第一页，重启后从这里继续。
+    账号信息只整体替换、不原地修改，因此 to_dict() 的浅拷贝可以安全地交给写盘线程。
+    """
+
+    def __init__(self, data: Optional[dict] = None):
+        data = data or {}
+        self.accounts: Dict[str, dict] = data.get("accounts") or {}
+        self.sync: dict = data.get("sync") or {}
+
+    def get(self, passport: str, max_age: float) -> Optional[dict]:
+        """同步时间在 max_age 秒以内的账号信息（没有或已过期时为 None）"""
+        info = self.accounts.get(passport)
+        if info is None or time.time() - info.get("synced_at", 0) > max_age:
+            return None
+        return dict(info)
+
+    def update(self, passport: str, info: dict, synced_at: Optional[float] = None):
+        self.accounts[passport] = {
+            "passport": passport,
+            "gold_pay": info.get("gold_pay", 0),
+            "gold_pay_total": info.get("gold_pay_total", 0),
+            "cid": info.get("cid"),
+            "name": info.get("name"),
+            "synced_at": synced_at if synced_at is not None else time.time()
+        }
+
+    def update_balance(self, passport: str, gold_pay: int, gold_pay_total: int):
+        """充值成功后写入新余额（只更新快照中已有的账号）"""
+        info = self.accounts.get(passport)
+        if info is not None:
+            self.update(passport, {**info, "gold_pay": gold_pay, "gold_pay_total": gold_pay_total})
+
+    def prune(self, bound: Set[str], run_started: float) -> int:
+        """一轮同步完成后移除已解绑、或本轮没有出现在玩家列表中的账号，返回移除数量"""
+        stale = [
+            passport for passport, info in self.accounts.items()
+            if passport not in bound or info.get("synced_at", 0) < run_started
+        ]
+        for passport in stale:
+            del self.accounts[passport]
+        return len(stale)
+
+    def to_dict(self) -> dict:
+        return {"accounts": dict(self.accounts), "sync": dict(self.sync)}
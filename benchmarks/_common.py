@@ -0,0 +1,98 @@
+"""基准测试公共工具
+
+基准脚本需要在装有 AstrBot 的环境中运行，例如在插件目录下执行：
+    python -m benchmarks.bench_bind_index
+"""
+import importlib
+import os
+import sys
+import time
+
+PLUGIN_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def load_plugin_module():
+    """以包的形式导入插件 main 模块（插件内部使用相对导入）"""
+    parent = os.path.dirname(PLUGIN_DIR)
+    if parent not in sys.path:
+        sys.path.insert(0, parent)
+    return importlib.import_module(os.path.basename(PLUGIN_DIR) + ".main")
+
+
+def bare_plugin(module):
+    """构造不执行 __init__（不读写数据文件）的插件实例"""
+    plugin = module.GameBindPlugin.__new__(module.GameBindPlugin)
+    plugin.db = None
+    return plugin
+
+
+def make_bindings(n: int) -> dict:
+    """生成 n 条合成绑定数据"""
+    return {
+        str(10000 + i): {
+            "game_account": f"acc{i}",
+            "account_name": f"acc{i}",
+            "bind_time": "2026-01-01 00:00:00",
+            "qq_id": str(10000 + i)
+        }
+        for i in range(n)
+    }
+
+
+def time_per_call(func, args_list) -> float:
+    """返回平均单次调用耗时（微秒）"""
+    start = time.perf_counter()
+    for args in args_list:
+        func(*args)
+    return (time.perf_counter() - start) / len(args_list) * 1e6
+
+
+class FakeEvent:
+    """最小化的 AstrMessageEvent 替身"""
+
+    def __init__(self, qq_id: str, message: str):
+        self.qq_id = qq_id
+        self.message_str = message
+
+    def get_sender_id(self):
+        return self.qq_id
+
+    def get_sender_name(self):
+        return ""
+
+    def plain_result(self, text: str):
+        return text
+
+
+def make_plugin(module, data_dir: str):
+    """在指定数据目录下构造插件实例（不触碰插件自身的 data 目录）"""
+    plugin_file = module.__file__
+    # __init__ 通过 os.path.dirname(__file__) 定位数据目录
+    module.__file__ = os.path.join(data_dir, "main.py")
+    try:
+        plugin = module.GameBindPlugin(object())
+    finally:
+        module.__file__ = plugin_file
+    # 基准测试不访问真实API：关闭后台余额同步
+    plugin.api_config["balance_sync"]["interval"] = 0
+    return plugin
+
+
+async def run_command(handler, qq_id: str, message: str) -> list:
+    """执行一个命令处理器并收集全部回复"""
+    return [reply async for reply in handler(FakeEvent(qq_id, message))]
+
+
+def make_user_points(n: int) -> dict:
+    """生成 n 个用户的合成积分数据"""
+    return {
+        str(10000 + i): {
+            "points": i % 500,
+            "total_earned": i % 900,
+            "total_spent": i % 400,
+            "first_sign_date": "2026-01-01",
+            "last_sign_date": "2026-01-02",
+            "continuous_days": i % 30
+        }
+        for i in range(n)
+    }
@@ -0,0 +1,41 @@
+"""绑定冲突检查基准：反向索引 vs 遍历全部绑定
+
+    python -m benchmarks.bench_bind_index
+"""
+import random
+
+from ._common import bare_plugin, load_plugin_module, make_bindings, time_per_call
+
+SIZES = [1_000, 10_000, 100_000, 1_000_000]
+LOOKUPS = 2_000
+
+
+def linear_scan(bindings: dict, game_account: str):
+    """索引引入前的实现：逐条遍历"""
+    for qq_id, bind_info in bindings.items():
+        if bind_info.get("game_account") == game_account:
+            return True, qq_id, bind_info
+    return False, None, None
+
+
+def main():
+    module = load_plugin_module()
+    print(f"{'绑定数':>10} {'索引(us)':>10} {'遍历(us)':>12}")
+    for n in SIZES:
+        plugin = bare_plugin(module)
+        plugin.bindings = make_bindings(n)
+        plugin._rebuild_account_index()
+
+        # 一半命中、一半未命中
+        accounts = [f"acc{random.randrange(n)}" for _ in range(LOOKUPS // 2)]
+        accounts += [f"missing{i}" for i in range(LOOKUPS // 2)]
+        args = [(acc,) for acc in accounts]
+
+        indexed = time_per_call(plugin._is_account_already_bound, args)
+        scan_args = [(plugin.bindings, acc) for acc in accounts[:max(1, 200_000 // n)]]
+        scanned = time_per_call(linear_scan, scan_args)
+        print(f"{n:>10,} {indexed:>10.2f} {scanned:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
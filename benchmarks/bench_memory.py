@@ -0,0 +1,63 @@
+"""用户积分内存占用基准：dict 记录 vs UserPoints 紧凑记录
+
+    python -m benchmarks.bench_memory [用户数 ...]    # 默认 100000 1000000
+"""
+import gc
+import json
+import sys
+import time
+import tracemalloc
+
+from ._common import load_plugin_module
+
+
+def make_points_json(n: int) -> bytes:
+    """生成 n 个用户的积分文件内容（日期各不相同，与真实数据一样由解析产生独立的字符串）"""
+    return json.dumps({
+        str(10000 + i): {
+            "points": i % 5000,
+            "total_earned": i % 9000,
+            "total_spent": i % 4000,
+            "first_sign_date": f"2025-{i % 12 + 1:02d}-{i % 28 + 1:02d}",
+            "last_sign_date": f"2026-{i % 12 + 1:02d}-{i % 28 + 1:02d}",
+            "continuous_days": i % 30
+        }
+        for i in range(n)
+    }).encode("utf-8")
+
+
+def measure(build) -> tuple:
+    """返回 (常驻内存 MB, 构造耗时秒)"""
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    data = build()
+    elapsed = time.perf_counter() - start
+    gc.collect()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del data
+    return current / 1e6, elapsed
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [100_000, 1_000_000]
+    user_points_cls = sys.modules[load_plugin_module().__package__ + ".records"].UserPoints
+
+    for n in sizes:
+        raw = make_points_json(n)
+        dict_mb, dict_time = measure(lambda: json.loads(raw))
+
+        def build_compact():
+            return {qq_id: user_points_cls.from_dict(record) for qq_id, record in json.loads(raw).items()}
+
+        compact_mb, compact_time = measure(build_compact)
+        print(
+            f"{n:>9,} 用户  dict: {dict_mb:8.1f} MB（解析 {dict_time:.2f}s）  "
+            f"UserPoints: {compact_mb:8.1f} MB（解析+转换 {compact_time:.2f}s）  "
+            f"节省 {(1 - compact_mb / dict_mb) * 100:.0f}%"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""签到吞吐基准：每次修改立即写盘 vs 延迟写入
+
+    python -m benchmarks.bench_sign_in [已有用户数] [签到次数]
+"""
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+
+from ._common import load_plugin_module, make_plugin, make_user_points, run_command
+
+
+async def measure(module, existing_users: int, sign_ins: int, flush_interval: float) -> tuple:
+    with tempfile.TemporaryDirectory() as tmp:
+        os.makedirs(os.path.join(tmp, "data"))
+        with open(os.path.join(tmp, "data", "user_points.json"), "w", encoding="utf-8") as f:
+            json.dump(make_user_points(existing_users), f)
+
+        plugin = make_plugin(module, tmp)
+        plugin.system_config["storage"]["flush_interval"] = flush_interval
+        await plugin.initialize()
+
+        start = time.perf_counter()
+        for i in range(sign_ins):
+            await run_command(plugin.sign_cmd, str(90_000_000 + i), "/签到")
+        elapsed = time.perf_counter() - start
+
+        # 关闭时的最终写盘也计入总耗时
+        await plugin.terminate()
+        total = time.perf_counter() - start
+        return sign_ins / elapsed, total
+
+
+def main():
+    existing_users = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    sign_ins = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    module = load_plugin_module()
+
+    print(f"已有用户 {existing_users:,}，签到 {sign_ins} 次")
+    for label, interval in (("立即写入", 0), ("延迟写入", 2.0)):
+        rate, total = asyncio.run(measure(module, existing_users, sign_ins, interval))
+        print(f"{label}: {rate:,.0f} 次/秒（含关闭写盘共 {total:.2f} 秒）")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""启动耗时基准：合成数据文件下的构造耗时、各数据组分阶段加载耗时、后台加载时首个命令的响应时间
+
+    python -m benchmarks.bench_startup [用户数] [当月流水数] [历史月份数]
+"""
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+from datetime import date
+
+from ._common import load_plugin_module, make_bindings, make_plugin, make_user_points, run_command
+
+
+def write_data_files(data_dir: str, users: int, logs: int, history_months: int):
+    """生成合成数据：绑定/积分/签到各 users 条，当月及之前每月各 logs 条流水"""
+    os.makedirs(data_dir)
+    sign_records = {
+        str(10000 + i): {"last_sign": "2026-01-02", "reward": 1, "continuous_days": i % 30}
+        for i in range(users)
+    }
+    for name, data in (
+        ("bindings.json", make_bindings(users)),
+        ("user_points.json", make_user_points(users)),
+        ("sign_records.json", sign_records),
+        ("admins.json", {"admin_qq_ids": ["10000"], "initialized": True}),
+    ):
+        with open(os.path.join(data_dir, name), "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+
+    # 写成旧版单文件账本，由插件首次启动时按月拆分
+    today = date.today()
+    with open(os.path.join(data_dir, "recharge_ledger.jsonl"), "w", encoding="utf-8") as f:
+        for back in range(history_months, -1, -1):
+            year, month = divmod(today.year * 12 + today.month - 1 - back, 12)
+            month += 1
+            for i in range(logs):
+                qq_id = str(10000 + i % max(users, 1))
+                log_time = f"{year}-{month:02d}-{i % 28 + 1:02d} 12:00:00"
+                log_id = f"P{year}{month:02d}{i % 28 + 1:02d}120000{i % 10000:04d}_{qq_id}"
+                entry = {
+                    "type": "normal", "qq_id": qq_id, "game_account": f"acc{i}", "account_name": f"acc{i}",
+                    "points_used": 1, "amount": 10000, "recharge_time": log_time,
+                    "api_response": {"success": True, "message": "ok", "data": {"balance": i}}
+                }
+                f.write(json.dumps({"id": log_id, "entry": entry}, ensure_ascii=False) + "\n")
+
+
+def format_timings(timings: dict) -> str:
+    return f"读取 {timings['read'] * 1000:8.1f}ms  解析 {timings['parse'] * 1000:8.1f}ms  建索引 {timings['index'] * 1000:8.1f}ms"
+
+
+async def measure_background(module, root: str):
+    plugin = make_plugin(module, root)
+    await plugin.initialize()
+    start = time.perf_counter()
+    await run_command(plugin.help_cmd, "10000", "/帮助")
+    first_reply = time.perf_counter() - start
+    await plugin._load_task
+    all_loaded = time.perf_counter() - start
+    await plugin.terminate()
+    return first_reply, all_loaded
+
+
+def main():
+    users = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    logs = int(sys.argv[2]) if len(sys.argv) > 2 else 20_000
+    history_months = int(sys.argv[3]) if len(sys.argv) > 3 else 12
+    module = load_plugin_module()
+
+    with tempfile.TemporaryDirectory() as root:
+        data_dir = os.path.join(root, "data")
+        write_data_files(data_dir, users, logs, history_months)
+        sizes = sum(os.path.getsize(os.path.join(data_dir, name)) for name in os.listdir(data_dir))
+        print(f"用户 {users:,}，每月流水 {logs:,}，历史月份 {history_months}，数据文件共 {sizes / 1e6:.1f} MB")
+
+        # 首次启动完成账本拆分，不计入后续测量
+        warmup = make_plugin(module, root)
+        warmup.recharge_logs
+        asyncio.run(warmup.terminate())
+
+        start = time.perf_counter()
+        plugin = make_plugin(module, root)
+        construct = time.perf_counter() - start
+        print(f"\n构造插件：{construct * 1000:.1f}ms")
+
+        print("\n首次访问时同步加载：")
+        for group, attr in (("admins", "admins"), ("bindings", "bindings"), ("user_points", "user_points"),
+                            ("sign_records", "sign_records"), ("recharge_logs", "recharge_logs")):
+            start = time.perf_counter()
+            getattr(plugin, attr)
+            elapsed = time.perf_counter() - start
+            print(f"  {group:<14}{elapsed * 1000:8.1f}ms  （{format_timings(plugin._store_timings[group])}）")
+        asyncio.run(plugin.terminate())
+
+        first_reply, all_loaded = asyncio.run(measure_background(module, root))
+        print(f"\n后台加载：首个命令（/帮助）响应 {first_reply * 1000:.1f}ms，全部数据加载完成 {all_loaded * 1000:.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+"""存储与积分热点路径微基准：合成数据规模下的 ops/s、p50/p99 延迟与峰值内存，输出 JSON
+
+    python -m benchmarks.bench_suite [--sizes 1000 100000 1000000] [--ops 2000] [--budget 3]
+                                     [--cases get_user_points,sign_cmd] [--output result.json]
+
+每个规模在独立子进程中运行，峰值内存为该子进程的最大常驻内存（ru_maxrss），
+即数据加载后执行到当前用例为止的峰值。JSON 写到标准输出（或 --output 文件），进度信息写到标准错误。
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+from ._common import load_plugin_module, make_plugin, run_command
+from .bench_startup import write_data_files
+
+# 慢用例（整文件写入）至少执行的次数，不受时间预算限制
+MIN_OPS = 3
+
+
+def peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux 单位为 KB，macOS 为字节
+    return peak / 1e6 if sys.platform == "darwin" else peak / 1e3
+
+
+def summarize(latencies: list) -> dict:
+    ordered = sorted(latencies)
+    return {
+        "ops": len(ordered),
+        "ops_per_sec": round(len(ordered) / sum(ordered), 1) if sum(ordered) else None,
+        "p50_us": round(ordered[len(ordered) // 2] * 1e6, 2),
+        "p99_us": round(ordered[min(int(len(ordered) * 0.99), len(ordered) - 1)] * 1e6, 2),
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+    }
+
+
+async def run_case(func, make_args, max_ops: int, budget: float) -> dict:
+    """逐次调用 func(*make_args(i)) 并记录单次耗时（超出时间预算且已满 MIN_OPS 次后提前结束）"""
+    latencies = []
+    deadline = time.perf_counter() + budget
+    for i in range(max_ops):
+        args = make_args(i)
+        start = time.perf_counter()
+        result = func(*args)
+        if asyncio.iscoroutine(result):
+            await result
+        latencies.append(time.perf_counter() - start)
+        if len(latencies) >= MIN_OPS and time.perf_counter() > deadline:
+            break
+    return summarize(latencies)
+
+
+def build_cases(module, plugin, users: int, scratch_dir: str) -> dict:
+    """用例名 -> (被测函数, 第 i 次调用的参数)"""
+    snapshot_store = sys.modules[module.__package__ + ".persistence"].snapshot_store
+    qq_ids = [str(10000 + i) for i in range(users)]
+    rng = random.Random(42)
+    scratch_file = os.path.join(scratch_dir, "user_points.bench.json")
+    # 签到：每次使用不同的用户（合成数据的上次签到日期在很久以前，都可以签到）
+    sign_order = rng.sample(qq_ids, len(qq_ids))
+    # 积分转移：从有积分的用户转出 1 积分
+    donors = [qq_id for i, qq_id in enumerate(qq_ids) if i % 500 > 0]
+
+    def save_args(i):
+        return scratch_file, snapshot_store(plugin.user_points)
+
+    return {
+        "snapshot_user_points": (snapshot_store, lambda i: (plugin.user_points,)),
+        "save_json_user_points": (plugin._save_json, save_args),
+        "get_user_points": (plugin._get_user_points, lambda i: (rng.choice(qq_ids),)),
+        "is_account_already_bound": (
+            plugin._is_account_already_bound,
+            lambda i: (f"acc{rng.randrange(users)}" if i % 2 else f"missing{i}",)
+        ),
+        "transfer_points": (
+            plugin._transfer_points,
+            lambda i: (donors[i % len(donors)], rng.choice(qq_ids), 1, "bench")
+        ),
+        "sign_cmd": (run_command, lambda i: (plugin.sign_cmd, sign_order[i % len(sign_order)], "/签到")),
+        "my_points_cmd": (run_command, lambda i: (plugin.my_points_cmd, rng.choice(qq_ids), "/我的积分")),
+    }
+
+
+async def bench_size(users: int, max_ops: int, budget: float, only: list) -> dict:
+    module = load_plugin_module()
+    with tempfile.TemporaryDirectory() as root:
+        data_dir = os.path.join(root, "data")
+        write_data_files(data_dir, users, users, 0)
+
+        start = time.perf_counter()
+        plugin = make_plugin(module, root)
+        for attr in ("admins", "bindings", "user_points", "sign_records", "recharge_logs", "daily_stats"):
+            getattr(plugin, attr)
+        load_seconds = time.perf_counter() - start
+        # 启动写盘线程和延迟写入，与线上运行方式一致
+        await plugin.initialize()
+        await plugin._load_task
+
+        result = {"users": users, "load_seconds": round(load_seconds, 3),
+                  "loaded_rss_mb": round(peak_rss_mb(), 1), "cases": {}}
+        for name, (func, make_args) in build_cases(module, plugin, users, root).items():
+            if only and name not in only:
+                continue
+            print(f"  {users:>9,} 用户  {name} ...", file=sys.stderr)
+            result["cases"][name] = await run_case(func, make_args, max_ops, budget)
+        await plugin.terminate()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 100_000, 1_000_000])
+    parser.add_argument("--ops", type=int, default=2_000, help="每个用例最多执行次数")
+    parser.add_argument("--budget", type=float, default=3.0, help="每个用例的时间预算（秒）")
+    parser.add_argument("--cases", default="", help="只运行指定用例（逗号分隔）")
+    parser.add_argument("--output", help="结果写入文件（默认输出到标准输出）")
+    parser.add_argument("--single", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    only = [name for name in args.cases.split(",") if name]
+
+    if args.single:
+        # 子进程：只运行一个规模，结果输出到标准输出
+        print(json.dumps(asyncio.run(bench_size(args.sizes[0], args.ops, args.budget, only))))
+        return
+
+    results = []
+    for users in args.sizes:
+        command = [sys.executable, "-m", __spec__.name, "--single", "--sizes", str(users),
+                   "--ops", str(args.ops), "--budget", str(args.budget), "--cases", args.cases]
+        output = subprocess.run(command, check=True, stdout=subprocess.PIPE, text=True).stdout
+        results.append(json.loads(output.strip().splitlines()[-1]))
+
+    report = json.dumps({
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results,
+    }, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(report + "\n")
+    else:
+        print(report)
+
+
+if __name__ == "__main__":
+    main()
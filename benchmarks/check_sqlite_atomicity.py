@@ -0,0 +1,145 @@
+"""SQLite 后端事务原子性检查
+
+依次执行 /签到、/赠送积分、/积分充值、/给别人充值、/添加积分、/批量添加积分，
+每条命令都在写入每日统计之后、写入流水之前模拟写库失败，然后用另一个数据库连接核对：
+积分、签到记录、流水和每日统计都没有留下任何已提交的改动，插件内存中的视图与数据库一致，
+恢复后同一条命令可以正常完成并整体提交。
+
+    python -m benchmarks.check_sqlite_atomicity
+"""
+import asyncio
+import os
+import sqlite3
+import sys
+import tempfile
+
+from ._common import load_plugin_module, make_plugin, run_command
+
+USERS = ("20001", "20002", "20003")
+INITIAL_POINTS = 100
+
+# (命令处理器, 发送者, 消息)
+COMMANDS = [
+    ("sign_cmd", "20001", "/签到"),
+    ("gift_points_cmd", "20001", "/赠送积分 20002 5"),
+    ("points_recharge_cmd", "20001", "/积分充值 3"),
+    ("recharge_for_others_cmd", "20001", "/给别人充值 20002 2"),
+    ("add_points_cmd", "10000", "/添加积分 20003 7 补偿"),
+    ("bulk_add_points_cmd", "10000", "/批量添加积分 活动\n20001 1\n20002 2\n20003 3"),
+]
+
+
+class SimulatedDiskError(sqlite3.OperationalError):
+    pass
+
+
+async def fake_recharge(passport: str, amount: float, remark: str) -> dict:
+    return {"success": True, "data": {"new_gold_pay": 0, "new_gold_pay_total": 0}}
+
+
+def committed_state(db_file: str) -> dict:
+    """用独立连接读取已提交的数据"""
+    conn = sqlite3.connect(db_file)
+    try:
+        return {
+            "points": dict(conn.execute("SELECT qq_id, points FROM user_points")),
+            "signs": conn.execute("SELECT COUNT(*) FROM sign_records").fetchone()[0],
+            "logs": conn.execute("SELECT COUNT(*) FROM recharge_logs").fetchone()[0],
+            "stats": conn.execute(
+                "SELECT COALESCE(SUM(sign_count + recharge_count + transfer_count + admin_count), 0) FROM daily_stats"
+            ).fetchone()[0],
+        }
+    finally:
+        conn.close()
+
+
+def plugin_state(plugin) -> dict:
+    """插件当前看到的数据（与 committed_state 同样的字段）"""
+    return {
+        "points": {qq_id: record["points"] for qq_id, record in plugin.user_points.items()},
+        "signs": len(plugin.sign_records),
+        "logs": len(plugin.recharge_logs),
+        "stats": sum(
+            day["sign_count"] + day["recharge_count"] + day["transfer_count"] + day["admin_count"]
+            for day in plugin.daily_stats.values()
+        ),
+    }
+
+
+def make_sqlite_plugin(module, data_dir: str):
+    plugin = make_plugin(module, data_dir)
+    plugin.system_config["storage"]["backend"] = "sqlite"
+    plugin._load_sqlite_stores()
+    plugin._initialize_admins()
+    plugin.user_rank.reset()
+    return plugin
+
+
+async def check(module) -> bool:
+    problems = []
+    with tempfile.TemporaryDirectory() as tmp:
+        os.makedirs(os.path.join(tmp, "data"))
+        plugin = make_sqlite_plugin(module, tmp)
+        await plugin.initialize()
+        plugin._execute_account_recharge = fake_recharge
+        plugin._add_admin("10000")
+        for qq_id in USERS:
+            points = plugin._get_user_points(qq_id)
+            points["points"] = INITIAL_POINTS
+            points["total_earned"] = INITIAL_POINTS
+            plugin._update_user_points(qq_id, points)
+            plugin.bindings[qq_id] = {"game_account": f"acc{qq_id}", "account_name": f"acc{qq_id}",
+                                      "bind_time": "2026-01-01 00:00:00", "qq_id": qq_id}
+        plugin._persist("bindings")
+
+        record_stats = plugin._record_stats
+
+        def failing_record_stats(day, increments):
+            record_stats(day, increments)
+            raise SimulatedDiskError("disk I/O error（模拟）")
+
+        for handler_name, qq_id, message in COMMANDS:
+            handler = getattr(plugin, handler_name)
+            before = committed_state(plugin.db_file)
+
+            plugin._record_stats = failing_record_stats
+            try:
+                replies = await run_command(handler, qq_id, message)
+            except SimulatedDiskError:
+                replies = ["（异常抛出）"]
+            finally:
+                plugin._record_stats = record_stats
+
+            after = committed_state(plugin.db_file)
+            first_line = replies[-1].split("\n")[0] if replies else "（无回复）"
+            print(f"{message.splitlines()[0]:<24} 失败时：{first_line}")
+            if after != before:
+                problems.append(f"{message.splitlines()[0]}：失败后仍有已提交的改动 {before} -> {after}")
+            if plugin_state(plugin) != after:
+                problems.append(f"{message.splitlines()[0]}：回滚后插件数据与数据库不一致")
+            if plugin.db.conn.in_transaction:
+                problems.append(f"{message.splitlines()[0]}：回滚后仍有未结束的事务")
+
+            # 恢复后重新执行，应整体提交
+            await run_command(handler, qq_id, message)
+            retried = committed_state(plugin.db_file)
+            if retried["logs"] == before["logs"] and handler_name != "sign_cmd":
+                problems.append(f"{message.splitlines()[0]}：恢复后重新执行没有写入流水")
+            if retried["stats"] == before["stats"]:
+                problems.append(f"{message.splitlines()[0]}：恢复后重新执行没有更新每日统计")
+
+        await plugin.terminate()
+
+    for problem in problems:
+        print(f"  {problem}")
+    return not problems
+
+
+def main():
+    ok = asyncio.run(check(load_plugin_module()))
+    print("✅ 失败时没有留下部分提交" if ok else "❌ 存在部分提交")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+"""本地 players.php 替身：支持 action=search（passport / page / pageSize）与 action=recharge
+
+可配置延迟、错误率与超时（请求挂起），供负载测试离线回放流量；也可以单独运行：
+
+    python -m benchmarks.fake_players_api [--port 18081] [--accounts 10000] [--latency 0.08]
+                                          [--jitter 0.04] [--error-rate 0] [--timeout-rate 0] [--hang 5]
+"""
+import argparse
+import asyncio
+import random
+from typing import Dict, List, Optional
+
+from aiohttp import web
+
+
+class FakePlayersApi:
+    """内存中的玩家表，按 players.php 的请求/响应格式提供查询和充值"""
+
+    def __init__(self, accounts: int = 10_000, latency: float = 0.08, jitter: float = 0.04,
+                 error_rate: float = 0.0, timeout_rate: float = 0.0, hang: float = 5.0,
+                 seed: Optional[int] = None):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.timeout_rate = timeout_rate
+        self.hang = hang
+        self.rng = random.Random(seed)
+        self.players: Dict[str, dict] = {
+            f"acc{i}": {"passport": f"acc{i}", "cash_gold": 0, "total_recharge": 0, "cid": i, "name": f"玩家{i}"}
+            for i in range(accounts)
+        }
+        # 已执行的充值：(passport, 元宝, 是否为挂起后才执行)
+        self.recharges: List[tuple] = []
+        self.requests = {"search": 0, "recharge": 0, "errors": 0, "hangs": 0}
+        self._runner: Optional[web.AppRunner] = None
+
+    async def _delay(self) -> bool:
+        """模拟处理耗时；返回 True 表示本次请求挂起（模拟超时）"""
+        if self.timeout_rate and self.rng.random() < self.timeout_rate:
+            self.requests["hangs"] += 1
+            await asyncio.sleep(self.hang)
+            return True
+        await asyncio.sleep(max(self.latency + self.rng.uniform(-self.jitter, self.jitter), 0))
+        return False
+
+    def _should_fail(self) -> bool:
+        if self.error_rate and self.rng.random() < self.error_rate:
+            self.requests["errors"] += 1
+            return True
+        return False
+
+    async def handle(self, request: web.Request) -> web.Response:
+        if request.method == "POST":
+            form = await request.post()
+            if form.get("action") == "recharge":
+                return await self._recharge(form)
+        elif request.query.get("action") == "search":
+            return await self._search(request.query)
+        return web.json_response({"success": False, "error": "unknown action"}, status=400)
+
+    async def _search(self, query) -> web.Response:
+        self.requests["search"] += 1
+        await self._delay()
+        if self._should_fail():
+            return web.Response(status=500, text="Internal Server Error")
+
+        page = max(int(query.get("page", 1)), 1)
+        page_size = max(int(query.get("pageSize", 20)), 1)
+        passport = query.get("passport")
+        if passport:
+            matched = [self.players[passport]] if passport in self.players else []
+        else:
+            matched = list(self.players.values())
+        start = (page - 1) * page_size
+        return web.json_response({
+            "success": True,
+            "data": {"total": len(matched), "page": page, "pageSize": page_size,
+                     "players": [dict(player) for player in matched[start:start + page_size]]}
+        })
+
+    async def _recharge(self, form) -> web.Response:
+        self.requests["recharge"] += 1
+        hung = await self._delay()
+        if self._should_fail():
+            return web.Response(status=500, text="Internal Server Error")
+
+        player = self.players.get(form.get("passport", ""))
+        if player is None:
+            return web.json_response({"success": False, "error": "账号不存在"})
+        try:
+            amount = int(float(form.get("amount", "0")))
+        except ValueError:
+            return web.json_response({"success": False, "error": "金额无效"})
+
+        # 挂起的请求在服务端仍然执行（客户端已超时），与真实接口一样结果不确定
+        player["cash_gold"] += amount
+        player["total_recharge"] += amount
+        self.recharges.append((player["passport"], amount, hung))
+        return web.json_response({
+            "success": True,
+            "data": {"new_gold_pay": player["cash_gold"], "new_gold_pay_total": player["total_recharge"]}
+        })
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        """启动服务并返回 players.php 地址（port=0 时自动分配端口）"""
+        app = web.Application()
+        app.router.add_route("*", "/api/players.php", self.handle)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        bound_port = self._runner.addresses[0][1]
+        return f"http://{host}:{bound_port}/api/players.php"
+
+    async def stop(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+
+def add_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument("--accounts", type=int, default=10_000, help="玩家账号数（acc0 ~ accN-1）")
+    parser.add_argument("--latency", type=float, default=0.08, help="平均响应延迟（秒）")
+    parser.add_argument("--jitter", type=float, default=0.04, help="延迟随机浮动范围（秒）")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="返回500的比例")
+    parser.add_argument("--timeout-rate", type=float, default=0.0, help="请求挂起的比例")
+    parser.add_argument("--hang", type=float, default=5.0, help="挂起时长（秒）")
+
+
+def from_arguments(args, seed: Optional[int] = None) -> FakePlayersApi:
+    return FakePlayersApi(accounts=args.accounts, latency=args.latency, jitter=args.jitter,
+                          error_rate=args.error_rate, timeout_rate=args.timeout_rate,
+                          hang=args.hang, seed=seed)
+
+
+async def serve(args):
+    api = from_arguments(args)
+    url = await api.start(args.host, args.port)
+    print(f"🎮 players.php 替身已启动：{url}")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await api.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="本地 players.php 替身")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=18081)
+    add_arguments(parser)
+    try:
+        asyncio.run(serve(parser.parse_args()))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+"""端到端负载测试：按目标速率向插件实例发送混合命令，调用本地 players.php 替身
+
+    python -m benchmarks.load_test [--rate 200] [--duration 30] [--users 2000]
+                                   [--mix sign=4,bind=2,query=2,recharge=2]
+                                   [--latency 0.08] [--error-rate 0.01] [--timeout-rate 0.001] [--hang 5]
+                                   [--client-timeout 3]
+
+开环发送：命令按固定间隔发出，不等待前一条完成，排队等待也计入延迟。
+结束后报告持续吞吐、各命令延迟分位数与回复分布，并校验数据一致性：
+每个用户 积分 = 累计获得 - 累计消耗、没有负余额、每个用户的消耗与充值流水一致、
+流水中的充值元宝与接口实际到账一致（客户端超时但服务端已执行的充值单独列出）、绑定关系与反向索引一致。
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+from collections import Counter, defaultdict
+
+from ._common import load_plugin_module, make_plugin, run_command
+from .fake_players_api import add_arguments, from_arguments
+
+INITIAL_POINTS = 100
+COMMANDS = {
+    "sign": ("sign_cmd", "/签到"),
+    "bind": ("bind_account_cmd", "/绑定账号 {account}"),
+    "query": ("query_account_cmd", "/查询账号"),
+    "recharge": ("points_recharge_cmd", "/积分充值 {points}"),
+}
+
+
+def parse_mix(text: str) -> dict:
+    mix = {}
+    for item in text.split(","):
+        name, _, weight = item.partition("=")
+        if name not in COMMANDS:
+            raise SystemExit(f"未知命令类型：{name}（可选：{', '.join(COMMANDS)}）")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def percentile(ordered: list, q: float) -> float:
+    return ordered[min(int(len(ordered) * q), len(ordered) - 1)] if ordered else 0.0
+
+
+def seed_users(plugin, qq_ids: list):
+    """初始积分记为累计获得，前一半用户预先绑定（账号 acc{序号}）"""
+    for i, qq_id in enumerate(qq_ids):
+        points = plugin._get_user_points(qq_id)
+        points["points"] = INITIAL_POINTS
+        points["total_earned"] = INITIAL_POINTS
+        plugin._update_user_points(qq_id, points)
+        if i < len(qq_ids) // 2:
+            plugin.bindings[qq_id] = {"game_account": f"acc{i}", "account_name": f"acc{i}",
+                                      "bind_time": "2026-01-01 00:00:00", "qq_id": qq_id}
+            plugin._index_binding(f"acc{i}", qq_id)
+
+
+def check_consistency(plugin, api, qq_ids: list) -> list:
+    """返回发现的问题（为空表示一致）"""
+    problems = []
+    spent_by_logs = defaultdict(int)
+    logged_yuanbao = 0
+    for _, entry in plugin.recharge_logs.items():
+        if entry.get("type", "normal") == "normal":
+            spent_by_logs[entry["qq_id"]] += entry["points_used"]
+            logged_yuanbao += entry["recharge_amount"]
+
+    for qq_id in qq_ids:
+        record = plugin.user_points[qq_id]
+        if record["points"] < 0:
+            problems.append(f"{qq_id} 积分为负：{record['points']}")
+        if record["points"] != record["total_earned"] - record["total_spent"]:
+            problems.append(f"{qq_id} 积分 {record['points']} ≠ 累计获得 {record['total_earned']} - 累计消耗 {record['total_spent']}")
+        if record["total_spent"] != spent_by_logs[qq_id]:
+            problems.append(f"{qq_id} 累计消耗 {record['total_spent']} ≠ 充值流水合计 {spent_by_logs[qq_id]}")
+
+    applied = sum(amount for _, amount, hung in api.recharges if not hung)
+    if logged_yuanbao != applied:
+        problems.append(f"流水充值元宝 {logged_yuanbao:,} ≠ 接口正常到账 {applied:,}")
+
+    owners = Counter(bind_info["game_account"] for bind_info in plugin.bindings.values())
+    problems += [f"账号 {account} 被 {count} 个QQ绑定" for account, count in owners.items() if count > 1]
+    for qq_id, bind_info in plugin.bindings.items():
+        if plugin.account_index.get(bind_info["game_account"]) != qq_id:
+            problems.append(f"反向索引与绑定不一致：{bind_info['game_account']} -> {qq_id}")
+    return problems
+
+
+async def load_test(args) -> bool:
+    mix = parse_mix(args.mix)
+    rng = random.Random(args.seed)
+    api = from_arguments(args, seed=args.seed)
+    url = await api.start()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.makedirs(os.path.join(tmp, "data"))
+        plugin = make_plugin(load_plugin_module(), tmp)
+        plugin.api_config["base_url"] = url
+        plugin.api_config["timeout"] = args.client_timeout
+        await plugin.initialize()
+        await plugin._load_task
+
+        qq_ids = [str(30000 + i) for i in range(args.users)]
+        seed_users(plugin, qq_ids)
+
+        latencies = defaultdict(list)
+        outcomes = defaultdict(Counter)
+
+        async def fire(kind: str, qq_id: str, message: str, scheduled: float):
+            handler = getattr(plugin, COMMANDS[kind][0])
+            replies = await run_command(handler, qq_id, message)
+            latencies[kind].append(time.perf_counter() - scheduled)
+            outcomes[kind][replies[-1].split("\n")[0] if replies else "（无回复）"] += 1
+
+        kinds, weights = list(mix), list(mix.values())
+        total = int(args.rate * args.duration)
+        interval = 1 / args.rate
+        tasks = []
+        print(f"目标速率 {args.rate}/秒，持续 {args.duration} 秒，共 {total} 条命令，用户 {args.users}", file=sys.stderr)
+        start = time.perf_counter()
+        for n in range(total):
+            scheduled = start + n * interval
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            kind = rng.choices(kinds, weights)[0]
+            index = rng.randrange(args.users)
+            message = COMMANDS[kind][1].format(account=f"acc{index}", points=rng.randint(1, 10))
+            tasks.append(asyncio.create_task(fire(kind, qq_ids[index], message, scheduled)))
+        sent = time.perf_counter() - start
+        await asyncio.gather(*tasks)
+        elapsed = time.perf_counter() - start
+
+        # 等挂起的请求在服务端执行完，再核对到账金额
+        await asyncio.sleep(args.hang if api.requests["hangs"] else 0)
+        problems = check_consistency(plugin, api, qq_ids)
+        late = [(passport, amount) for passport, amount, hung in api.recharges if hung]
+        breaker = plugin.api_breaker
+        await plugin.terminate()
+    await api.stop()
+
+    print(f"\n发送 {total} 条命令用时 {sent:.1f}s（实际发送速率 {total / sent:.0f}/秒），"
+          f"全部完成用时 {elapsed:.1f}s，持续吞吐 {total / elapsed:.0f}/秒")
+    print(f"接口请求：查询 {api.requests['search']}，充值 {api.requests['recharge']}，"
+          f"注入错误 {api.requests['errors']}，挂起 {api.requests['hangs']}；熔断 {breaker.trips} 次，拒绝 {breaker.rejected} 次")
+    print(f"\n{'命令':<10}{'数量':>8}{'p50(ms)':>10}{'p95(ms)':>10}{'p99(ms)':>10}{'max(ms)':>10}")
+    for kind in kinds:
+        ordered = sorted(latencies[kind])
+        if not ordered:
+            continue
+        print(f"{kind:<10}{len(ordered):>8}{percentile(ordered, 0.5) * 1000:>10.1f}{percentile(ordered, 0.95) * 1000:>10.1f}"
+              f"{percentile(ordered, 0.99) * 1000:>10.1f}{ordered[-1] * 1000:>10.1f}")
+    for kind in kinds:
+        print(f"\n{kind} 回复：")
+        for first_line, count in outcomes[kind].most_common(6):
+            print(f"  {count:>7}  {first_line}")
+
+    print()
+    if late:
+        print(f"⚠️ 客户端超时但服务端已执行的充值 {len(late)} 笔，共 {sum(amount for _, amount in late):,} 元宝（积分未扣除，需人工核对）")
+    if problems:
+        print(f"❌ 发现 {len(problems)} 处不一致：")
+        for problem in problems[:20]:
+            print(f"  {problem}")
+        return False
+    print("✅ 数据一致")
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description="端到端负载测试")
+    parser.add_argument("--rate", type=float, default=200, help="目标发送速率（条/秒）")
+    parser.add_argument("--duration", type=float, default=30, help="持续时间（秒）")
+    parser.add_argument("--users", type=int, default=2_000, help="参与的QQ用户数（不超过 --accounts）")
+    parser.add_argument("--mix", default="sign=4,bind=2,query=2,recharge=2", help="命令比例")
+    parser.add_argument("--client-timeout", type=float, default=3.0, help="插件请求超时上限（秒）")
+    parser.add_argument("--seed", type=int, default=1)
+    add_arguments(parser)
+    args = parser.parse_args()
+    if args.users > args.accounts:
+        parser.error("--users 不能超过 --accounts")
+    ok = asyncio.run(load_test(args))
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""并发积分一致性压力测试
+
+对少量用户同时发起大量 /积分充值、/给别人充值、/赠送积分 命令（充值API用随机延迟模拟），
+结束后校验：没有负余额、没有超额消费、积分总量守恒。
+
+    python -m benchmarks.stress_user_locks [用户数] [命令数]
+"""
+import asyncio
+import os
+import random
+import sys
+import tempfile
+
+from ._common import load_plugin_module, make_plugin, run_command
+
+INITIAL_POINTS = 50
+recharged_amounts = []
+
+
+async def fake_recharge(passport: str, amount: float, remark: str) -> dict:
+    await asyncio.sleep(random.uniform(0, 0.02))
+    recharged_amounts.append(amount)
+    return {"success": True, "data": {"new_gold_pay": 0, "new_gold_pay_total": 0}}
+
+
+async def stress(module, users: int, commands: int) -> bool:
+    with tempfile.TemporaryDirectory() as tmp:
+        os.makedirs(os.path.join(tmp, "data"))
+        plugin = make_plugin(module, tmp)
+        await plugin.initialize()
+        plugin._execute_account_recharge = fake_recharge
+
+        qq_ids = [str(20000 + i) for i in range(users)]
+        for qq_id in qq_ids:
+            points = plugin._get_user_points(qq_id)
+            points["points"] = INITIAL_POINTS
+            plugin._update_user_points(qq_id, points)
+            plugin.bindings[qq_id] = {"game_account": f"acc{qq_id}", "account_name": f"acc{qq_id}",
+                                      "bind_time": "2026-01-01 00:00:00", "qq_id": qq_id}
+
+        def random_command():
+            qq_id = random.choice(qq_ids)
+            other = random.choice([q for q in qq_ids if q != qq_id])
+            amount = random.randint(1, 10)
+            kind = random.random()
+            if kind < 0.4:
+                return plugin.points_recharge_cmd, qq_id, f"/积分充值 {amount}"
+            if kind < 0.7:
+                return plugin.recharge_for_others_cmd, qq_id, f"/给别人充值 {other} {amount}"
+            return plugin.gift_points_cmd, qq_id, f"/赠送积分 {other} {amount}"
+
+        await asyncio.gather(*(run_command(*random_command()) for _ in range(commands)))
+
+        ratio = plugin.system_config["points"]["recharge_ratio"]
+        recharged = int(sum(recharged_amounts) // ratio)
+        balances = {qq_id: plugin.user_points[qq_id]["points"] for qq_id in qq_ids}
+        await plugin.terminate()
+
+    negative = [qq_id for qq_id, points in balances.items() if points < 0]
+    expected_total = users * INITIAL_POINTS - recharged
+    actual_total = sum(balances.values())
+    print(f"用户 {users}，命令 {commands}，充值消耗 {recharged} 积分")
+    print(f"剩余积分合计 {actual_total}（期望 {expected_total}），负余额用户 {len(negative)}")
+    return not negative and actual_total == expected_total
+
+
+def main():
+    users = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    commands = int(sys.argv[2]) if len(sys.argv) > 2 else 5000
+    ok = asyncio.run(stress(load_plugin_module(), users, commands))
+    print("✅ 一致" if ok else "❌ 不一致")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
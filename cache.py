@@ -0,0 +1,105 @@
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+MISSING = object()
+
+
+class TTLCache:
+    """带过期时间的LRU缓存
+
+    每个条目可单独指定TTL（例如"账号不存在"的结果使用更短的TTL），
+    超出容量时淘汰最久未使用的条目。
+    """
+
+    def __init__(self, max_size: int, default_ttl: float):
+        self.max_size = max_size
+        self.default_ttl = default_ttl
+        self._data: "OrderedDict[str, tuple]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: str, default: Any = MISSING) -> Any:
+        """取缓存，未命中或已过期返回 default"""
+        item = self._data.get(key)
+        if item is None:
+            self.misses += 1
+            return default
+
+        expires_at, value = item
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            self.expirations += 1
+            self.misses += 1
+            return default
+
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        """写入缓存"""
+        if ttl is None:
+            ttl = self.default_ttl
+        self._data[key] = (time.monotonic() + ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_size:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def peek(self, key: str) -> Any:
+        """取未过期的值但不计入命中统计、不调整LRU顺序"""
+        item = self._data.get(key)
+        if item is None or item[0] <= time.monotonic():
+            return MISSING
+        return item[1]
+
+    def invalidate(self, key: str):
+        self._data.pop(key, None)
+
+    def clear(self):
+        self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "hit_rate": self.hits / lookups if lookups else 0.0
+        }
+
+
+class SingleFlight:
+    """合并并发的相同请求：同一个键同时只有一个请求在途，其余调用者共享其结果"""
+
+    def __init__(self):
+        self._inflight: Dict[Any, asyncio.Future] = {}
+        self.shared = 0
+
+    async def do(self, key: Any, factory: Callable[[], Awaitable[Any]]) -> Any:
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(factory())
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+        else:
+            self.shared += 1
+        # shield：某个调用者被取消时不影响其他等待同一结果的调用者
+        return await asyncio.shield(task)
+
+    def _forget(self, key: Any, task: asyncio.Future):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+
+    def __len__(self):
+        return len(self._inflight)
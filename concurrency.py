@@ -0,0 +1,130 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+
+class KeyedLock:
+    """按键（QQ号）划分的异步锁
+
+    锁在首次使用时创建，没有持有者和等待者时立即回收，内存只与活跃用户数相关。
+    同时获取多个键时按固定顺序加锁，避免互相等待造成死锁。
+    """
+
+    def __init__(self):
+        # 键 -> [锁, 持有或等待该锁的协程数]
+        self._locks: Dict[str, List] = {}
+
+    @asynccontextmanager
+    async def acquire(self, *keys: str):
+        ordered = sorted({str(key) for key in keys})
+        entries = []
+        for key in ordered:
+            entry = self._locks.get(key)
+            if entry is None:
+                entry = self._locks[key] = [asyncio.Lock(), 0]
+            entry[1] += 1
+            entries.append((key, entry))
+
+        acquired = []
+        try:
+            for _, entry in entries:
+                await entry[0].acquire()
+                acquired.append(entry)
+            yield
+        finally:
+            for entry in reversed(acquired):
+                entry[0].release()
+            for key, entry in entries:
+                entry[1] -= 1
+                if entry[1] == 0:
+                    del self._locks[key]
+
+    def __len__(self):
+        return len(self._locks)
+
+
+class WorkerPool:
+    """固定数量工作协程 + 有界队列
+
+    队列满时 submit 直接返回 None，由调用方立即提示用户稍后再试（背压）。
+    """
+
+    def __init__(self, workers: int, max_depth: int):
+        self.workers = workers
+        self.max_depth = max_depth
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        self.busy = 0
+        self.pending = 0
+        self.processed = 0
+        self.rejected = 0
+        self._busy_seconds = 0.0
+        self._wait_seconds = 0.0
+        self._started_at = 0.0
+
+    def start(self):
+        if self._tasks:
+            return
+        self._queue = asyncio.Queue()
+        self._started_at = time.monotonic()
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    def submit(self, factory: Callable[[], Awaitable[Any]]) -> Optional[Tuple[asyncio.Future, int]]:
+        """提交任务，返回 (结果Future, 排队位置)；位置为0表示可立即执行，队列已满返回 None"""
+        # 空闲工作协程会立即取走任务，只有超出空闲数的部分才算排队
+        idle = self.workers - self.busy
+        if self.pending - idle >= self.max_depth:
+            self.rejected += 1
+            return None
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((future, factory, time.monotonic()))
+        self.pending += 1
+        return future, max(self.pending - idle, 0)
+
+    async def _worker(self):
+        while True:
+            future, factory, enqueued_at = await self._queue.get()
+            self.pending -= 1
+            try:
+                if future.cancelled():
+                    continue
+                started_at = time.monotonic()
+                self._wait_seconds += started_at - enqueued_at
+                self.busy += 1
+                try:
+                    result = await factory()
+                    if not future.cancelled():
+                        future.set_result(result)
+                except Exception as e:
+                    if not future.cancelled():
+                        future.set_exception(e)
+                finally:
+                    self.busy -= 1
+                    self.processed += 1
+                    self._busy_seconds += time.monotonic() - started_at
+            finally:
+                self._queue.task_done()
+
+    async def stop(self):
+        """等待已排队的任务完成后停止工作协程"""
+        if not self._tasks:
+            return
+        await self._queue.join()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def stats(self) -> Dict[str, Any]:
+        uptime = time.monotonic() - self._started_at if self._tasks else 0.0
+        return {
+            "depth": max(self.pending - (self.workers - self.busy), 0),
+            "max_depth": self.max_depth,
+            "busy": self.busy,
+            "workers": self.workers,
+            "processed": self.processed,
+            "rejected": self.rejected,
+            "utilization": self._busy_seconds / (uptime * self.workers) if uptime else 0.0,
+            "avg_wait": self._wait_seconds / self.processed if self.processed else 0.0
+        }
@@ -0,0 +1,158 @@
+import json
+import os
+import shutil
+import time
+from datetime import datetime
+from typing import Dict, Iterable, Optional, Tuple
+from astrbot.api import logger
+
+
+class LogIdGenerator:
+    """不重复的流水号生成器：类型前缀 + 时间（秒）+ 4位序号 + QQ
+
+    同一秒内的多笔流水按序号区分，系统时间回拨时沿用上一个时间戳继续计数。
+    流水号只保证唯一，不用于排序：不同前缀之间、与旧格式（前缀 + 时间 + _QQ）之间按字符串比较
+    都不反映先后。流水的先后以写入顺序为准（账本追加顺序、SQLite 的 rowid）。
+    """
+
+    def __init__(self):
+        self._last_second = 0
+        self._seq = 0
+
+    def next_id(self, prefix: str, qq_id: str) -> str:
+        now = int(time.time())
+        if now > self._last_second:
+            self._last_second = now
+            self._seq = 0
+        else:
+            self._seq += 1
+            if self._seq > 9999:
+                # 单秒超过一万笔时借用下一秒，保证不重复
+                self._last_second += 1
+                self._seq = 0
+        timestamp = datetime.fromtimestamp(self._last_second).strftime('%Y%m%d%H%M%S')
+        return f"{prefix}{timestamp}{self._seq:04d}_{qq_id}"
+
+
+class RechargeLedger:
+    """充值流水账本：按行追加写入的 JSON Lines 文件
+
+    每行一条记录：{"id": 流水号, "entry": 流水内容}。
+    写入只追加不重写，启动时顺序回放得到完整的流水字典。
+    """
+
+    def __init__(self, file_path: str):
+        self.file_path = file_path
+        self._fp = None
+
+    def _open(self):
+        if self._fp is None:
+            self._fp = open(self.file_path, 'a', encoding='utf-8')
+        return self._fp
+
+    def replay(self, timings: Optional[Dict[str, float]] = None) -> Dict[str, dict]:
+        """回放账本，返回 {流水号: 流水内容}（按写入顺序）
+
+        传入 timings 时把读取、解析耗时分别累加到 "read"、"parse"。
+        """
+        logs = {}
+        if not os.path.exists(self.file_path):
+            return logs
+
+        start = time.perf_counter()
+        with open(self.file_path, 'rb') as f:
+            data = f.read()
+        read_done = time.perf_counter()
+
+        good_lines = []
+        bad_lines = 0
+        torn_offset = None
+        offset = 0
+        for raw in data.splitlines(keepends=True):
+            line = raw.strip()
+            offset += len(raw)
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+                logs[record["id"]] = record["entry"]
+                good_lines.append(raw)
+            except (ValueError, KeyError, TypeError) as e:
+                if not raw.endswith(b"\n"):
+                    # 没有换行的最后一行：崩溃时写了一半，截掉以免污染后续追加
+                    torn_offset = offset - len(raw)
+                    logger.error(f"📒 账本最后一行不完整，已截断: {e}")
+                else:
+                    bad_lines += 1
+                    logger.error(f"📒 账本存在损坏记录，已跳过: {e}")
+
+        if timings is not None:
+            timings["read"] += read_done - start
+            timings["parse"] += time.perf_counter() - read_done
+
+        if bad_lines:
+            # 中间行损坏：先备份原文件，再去掉损坏行重写，其余记录全部保留
+            backup_path = f"{self.file_path}.corrupt-{datetime.now().strftime('%Y%m%d%H%M%S')}"
+            shutil.copy2(self.file_path, backup_path)
+            tmp_path = self.file_path + ".tmp"
+            with open(tmp_path, 'wb') as f:
+                f.writelines(good_lines)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.file_path)
+            logger.error(f"📒 账本中 {bad_lines} 条损坏记录已移除，原文件已备份为 {backup_path}")
+        elif torn_offset is not None:
+            with open(self.file_path, 'r+b') as f:
+                f.truncate(torn_offset)
+        elif data and not data.endswith(b"\n"):
+            # 最后一行完整但缺少换行，补上，否则下一次追加会接在同一行
+            with open(self.file_path, 'ab') as f:
+                f.write(b"\n")
+        return logs
+
+    def append(self, log_id: str, entry: dict):
+        """追加一条流水"""
+        self.append_batch([(log_id, entry)])
+
+    def append_batch(self, items: Iterable[Tuple[str, dict]]):
+        """追加一批流水，整批只写入一次并 fsync 一次"""
+        lines = "".join(
+            json.dumps({"id": log_id, "entry": entry}, ensure_ascii=False) + "\n"
+            for log_id, entry in items
+        )
+        if not lines:
+            return
+        fp = self._open()
+        fp.write(lines)
+        fp.flush()
+        os.fsync(fp.fileno())
+
+    def migrate_from_json(self, json_path: str) -> int:
+        """一次性从旧版 recharge_logs.json 迁移，返回迁移条数"""
+        if os.path.exists(self.file_path) or not os.path.exists(json_path):
+            return 0
+
+        try:
+            with open(json_path, 'r', encoding='utf-8') as f:
+                old_logs = json.load(f)
+        except Exception as e:
+            logger.error(f"📂 读取旧充值记录失败 {json_path}: {e}")
+            return 0
+
+        # 先写临时文件再改名，迁移中途失败不会留下半个账本
+        tmp_path = self.file_path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            for log_id, entry in old_logs.items():
+                f.write(json.dumps({"id": log_id, "entry": entry}, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.file_path)
+        os.replace(json_path, json_path + ".migrated")
+
+        logger.info(f"📒 已将 {len(old_logs)} 条充值记录迁移到账本 {self.file_path}")
+        return len(old_logs)
+
+    def close(self):
+        if self._fp is not None:
+            self._fp.close()
+            self._fp = None
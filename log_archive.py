@@ -0,0 +1,382 @@
+import gzip
+import json
+import os
+import time
+from collections import OrderedDict, deque
+from collections.abc import Mapping
+from datetime import datetime
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from astrbot.api import logger
+from .ledger import RechargeLedger
+from .log_index import RechargeLogIndex, log_time
+
+
+def segment_month(log_id: str, entry: Optional[dict] = None) -> str:
+    """流水所属的月份分段 YYYY-MM（流水号为 类型前缀 + YYYYmmddHHMMSS...，优先从中取）"""
+    stamp = log_id[1:7]
+    if stamp.isdigit():
+        return f"{stamp[:4]}-{stamp[4:]}"
+    if entry is not None and log_time(entry):
+        return log_time(entry)[:7]
+    return datetime.now().strftime("%Y-%m")
+
+
+class LogSegment:
+    """一个月的流水及其二级索引"""
+
+    def __init__(self, month: str, logs: Dict[str, dict], timings: Optional[Dict[str, float]] = None):
+        start = time.perf_counter()
+        self.month = month
+        self.logs = logs
+        self.index = RechargeLogIndex(logs)
+        self.index.build(logs.items())
+        if timings is not None:
+            timings["index"] += time.perf_counter() - start
+
+    def add(self, log_id: str, entry: dict):
+        self.logs[log_id] = entry
+        self.index.add(log_id, entry)
+
+    def summary(self) -> dict:
+        """分段摘要：条数和各类型条数（用于查询时跳过不相关的分段）"""
+        return {
+            "count": len(self.logs),
+            "types": {type_name: len(ids) for type_name, ids in self.index.by_type.items()}
+        }
+
+    def users(self) -> List[str]:
+        """分段涉及的全部QQ"""
+        return sorted(self.index.by_qq)
+
+
+class RechargeLogArchive(Mapping):
+    """按月分段的充值流水存档
+
+    当月分段是明文 JSON Lines 文件（YYYY-MM.jsonl），常驻内存并追加写入；
+    已结束的月份压缩为 YYYY-MM.jsonl.gz，只有查询涉及时才加载，并只缓存最近用到的几个分段。
+    manifest.json 记录每个已结束分段的条数和类型，YYYY-MM.users.json 记录分段涉及的QQ，
+    查询时据此跳过不相关的分段；用户列表只在按QQ查询时读取，不常驻内存，
+    启动时间和常驻内存只与当月流水量相关。
+
+    内存中的修改（add）在事件循环中进行，对应的写盘操作排队，由 flush() 在写盘线程中按顺序执行。
+    """
+
+    MANIFEST = "manifest.json"
+
+    def __init__(self, dir_path: str, cache_size: int = 2):
+        self.dir_path = dir_path
+        self.cache_size = cache_size
+        os.makedirs(dir_path, exist_ok=True)
+        self.active: Optional[LogSegment] = None
+        self._summaries: Dict[str, dict] = {}
+        self._cache: "OrderedDict[str, LogSegment]" = OrderedDict()
+        self._pending_io = deque()
+        self._writer: Optional[RechargeLedger] = None
+        self._writer_month: Optional[str] = None
+
+    # ---------- 文件 ----------
+
+    def _plain_path(self, month: str) -> str:
+        return os.path.join(self.dir_path, f"{month}.jsonl")
+
+    def _sealed_path(self, month: str) -> str:
+        return os.path.join(self.dir_path, f"{month}.jsonl.gz")
+
+    def _users_path(self, month: str) -> str:
+        return os.path.join(self.dir_path, f"{month}.users.json")
+
+    def _months(self, suffix: str) -> List[str]:
+        return sorted(
+            name[:-len(suffix)] for name in os.listdir(self.dir_path)
+            if name.endswith(suffix) and len(name) == 7 + len(suffix)
+        )
+
+    def _read_sealed(self, month: str) -> Dict[str, dict]:
+        logs = {}
+        try:
+            with gzip.open(self._sealed_path(month), 'rt', encoding='utf-8') as f:
+                for line in f:
+                    if line.strip():
+                        record = json.loads(line)
+                        logs[record["id"]] = record["entry"]
+        except Exception as e:
+            logger.error(f"📒 读取流水分段失败 {month}: {e}")
+        return logs
+
+    def _write_sealed(self, month: str, items: Iterable[Tuple[str, dict]]):
+        tmp_path = self._sealed_path(month) + ".tmp"
+        with open(tmp_path, 'wb') as raw:
+            with gzip.GzipFile(fileobj=raw, mode='wb') as f:
+                for log_id, entry in items:
+                    f.write((json.dumps({"id": log_id, "entry": entry}, ensure_ascii=False) + "\n").encode('utf-8'))
+            raw.flush()
+            os.fsync(raw.fileno())
+        os.replace(tmp_path, self._sealed_path(month))
+
+    def _compress(self, month: str):
+        """把已结束月份的明文分段压缩封存"""
+        plain_path = self._plain_path(month)
+        if not os.path.exists(plain_path):
+            return
+        if self._writer_month == month:
+            self._writer.close()
+            self._writer, self._writer_month = None, None
+        self._write_sealed(month, RechargeLedger(plain_path).replay().items())
+        os.remove(plain_path)
+        logger.info(f"📦 流水分段 {month} 已压缩封存")
+
+    @staticmethod
+    def _write_json(path: str, data):
+        with open(path + ".tmp", 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(path + ".tmp", path)
+
+    def _save_manifest(self, manifest: dict):
+        self._write_json(os.path.join(self.dir_path, self.MANIFEST), manifest)
+
+    def _save_users(self, month: str, users: List[str]):
+        self._write_json(self._users_path(month), users)
+
+    def _read_users(self, month: str) -> Optional[set]:
+        """读取分段的用户列表（文件缺失或损坏时返回 None，表示无法据此跳过）"""
+        try:
+            with open(self._users_path(month), 'r', encoding='utf-8') as f:
+                return set(json.load(f))
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.error(f"📒 读取流水分段用户列表失败 {month}: {e}")
+            return None
+
+    def _manifest_snapshot(self) -> dict:
+        return {
+            month: {"count": info["count"], "types": dict(info["types"])}
+            for month, info in self._summaries.items()
+        }
+
+    # ---------- 启动 ----------
+
+    def migrate_from_ledger(self, ledger_path: str) -> int:
+        """一次性把单文件账本按月拆分为分段，返回迁移条数"""
+        if not os.path.exists(ledger_path) or self._months(".jsonl") or self._months(".jsonl.gz"):
+            return 0
+
+        by_month: Dict[str, Dict[str, dict]] = {}
+        for log_id, entry in RechargeLedger(ledger_path).replay().items():
+            by_month.setdefault(segment_month(log_id, entry), {})[log_id] = entry
+
+        current_month = datetime.now().strftime("%Y-%m")
+        for month, logs in by_month.items():
+            if month < current_month:
+                segment = LogSegment(month, logs)
+                self._write_sealed(month, logs.items())
+                self._save_users(month, segment.users())
+                self._summaries[month] = segment.summary()
+            else:
+                RechargeLedger(self._plain_path(month)).append_batch(logs.items())
+        self._save_manifest(self._manifest_snapshot())
+        os.replace(ledger_path, ledger_path + ".migrated")
+
+        total = sum(len(logs) for logs in by_month.values())
+        logger.info(f"📒 已将账本中的 {total} 条流水按月拆分为 {len(by_month)} 个分段")
+        return total
+
+    def open(self, timings: Optional[Dict[str, float]] = None):
+        """加载摘要并封存之前月份的明文分段，只把当月分段读入内存
+
+        传入 timings 时把当月分段的读取、解析、建索引耗时累加到 "read"、"parse"、"index"。
+        """
+        manifest_path = os.path.join(self.dir_path, self.MANIFEST)
+        changed = False
+        if os.path.exists(manifest_path):
+            try:
+                with open(manifest_path, 'r', encoding='utf-8') as f:
+                    for month, info in json.load(f).items():
+                        if "users" in info:
+                            # 旧版摘要把用户列表写在 manifest.json 中，迁移为单独的文件
+                            if not os.path.exists(self._users_path(month)):
+                                self._save_users(month, info["users"])
+                            changed = True
+                        self._summaries[month] = {"count": info["count"], "types": info["types"]}
+            except Exception as e:
+                logger.error(f"📒 读取流水分段摘要失败，将重新生成: {e}")
+                self._summaries = {}
+
+        plain_months = self._months(".jsonl")
+        active_month = max([datetime.now().strftime("%Y-%m")] + plain_months)
+
+        for month in plain_months:
+            if month < active_month:
+                segment = LogSegment(month, RechargeLedger(self._plain_path(month)).replay())
+                self._summaries[month] = segment.summary()
+                self._compress(month)
+                self._save_users(month, segment.users())
+                changed = True
+
+        sealed_months = set(self._months(".jsonl.gz"))
+        for month in sealed_months:
+            if month in self._summaries and os.path.exists(self._users_path(month)):
+                continue
+            # 压缩后、写摘要或用户列表前崩溃时补建
+            segment = LogSegment(month, self._read_sealed(month))
+            self._summaries[month] = segment.summary()
+            self._save_users(month, segment.users())
+            changed = True
+        for month in set(self._summaries) - sealed_months:
+            del self._summaries[month]
+            if os.path.exists(self._users_path(month)):
+                os.remove(self._users_path(month))
+            changed = True
+
+        if changed:
+            self._save_manifest(self._manifest_snapshot())
+        self.active = LogSegment(
+            active_month, RechargeLedger(self._plain_path(active_month)).replay(timings), timings
+        )
+
+    # ---------- 写入 ----------
+
+    def add(self, log_id: str, entry: dict):
+        """写入一条流水（内存立即可见，写盘操作排队等待 flush）"""
+        self.add_batch([(log_id, entry)])
+
+    def add_batch(self, items: Iterable[Tuple[str, dict]]):
+        batch = []
+        for log_id, entry in items:
+            month = segment_month(log_id, entry)
+            if month > self.active.month:
+                if batch:
+                    self._pending_io.append(("append", self.active.month, batch))
+                    batch = []
+                self._rotate(month)
+            self.active.add(log_id, entry)
+            batch.append((log_id, entry))
+        if batch:
+            self._pending_io.append(("append", self.active.month, batch))
+
+    def _rotate(self, month: str):
+        """进入新的月份：当月分段结束，转入缓存并排队压缩"""
+        old = self.active
+        if old.logs:
+            self._summaries[old.month] = old.summary()
+            self._remember(old)
+            self._pending_io.append(("seal", old.month, (old.users(), self._manifest_snapshot())))
+        self.active = LogSegment(month, {})
+
+    def flush(self):
+        """按顺序执行排队的写盘操作（在写盘线程中调用，或在事件循环启动前同步调用）"""
+        while self._pending_io:
+            op, month, payload = self._pending_io.popleft()
+            if op == "append":
+                if self._writer_month != month:
+                    if self._writer is not None:
+                        self._writer.close()
+                    self._writer, self._writer_month = RechargeLedger(self._plain_path(month)), month
+                self._writer.append_batch(payload)
+            else:
+                users, manifest = payload
+                self._compress(month)
+                self._save_users(month, users)
+                self._save_manifest(manifest)
+
+    def close(self):
+        self.flush()
+        if self._writer is not None:
+            self._writer.close()
+            self._writer, self._writer_month = None, None
+
+    # ---------- 读取 ----------
+
+    def _remember(self, segment: LogSegment):
+        self._cache[segment.month] = segment
+        self._cache.move_to_end(segment.month)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    def _segment(self, month: str) -> LogSegment:
+        """取已结束月份的分段（按需解压加载）"""
+        segment = self._cache.get(month)
+        if segment is None:
+            segment = LogSegment(month, self._read_sealed(month))
+        self._remember(segment)
+        return segment
+
+    def _has_user(self, month: str, qq_id: str) -> bool:
+        """已结束的分段是否可能涉及该QQ（已缓存的分段查索引，否则读取用户列表文件）"""
+        segment = self._cache.get(month)
+        if segment is not None:
+            return qq_id in segment.index.by_qq
+        users = self._read_users(month)
+        return users is None or qq_id in users
+
+    def _sealed_desc(self) -> List[str]:
+        return sorted(self._summaries, reverse=True)
+
+    def __getitem__(self, log_id: str) -> dict:
+        if log_id in self.active.logs:
+            return self.active.logs[log_id]
+        if log_id[1:7].isdigit():
+            months = [segment_month(log_id)]
+        else:
+            # 流水号中没有时间（极少见）时逐个分段查找
+            months = self._sealed_desc()
+        for month in months:
+            if month in self._summaries:
+                entry = self._segment(month).logs.get(log_id)
+                if entry is not None:
+                    return entry
+        raise KeyError(log_id)
+
+    def __contains__(self, log_id) -> bool:
+        try:
+            self[log_id]
+            return True
+        except KeyError:
+            return False
+
+    def __iter__(self) -> Iterator[str]:
+        for month in sorted(self._summaries):
+            yield from list(self._segment(month).logs)
+        yield from list(self.active.logs)
+
+    def __reversed__(self) -> Iterator[str]:
+        yield from reversed(list(self.active.logs))
+        for month in self._sealed_desc():
+            yield from reversed(list(self._segment(month).logs))
+
+    def __len__(self) -> int:
+        return len(self.active.logs) + sum(info["count"] for info in self._summaries.values())
+
+    def recent_ids(self, limit: int) -> List[str]:
+        """最近写入的流水号（按写入时间倒序，当月不足 limit 条时按月向前补足，只解压需要的分段）"""
+        return list(islice(reversed(self), limit))
+
+    def query(self, qq_id: Optional[str] = None, type_name: Optional[str] = None,
+              start_day: Optional[str] = None, end_day: Optional[str] = None,
+              offset: int = 0, limit: int = 10) -> Tuple[List[Tuple[str, dict]], bool]:
+        """按条件查询流水（从新到旧），返回 (本页流水, 是否还有下一页)
+
+        从当月分段开始逐月向前，按摘要跳过日期范围外、不含该用户或类型的分段，凑够一页即停止。
+        """
+        def segments():
+            yield self.active
+            for month in self._sealed_desc():
+                info = self._summaries[month]
+                if start_day is not None and not (start_day[:7] <= month <= end_day[:7]):
+                    continue
+                if qq_id is not None and not self._has_user(month, qq_id):
+                    continue
+                if type_name is not None and type_name not in info["types"]:
+                    continue
+                yield self._segment(month)
+
+        matches = (
+            item for segment in segments()
+            for item in segment.index.matches(qq_id, type_name, start_day, end_day)
+        )
+        page = list(islice(matches, offset, offset + limit + 1))
+        return page[:limit], len(page) > limit
+
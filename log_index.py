@@ -0,0 +1,99 @@
+from collections import defaultdict
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Mapping, Optional, Tuple
+
+# 查询时可用的类型别名 -> 流水类型
+LOG_TYPE_ALIASES = {
+    "normal": "normal", "recharge": "normal", "充值": "normal",
+    "gift": "gift_recharge", "gift_recharge": "gift_recharge", "赠送": "gift_recharge",
+    "transfer": "points_transfer", "points_transfer": "points_transfer", "转移": "points_transfer",
+    "admin": "admin_add_points", "admin_add_points": "admin_add_points", "管理员": "admin_add_points",
+}
+
+
+def log_type(entry: dict) -> str:
+    return entry.get("type", "normal")
+
+
+def log_time(entry: dict) -> str:
+    """流水时间（不同类型的流水时间字段名不同）"""
+    return entry.get("recharge_time") or entry.get("transfer_time") or entry.get("action_time") or ""
+
+
+def log_users(entry: dict) -> set:
+    """流水涉及的所有QQ"""
+    return {
+        str(entry[field]) for field in ("qq_id", "from_qq", "to_qq", "target_qq")
+        if entry.get(field)
+    }
+
+
+class RechargeLogIndex:
+    """充值流水二级索引：按QQ、类型、日期
+
+    每个索引项是按写入顺序排列的流水号列表，查询时选最短的候选列表从新到旧遍历，
+    再用其余条件过滤，开销与结果规模相关，而不是与全部流水数量相关。
+    """
+
+    def __init__(self, logs: Mapping[str, dict]):
+        self.logs = logs
+        self.by_qq: Dict[str, List[str]] = defaultdict(list)
+        self.by_type: Dict[str, List[str]] = defaultdict(list)
+        self.by_day: Dict[str, List[str]] = defaultdict(list)
+
+    def add(self, log_id: str, entry: dict):
+        for qq_id in log_users(entry):
+            self.by_qq[qq_id].append(log_id)
+        self.by_type[log_type(entry)].append(log_id)
+        self.by_day[log_time(entry)[:10]].append(log_id)
+
+    def build(self, items: Iterable[Tuple[str, dict]]):
+        for log_id, entry in items:
+            self.add(log_id, entry)
+
+    def _days_desc(self, start_day: str, end_day: str) -> List[str]:
+        """索引中落在日期范围内的日期（从新到旧），只遍历有流水的日期，与查询范围跨度无关"""
+        return sorted((day for day in self.by_day if start_day <= day <= end_day), reverse=True)
+
+    def matches(self, qq_id: Optional[str] = None, type_name: Optional[str] = None,
+                start_day: Optional[str] = None, end_day: Optional[str] = None) -> Iterator[Tuple[str, dict]]:
+        """按条件遍历匹配的流水（从新到旧）"""
+        candidates = []
+        if qq_id is not None:
+            candidates.append((len(self.by_qq.get(qq_id, ())), "qq"))
+        if type_name is not None:
+            candidates.append((len(self.by_type.get(type_name, ())), "type"))
+        if start_day is not None:
+            days = self._days_desc(start_day, end_day)
+            candidates.append((sum(len(self.by_day[day]) for day in days), "day"))
+
+        if not candidates:
+            # 无过滤条件：流水字典本身按写入顺序排列
+            source = reversed(self.logs)
+        else:
+            _, smallest = min(candidates)
+            if smallest == "qq":
+                source = reversed(self.by_qq.get(qq_id, []))
+            elif smallest == "type":
+                source = reversed(self.by_type.get(type_name, []))
+            else:
+                source = (log_id for day in days for log_id in reversed(self.by_day[day]))
+
+        for log_id in source:
+            entry = self.logs.get(log_id)
+            if entry is None:
+                continue
+            if qq_id is not None and qq_id not in log_users(entry):
+                continue
+            if type_name is not None and log_type(entry) != type_name:
+                continue
+            if start_day is not None and not (start_day <= log_time(entry)[:10] <= end_day):
+                continue
+            yield log_id, entry
+
+    def query(self, qq_id: Optional[str] = None, type_name: Optional[str] = None,
+              start_day: Optional[str] = None, end_day: Optional[str] = None,
+              offset: int = 0, limit: int = 10) -> Tuple[List[Tuple[str, dict]], bool]:
+        """按条件查询流水（从新到旧），返回 (本页流水, 是否还有下一页)"""
+        page = list(islice(self.matches(qq_id, type_name, start_day, end_day), offset, offset + limit + 1))
+        return page[:limit], len(page) > limit
@@ -1,13 +1,33 @@
 import json
 import os
+import shutil
 import aiohttp
 import asyncio
 import random
+import re
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from itertools import islice
 from datetime import datetime, date, timedelta
 from typing import Optional, Dict, List
 from astrbot.api.event import filter, AstrMessageEvent
 from astrbot.api.star import Context, Star, register
 from astrbot.api import logger
+from .ledger import LogIdGenerator, RechargeLedger
+from .storage import SqliteStorage
+from .cache import MISSING, SingleFlight, TTLCache
+from .persistence import AsyncJsonWriter, atomic_write_json, atomic_write_text, snapshot_store
+from .concurrency import KeyedLock, WorkerPool
+from .log_index import LOG_TYPE_ALIASES, log_time
+from .log_archive import RechargeLogArchive
+from .sorted_index import USER_SORT_ALIASES, UserRankIndex
+from .records import UserPoints
+from .stats import STAT_FIELDS, add_stats, log_stats, rebuild_daily_stats
+from .resilience import AdaptiveTimeout, CircuitBreaker, CircuitOpenError, backoff_delays
+from .metrics import Metrics, timed_command
+from .balance_sync import BalanceSnapshot
 
 @register("game_bind", "aa932406", "游戏账号绑定与充值插件", "3.0.0")
 class GameBindPlugin(Star):
@@ -23,29 +43,108 @@ class GameBindPlugin(Star):
         self.points_file = os.path.join(self.data_dir, "user_points.json")
         self.sign_file = os.path.join(self.data_dir, "sign_records.json")
         self.admins_file = os.path.join(self.data_dir, "admins.json")
-        
-        # 加载数据
-        self.bindings = self._load_json(self.bind_file)
-        self.recharge_logs = self._load_json(self.recharge_file)
-        self.user_points = self._load_json(self.points_file)
-        self.sign_records = self._load_json(self.sign_file)
-        self.admins = self._load_json(self.admins_file)
-        
-        # 初始化默认管理员（如果文件为空）
-        self._initialize_admins()
+        self.stats_file = os.path.join(self.data_dir, "daily_stats.json")
+        self.metrics_file = os.path.join(self.data_dir, "metrics.prom")
+        self.balance_file = os.path.join(self.data_dir, "balance_snapshot.json")
+        self.ledger_file = os.path.join(self.data_dir, "recharge_ledger.jsonl")
+        self.log_archive_dir = os.path.join(self.data_dir, "recharge_logs")
+        self._store_files = {
+            "bindings": self.bind_file,
+            "user_points": self.points_file,
+            "sign_records": self.sign_file,
+            "admins": self.admins_file,
+            "daily_stats": self.stats_file
+        }
+        self.db_file = os.path.join(self.data_dir, "game_bind.db")
         
         # API配置
         self.api_config = {
             "base_url": "http://115.190.64.181:881/api/players.php",
-            "timeout": 30,
-            "qq_bot_secret": "ws7ecejjsznhtxurchknmdemax2fnp5d"
+            "timeout": 30,                  # 单次请求耗时硬上限（秒），自适应超时不会超过它
+            "qq_bot_secret": "ws7ecejjsznhtxurchknmdemax2fnp5d",
+            # 连接池
+            "pool": {
+                "limit": 100,               # 总连接数上限
+                "limit_per_host": 30,       # 单主机连接数上限
+                "dns_cache_ttl": 300,       # DNS缓存时间（秒）
+                "keepalive_timeout": 60     # 空闲连接保活时间（秒）
+            },
+            # 充值队列
+            "recharge_queue": {
+                "workers": 4,               # 同时调用充值API的最大数量
+                "max_depth": 200            # 最多排队的充值请求数，超出时直接提示繁忙
+            },
+            # 账号查询缓存
+            "cache": {
+                "max_size": 10000,          # 最多缓存账号数
+                "ttl": 60,                  # 查询成功结果缓存时间（秒）
+                "negative_ttl": 15          # 账号不存在结果缓存时间（秒）
+            },
+            # 熔断器：连续失败达到阈值后暂停调用API，冷却后放行一个试探请求
+            "breaker": {
+                "failure_threshold": 5,     # 连续失败多少次后熔断
+                "recovery_timeout": 30      # 熔断后多久开始试探（秒）
+            },
+            # 查询重试（仅 search 这类幂等请求，充值请求从不重试）
+            "retry": {
+                "attempts": 3,              # 最多尝试次数（含第一次）
+                "base_delay": 0.2,          # 退避基准时间（秒），每次翻倍并随机抖动
+                "max_delay": 2.0            # 单次退避上限（秒）
+            },
+            # 自适应超时：按各接口最近耗时的 p99 × factor 计算，限制在 [floor, ceiling] 内
+            "adaptive_timeout": {
+                "window": 500,              # 每个接口保留最近多少次耗时
+                "min_samples": 20,          # 样本不足时使用 ceiling
+                "factor": 3.0,
+                "connect": {"floor": 1.0, "ceiling": 5.0},     # 建立连接
+                "search": {"floor": 2.0, "ceiling": 10.0},     # 查询（等待响应）
+                "list": {"floor": 5.0, "ceiling": 30.0},       # 余额同步分页拉取玩家列表（单页数据量大）
+                "recharge": {"floor": 5.0, "ceiling": 30.0}    # 充值（结果不确定时代价高，留足余量）
+            },
+            # 绑定账号余额同步：后台分页遍历玩家列表，/查询账号 优先读取本地快照
+            "balance_sync": {
+                "interval": 300,            # 两轮同步的间隔（秒），0 表示不同步
+                "page_size": 500,           # 每页玩家数
+                "concurrency": 4,           # 同时请求的页数
+                "save_every": 20,           # 每完成多少页保存一次进度
+                "max_age": 900              # 快照超过多久（秒）不再使用，改为实时查询
+            }
         }
+        self.http_session: Optional[aiohttp.ClientSession] = None
+        self.account_cache = TTLCache(
+            max_size=self.api_config["cache"]["max_size"],
+            default_ttl=self.api_config["cache"]["ttl"]
+        )
+        self.api_flight = SingleFlight()
+        adaptive = self.api_config["adaptive_timeout"]
+        self.api_timeouts = {
+            action: AdaptiveTimeout(
+                adaptive[action]["floor"], adaptive[action]["ceiling"], factor=adaptive["factor"],
+                window=adaptive["window"], min_samples=adaptive["min_samples"]
+            )
+            for action in ("connect", "search", "list", "recharge")
+        }
+        # 余额快照在同步任务启动时读取，读取前查询一律走API
+        self.balance_snapshot: Optional[BalanceSnapshot] = None
+        self._balance_sync_task: Optional[asyncio.Task] = None
+        self.api_breaker = CircuitBreaker(
+            "游戏API",
+            failure_threshold=self.api_config["breaker"]["failure_threshold"],
+            recovery_timeout=self.api_config["breaker"]["recovery_timeout"]
+        )
+        # 后台同步单独熔断：分页请求失败不影响充值、查询、绑定等交互请求
+        self.sync_breaker = CircuitBreaker(
+            "余额同步",
+            failure_threshold=self.api_config["breaker"]["failure_threshold"],
+            recovery_timeout=self.api_config["breaker"]["recovery_timeout"]
+        )
         
         # 系统配置
         self.system_config = {
             # 积分系统
             "points": {
                 "recharge_ratio": 10000,  # 1积分=10000元宝
+                "bulk_grant_max": 5000,   # /批量添加积分 单次最多条数
                 # 签到奖励（积分）
                 "sign_rewards": {
                     1: 1,      # 第1天：1积分
@@ -58,29 +157,324 @@ class GameBindPlugin(Star):
                     14: 15,    # 第14天：15积分
                     30: 30     # 第30天：30积分
                 }
+            },
+            # 存储
+            "storage": {
+                "backend": "json",  # json：JSON文件 + 充值账本；sqlite：SQLite（WAL）数据库
+                # JSON文件延迟写入间隔（秒），即异常退出时最多丢失的数据时间窗口；0 表示每次修改立即写入
+                "flush_interval": 2.0
+            },
+            # 充值记录
+            "logs": {
+                "recent_size": 100,         # 内存中保留的最近流水条数（/充值记录 最多显示50条）
+                "cached_segments": 2        # JSON后端按月分段存档，查询历史月份时最多缓存的分段数
+            },
+            # 性能统计
+            "metrics": {
+                "export_interval": 60       # 写入 data/metrics.prom（Prometheus文本格式）的间隔（秒），0 表示不导出
             }
         }
+        # 命令、API调用与持久化的耗时统计
+        self.metrics = Metrics()
+        self._metrics_task: Optional[asyncio.Task] = None
+        self.log_ids = LogIdGenerator()
+        self._dirty_stores = set()
+        self._flush_task: Optional[asyncio.Task] = None
+        self._write_json_file = self.metrics.timed("persistence", "write_json", atomic_write_json)
+        self.json_writer = AsyncJsonWriter(self._write_json_file)
+        # 按QQ划分的积分锁：不同用户并行，同一用户的积分变动串行
+        self.user_locks = KeyedLock()
+        self.recharge_pool = WorkerPool(
+            workers=self.api_config["recharge_queue"]["workers"],
+            max_depth=self.api_config["recharge_queue"]["max_depth"]
+        )
+        
+        # 加载数据（JSON后端延迟加载：首次访问时同步加载，或由 initialize() 启动的后台任务预先加载）
+        self.db = None
+        self._in_db_transaction = False
+        self._loaded_stores = set()
+        self._preloaded_stores = {}
+        self._store_locks = {group: threading.Lock() for group in self._STORE_LABELS}
+        self._store_timings: Dict[str, Dict[str, float]] = {}
+        self._load_task: Optional[asyncio.Task] = None
+        if self.system_config["storage"]["backend"] == "sqlite":
+            self._load_sqlite_stores()
+            # 初始化默认管理员（如果文件为空）
+            self._initialize_admins()
+        
+        # 用户排序索引（/用户列表 首次按某种方式排序时建立）
+        self.user_rank = UserRankIndex(
+            self.db.user_points.iter_rows if self.db is not None else lambda: self.user_points.items()
+        )
         
         logger.info("✨ 游戏账号插件初始化完成！")
     
-    def _load_json(self, file_path: str) -> dict:
-        """加载JSON文件"""
+    # JSON后端延迟加载的属性 -> 所属数据组
+    _LAZY_ATTRS = {
+        "bindings": "bindings",
+        "account_index": "bindings",
+        "user_points": "user_points",
+        "sign_records": "sign_records",
+        "admins": "admins",
+        "recharge_ledger": "recharge_logs",
+        "recharge_logs": "recharge_logs",
+        "log_index": "recharge_logs",
+        "recent_logs": "recharge_logs",
+        "daily_stats": "daily_stats"
+    }
+    _STORE_LABELS = {
+        "admins": "管理员",
+        "bindings": "绑定数据",
+        "user_points": "用户积分",
+        "sign_records": "签到记录",
+        "recharge_logs": "充值流水",
+        "daily_stats": "每日统计"
+    }
+    
+    def __getattr__(self, name):
+        # 仅在实例上还没有该属性时调用：数据组尚未加载，在此同步加载
+        group = GameBindPlugin._LAZY_ATTRS.get(name)
+        if group is None or "_loaded_stores" not in self.__dict__:
+            raise AttributeError(name)
+        self._load_store(group)
+        self._install_store(group)
+        return self.__dict__[name]
+    
+    def _load_store(self, group: str):
+        """读取一组数据并建立索引，结果暂存待安装（不修改已有数据，可在线程中执行）"""
+        with self._store_locks[group]:
+            if group in self._loaded_stores or group in self._preloaded_stores:
+                return
+            timings = {"read": 0.0, "parse": 0.0, "index": 0.0}
+            if group == "recharge_logs":
+                # 充值流水按月分段：旧版 recharge_logs.json -> 单文件账本 -> 月份分段
+                RechargeLedger(self.ledger_file).migrate_from_json(self.recharge_file)
+                archive = RechargeLogArchive(
+                    self.log_archive_dir, cache_size=self.system_config["logs"]["cached_segments"]
+                )
+                archive.migrate_from_ledger(self.ledger_file)
+                archive.open(timings)
+                recent_size = self.system_config["logs"]["recent_size"]
+                attrs = {
+                    "recharge_ledger": archive,
+                    "recharge_logs": archive,
+                    "log_index": archive,
+                    "recent_logs": deque(reversed(archive.recent_ids(recent_size)), maxlen=recent_size)
+                }
+            else:
+                attrs = {group: self._load_json(self._store_files[group], timings)}
+                if group == "bindings":
+                    start = time.perf_counter()
+                    attrs["account_index"] = self._build_account_index(attrs["bindings"])
+                    timings["index"] += time.perf_counter() - start
+                elif group == "user_points":
+                    # 转为紧凑记录，计入解析耗时
+                    start = time.perf_counter()
+                    attrs["user_points"] = {
+                        qq_id: UserPoints.from_dict(record) for qq_id, record in attrs["user_points"].items()
+                    }
+                    timings["parse"] += time.perf_counter() - start
+            self._preloaded_stores[group] = (attrs, timings)
+    
+    def _install_store(self, group: str):
+        """在事件循环中启用已读取的数据组（已被同步加载过的组直接跳过）"""
+        if group in self._loaded_stores:
+            return
+        attrs, timings = self._preloaded_stores.pop(group)
+        self.__dict__.update(attrs)
+        self._loaded_stores.add(group)
+        self._store_timings[group] = timings
+        logger.info(
+            f"📂 已加载{self._STORE_LABELS[group]}：读取 {timings['read'] * 1000:.1f}ms，"
+            f"解析 {timings['parse'] * 1000:.1f}ms，建索引 {timings['index'] * 1000:.1f}ms"
+        )
+        if group == "admins":
+            # 初始化默认管理员（如果文件为空）
+            self._initialize_admins()
+    
+    async def _load_stores_background(self):
+        """后台依次加载所有数据组（读取与解析在线程中进行，不阻塞事件循环）"""
+        start = time.perf_counter()
+        for group in self._STORE_LABELS:
+            try:
+                await asyncio.to_thread(self._load_store, group)
+                self._install_store(group)
+            except Exception as e:
+                logger.error(f"📂 后台加载{self._STORE_LABELS[group]}失败，将在首次使用时重试: {e}")
+        total = {phase: sum(t[phase] for t in self._store_timings.values()) for phase in ("read", "parse", "index")}
+        logger.info(
+            f"🚀 数据加载完成，耗时 {(time.perf_counter() - start) * 1000:.1f}ms"
+            f"（读取 {total['read'] * 1000:.1f}ms，解析 {total['parse'] * 1000:.1f}ms，建索引 {total['index'] * 1000:.1f}ms）"
+        )
+    
+    def _load_sqlite_stores(self):
+        """打开SQLite数据库，首次使用时导入已有的JSON数据"""
+        self.db = SqliteStorage(self.db_file)
+        if self.db.needs_json_import():
+            RechargeLedger(self.ledger_file).migrate_from_json(self.recharge_file)
+            archive = RechargeLogArchive(self.log_archive_dir)
+            archive.migrate_from_ledger(self.ledger_file)
+            archive.open()
+            self.db.import_json(
+                bindings=self._load_json(self.bind_file),
+                user_points=self._load_json(self.points_file),
+                sign_records=self._load_json(self.sign_file),
+                recharge_logs=dict(archive.items()),
+                admins=self._load_json(self.admins_file),
+                daily_stats=self._load_json(self.stats_file)
+            )
+            archive.close()
+        
+        self.recharge_ledger = None
+        self.bindings = self.db.bindings
+        self.recharge_logs = self.db.recharge_logs
+        self.log_index = self.db.recharge_logs
+        self.user_points = self.db.user_points
+        self.sign_records = self.db.sign_records
+        self.daily_stats = self.db.daily_stats
+        self.admins = self.db.load_admins()
+        recent_size = self.system_config["logs"]["recent_size"]
+        self.recent_logs = deque(reversed(self.db.recharge_logs.recent_ids(recent_size)), maxlen=recent_size)
+    
+    def _load_json(self, file_path: str, timings: Optional[Dict[str, float]] = None) -> dict:
+        """加载JSON文件（文件损坏时先备份原文件，避免之后被空数据覆盖）
+
+        传入 timings 时把读取、解析耗时分别累加到 "read"、"parse"。
+        """
+        if not os.path.exists(file_path):
+            return {}
         try:
-            if os.path.exists(file_path):
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    return json.load(f)
+            start = time.perf_counter()
+            with open(file_path, 'rb') as f:
+                raw = f.read()
+            read_done = time.perf_counter()
+            data = json.loads(raw)
+            if timings is not None:
+                timings["read"] += read_done - start
+                timings["parse"] += time.perf_counter() - read_done
+            return data
         except Exception as e:
-            logger.error(f"📂 加载文件失败 {file_path}: {e}")
+            backup_path = f"{file_path}.corrupt-{datetime.now().strftime('%Y%m%d%H%M%S')}"
+            try:
+                shutil.copy2(file_path, backup_path)
+                logger.error(f"📂 加载文件失败 {file_path}: {e}，原文件已备份为 {backup_path}")
+            except Exception as copy_error:
+                logger.error(f"📂 加载文件失败 {file_path}: {e}，备份原文件也失败: {copy_error}")
         return {}
     
     def _save_json(self, file_path: str, data: dict):
-        """保存JSON文件"""
+        """保存JSON文件（原子替换）"""
         try:
-            with open(file_path, 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
+            self._write_json_file(file_path, data)
         except Exception as e:
             logger.error(f"💾 保存文件失败 {file_path}: {e}")
     
+    def _persist(self, store: str):
+        """持久化指定数据（JSON后端标记为待写入由后台定时写盘，SQLite后端提交事务）"""
+        if self.db is not None:
+            if store == "admins":
+                self.db.save_admins(self.admins)
+            self._commit_db()
+            return
+        
+        if self._flush_task is None:
+            # 未启用延迟写入（或后台任务尚未启动）时立即写入
+            self._write_store(store)
+        else:
+            self._dirty_stores.add(store)
+    
+    def _write_store(self, store: str):
+        """将指定数据整文件写入JSON（事件循环运行后交给写盘线程，不阻塞事件循环）"""
+        with self.metrics.measure("persistence", "snapshot"):
+            data = snapshot_store(getattr(self, store))
+        if self.json_writer.running:
+            self.json_writer.submit(self._store_files[store], data)
+        else:
+            self._save_json(self._store_files[store], data)
+    
+    def _new_log_id(self, prefix: str, qq_id: str) -> str:
+        """生成不重复的流水号（P:充值 G:赠送充值 T:积分转移 A:管理员添加）"""
+        log_id = self.log_ids.next_id(prefix, qq_id)
+        while log_id in self.recharge_logs:
+            log_id = self.log_ids.next_id(prefix, qq_id)
+        return log_id
+    
+    def _append_recharge_log(self, log_id: str, entry: dict):
+        """记录一条充值/转移/管理员操作流水（追加写入账本）"""
+        self._append_recharge_logs([(log_id, entry)])
+    
+    def _append_recharge_logs(self, items: List[tuple]):
+        """批量记录流水：每日统计合并累加，账本一次追加、一次落盘（SQLite一次提交）"""
+        day_increments: Dict[str, dict] = {}
+        for log_id, entry in items:
+            self.recent_logs.append(log_id)
+            add_stats(day_increments, log_time(entry)[:10], log_stats(entry))
+        for day, increments in day_increments.items():
+            self._record_stats(day, increments)
+        try:
+            if self.db is not None:
+                for log_id, entry in items:
+                    self.recharge_logs[log_id] = entry
+                self._commit_db()
+                return
+            # 写入当月分段（内存立即可见），写盘交给写盘线程
+            self.recharge_ledger.add_batch(items)
+            if self.json_writer.running:
+                self.json_writer.run(self._flush_ledger)
+            else:
+                self._flush_ledger()
+        except Exception as e:
+            if self._in_db_transaction:
+                # 事务中交给 _db_transaction 回滚，不能只留下积分变动
+                raise
+            first_id = items[0][0] if items else ""
+            logger.error(f"💾 写入充值记录失败 {first_id}{f' 等 {len(items)} 条' if len(items) > 1 else ''}: {e}")
+    
+    def _flush_ledger(self):
+        """把账本中待写入的流水落盘（通常在写盘线程中执行）"""
+        with self.metrics.measure("persistence", "ledger_flush"):
+            self.recharge_ledger.flush()
+    
+    def _commit_db(self):
+        """提交SQLite事务（处于 _db_transaction() 中时推迟到结束时统一提交）"""
+        if self._in_db_transaction:
+            return
+        with self.metrics.measure("persistence", "sqlite_commit"):
+            self.db.commit()
+    
+    @contextmanager
+    def _db_transaction(self):
+        """SQLite后端：代码块内的全部写入合并为一个事务提交，出错时整体回滚（JSON后端不受影响）"""
+        if self.db is None or self._in_db_transaction:
+            yield
+            return
+        self._in_db_transaction = True
+        try:
+            yield
+        except Exception:
+            self.db.rollback()
+            self._reset_after_rollback()
+            raise
+        finally:
+            self._in_db_transaction = False
+        self._commit_db()
+    
+    def _reset_after_rollback(self):
+        """事务回滚后丢弃按未提交数据更新过的内存索引：排序索引下次使用时重建，最近流水从数据库重新读取"""
+        self.user_rank.reset()
+        recent_size = self.system_config["logs"]["recent_size"]
+        self.recent_logs = deque(reversed(self.db.recharge_logs.recent_ids(recent_size)), maxlen=recent_size)
+    
+    def _record_stats(self, day: str, increments: Dict[str, int]):
+        """累加每日统计"""
+        try:
+            add_stats(self.daily_stats, day, increments)
+            self._persist("daily_stats")
+        except Exception as e:
+            if self._in_db_transaction:
+                raise
+            logger.error(f"📊 更新每日统计失败 {day}: {e}")
+    
     def _get_user_id(self, event: AstrMessageEvent) -> str:
         """获取用户ID"""
         qq_id = ""
@@ -109,7 +503,7 @@ class GameBindPlugin(Star):
                 "last_updated": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
                 "initialized": True
             }
-            self._save_json(self.admins_file, self.admins)
+            self._persist("admins")
             logger.info("📝 初始化管理员系统完成")
     
     def _is_admin(self, qq_id: str) -> bool:
@@ -122,7 +516,7 @@ class GameBindPlugin(Star):
         if str(qq_id) not in self.admins.get("admin_qq_ids", []):
             self.admins.setdefault("admin_qq_ids", []).append(str(qq_id))
             self.admins["last_updated"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            self._save_json(self.admins_file, self.admins)
+            self._persist("admins")
             logger.info(f"👑 添加管理员：{qq_id}")
             return True
         return False
@@ -132,100 +526,203 @@ class GameBindPlugin(Star):
         if str(qq_id) in self.admins.get("admin_qq_ids", []):
             self.admins["admin_qq_ids"] = [admin for admin in self.admins["admin_qq_ids"] if str(admin) != str(qq_id)]
             self.admins["last_updated"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            self._save_json(self.admins_file, self.admins)
+            self._persist("admins")
             logger.info(f"🗑️ 移除管理员：{qq_id}")
             return True
         return False
     
     def _is_account_already_bound(self, game_account: str, exclude_qq: str = None) -> tuple:
         """检查游戏账号是否已被绑定"""
-        for qq_id, bind_info in self.bindings.items():
-            if bind_info.get("game_account") == game_account:
+        if self.db is not None:
+            for qq_id in self.db.bindings.find_by_game_account(game_account):
                 if exclude_qq and qq_id == exclude_qq:
                     continue
-                return True, qq_id, bind_info
-        return False, None, None
+                return True, qq_id, self.bindings[qq_id]
+            return False, None, None
+        
+        bound_qq = self.account_index.get(game_account)
+        if bound_qq is None or (exclude_qq and bound_qq == exclude_qq):
+            return False, None, None
+        return True, bound_qq, self.bindings[bound_qq]
+    
+    def _bind_conflict(self, qq_id: str, game_account: str) -> Optional[str]:
+        """绑定前检查：QQ已绑定或账号已被其他QQ绑定时返回提示文本，可以绑定时返回 None"""
+        if qq_id in self.bindings:
+            old_account = self.bindings[qq_id]["game_account"]
+            bind_time = self.bindings[qq_id]["bind_time"]
+            return f"⚠️ 已绑定账号\n当前绑定：{old_account}\n绑定时间：{bind_time}\n\n如需更换账号：\n1. 先使用 /解绑账号\n2. 再重新绑定新账号"
+        
+        is_bound, bound_qq, bind_info = self._is_account_already_bound(game_account)
+        if is_bound:
+            return f"❌ 账号已被绑定\n游戏账号：{game_account}\n已被QQ：{bound_qq} 绑定\n绑定时间：{bind_info.get('bind_time', '未知')}"
+        return None
+    
+    def _rebuild_account_index(self):
+        """重建 游戏账号 -> QQ 反向索引（JSON后端）"""
+        self.account_index = self._build_account_index(self.bindings)
+    
+    @staticmethod
+    def _build_account_index(bindings: dict) -> dict:
+        account_index = {}
+        for qq_id, bind_info in bindings.items():
+            # 历史数据中若有重复绑定，保持与遍历查找一致：先出现的优先
+            account_index.setdefault(bind_info.get("game_account"), qq_id)
+        return account_index
+    
+    def _index_binding(self, game_account: str, qq_id: str):
+        """登记绑定关系到反向索引"""
+        if self.db is None:
+            self.account_index[game_account] = qq_id
+    
+    def _unindex_binding(self, game_account: str, qq_id: str):
+        """从反向索引移除绑定关系"""
+        if self.db is None and self.account_index.get(game_account) == qq_id:
+            del self.account_index[game_account]
     
     def _get_user_points(self, qq_id: str) -> Dict:
         """获取用户积分信息"""
         if qq_id not in self.user_points:
-            self.user_points[qq_id] = {
-                "points": 0,          # 当前积分（元宝余额）
-                "total_earned": 0,    # 累计获得积分
-                "total_spent": 0,     # 累计消耗积分
-                "first_sign_date": None,
-                "last_sign_date": None,
-                "continuous_days": 0
-            }
+            # 字段：points 当前积分、total_earned 累计获得、total_spent 累计消耗、
+            # first_sign_date / last_sign_date 首次/上次签到日期、continuous_days 连续签到天数
+            self.user_points[qq_id] = UserPoints()
+            self.user_rank.update(qq_id, self.user_points[qq_id])
         return self.user_points[qq_id]
     
     def _update_user_points(self, qq_id: str, points_data: Dict):
         """更新用户积分信息"""
         self.user_points[qq_id] = points_data
-        self._save_json(self.points_file, self.user_points)
+        self.user_rank.update(qq_id, points_data)
+        self._persist("user_points")
     
     def _transfer_points(self, from_qq: str, to_qq: str, points: int, reason: str = "") -> tuple:
-        """转移积分"""
+        """转移积分（调用方需通过 user_locks 同时持有双方的锁）"""
         if from_qq not in self.user_points:
             return False, "源用户不存在"
         if to_qq not in self.user_points:
             return False, "目标用户不存在"
         
-        if self.user_points[from_qq]["points"] < points:
+        from_points = self.user_points[from_qq]
+        to_points = self.user_points[to_qq]
+        if from_points["points"] < points:
             return False, "积分不足"
         
-        # 执行转移
-        self.user_points[from_qq]["points"] -= points
-        self.user_points[from_qq]["total_spent"] += points
-        
-        self.user_points[to_qq]["points"] += points
-        self.user_points[to_qq]["total_earned"] += points
+        # 执行转移（重新赋值以兼容SQLite后端）
+        from_points["points"] -= points
+        from_points["total_spent"] += points
         
-        self._save_json(self.points_file, self.user_points)
+        to_points["points"] += points
+        to_points["total_earned"] += points
         
-        # 记录转移日志
-        transfer_id = f"T{datetime.now().strftime('%Y%m%d%H%M%S')}_{from_qq}"
-        self.recharge_logs[transfer_id] = {
-            "type": "points_transfer",
-            "from_qq": from_qq,
-            "to_qq": to_qq,
-            "points": points,
-            "reason": reason,
-            "transfer_time": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        }
-        self._save_json(self.recharge_file, self.recharge_logs)
+        # 双方积分、转移日志与每日统计在同一个事务中提交
+        with self._db_transaction():
+            self.user_points[from_qq] = from_points
+            self.user_points[to_qq] = to_points
+            self.user_rank.update(from_qq, from_points)
+            self.user_rank.update(to_qq, to_points)
+            self._persist("user_points")
+            
+            # 记录转移日志
+            transfer_id = self._new_log_id("T", from_qq)
+            self._append_recharge_log(transfer_id, {
+                "type": "points_transfer",
+                "from_qq": from_qq,
+                "to_qq": to_qq,
+                "points": points,
+                "reason": reason,
+                "transfer_time": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            })
         
         return True, "转移成功"
     
     def _add_points_to_user(self, qq_id: str, points: int, reason: str = "") -> tuple:
-        """给用户添加积分（管理员功能）"""
+        """给用户添加积分（管理员功能，调用方需持有该用户的锁）"""
         if qq_id not in self.user_points:
             return False, "用户不存在"
         
-        # 添加积分
-        self.user_points[qq_id]["points"] += points
-        self.user_points[qq_id]["total_earned"] += points
-        
-        self._save_json(self.points_file, self.user_points)
-        
-        # 记录管理员操作
-        admin_action_id = f"A{datetime.now().strftime('%Y%m%d%H%M%S')}_{qq_id}"
-        self.recharge_logs[admin_action_id] = {
-            "type": "admin_add_points",
-            "target_qq": qq_id,
-            "points": points,
-            "reason": reason,
-            "action_time": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        }
-        self._save_json(self.recharge_file, self.recharge_logs)
-        
+        self._add_points_batch([(qq_id, points, reason)])
         return True, "添加成功"
     
+    def _add_points_batch(self, grants: List[tuple]):
+        """批量给用户添加积分：grants 为已校验的 (QQ, 积分, 备注)，积分只持久化一次，流水一次写入
+        
+        调用方需持有全部目标用户的锁。
+        """
+        action_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        entries = []
+        # 积分、每日统计与流水在同一个事务中提交，中途崩溃不会只留下积分变动而丢失流水
+        with self._db_transaction():
+            for qq_id, points, reason in grants:
+                user_points = self.user_points[qq_id]
+                user_points["points"] += points
+                user_points["total_earned"] += points
+                
+                # 重新赋值以兼容SQLite后端
+                self.user_points[qq_id] = user_points
+                self.user_rank.update(qq_id, user_points)
+                
+                # 记录管理员操作
+                entries.append((self._new_log_id("A", qq_id), {
+                    "type": "admin_add_points",
+                    "target_qq": qq_id,
+                    "points": points,
+                    "reason": reason,
+                    "action_time": action_time
+                }))
+            
+            self._persist("user_points")
+            self._append_recharge_logs(entries)
+    
+    def _flush_dirty_stores(self):
+        """写入所有待写入的数据，每个文件只写一次"""
+        while self._dirty_stores:
+            self._write_store(self._dirty_stores.pop())
+    
+    async def _flush_loop(self, interval: float):
+        """后台定时写盘任务"""
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                self._flush_dirty_stores()
+            except Exception as e:
+                logger.error(f"💾 定时写盘失败: {e}")
+    
+    def _export_metrics(self):
+        """把性能统计写入 Prometheus 文本文件（渲染在事件循环中，写文件交给写盘线程）"""
+        text = self.metrics.render_prometheus()
+        if self.json_writer.running:
+            self.json_writer.run(atomic_write_text, self.metrics_file, text)
+        else:
+            atomic_write_text(self.metrics_file, text)
+    
+    async def _metrics_loop(self, interval: float):
+        """后台定时导出性能统计"""
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                self._export_metrics()
+            except Exception as e:
+                logger.error(f"📈 导出性能统计失败: {e}")
+    
     async def initialize(self):
+        self._get_http_session()
+        self.recharge_pool.start()
+        self.json_writer.start()
+        flush_interval = self.system_config["storage"]["flush_interval"]
+        if self.db is None and flush_interval > 0:
+            self._flush_task = asyncio.create_task(self._flush_loop(flush_interval))
+        if self.db is None:
+            self._load_task = asyncio.create_task(self._load_stores_background())
+        export_interval = self.system_config["metrics"]["export_interval"]
+        if export_interval > 0:
+            self._metrics_task = asyncio.create_task(self._metrics_loop(export_interval))
+        sync_interval = self.api_config["balance_sync"]["interval"]
+        if sync_interval > 0:
+            self._balance_sync_task = asyncio.create_task(self._balance_sync_loop(sync_interval))
         logger.info("🚀 游戏账号插件已启动！")
     
     # ========== 帮助功能 ==========
     @filter.command("帮助")
+    @timed_command
     async def help_cmd(self, event: AstrMessageEvent):
         """显示帮助信息"""
         qq_id = self._get_user_id(event)
@@ -236,9 +733,11 @@ class GameBindPlugin(Star):
 📌 常用命令：
 • /绑定账号 <游戏账号>     # 绑定游戏账号
 • /我的积分               # 查看积分余额
+• /我的记录 [页码]        # 查看积分流水
 • /签到                  # 每日签到获得积分
+• /排行榜 [points|earned|streak] [数量]  # 查看积分/累计获得/连续签到排行
 • /积分充值 <积分数量>    # 用积分充值游戏
-• /查询账号 [账号]        # 查看账号信息
+• /查询账号 [账号] [刷新]  # 查看账号信息（加"刷新"实时查询余额）
 
 💰 积分相关：
 • /赠送积分 <QQ> <积分> [备注]  # 赠送积分给他人
@@ -247,18 +746,23 @@ class GameBindPlugin(Star):
 🔧 其他命令：
 • /修改绑定 <新账号>      # 修改绑定账号
 • /解绑账号              # 解绑当前账号
-• /测试连接              # 测试API连接"""
+• /测试连接              # 测试API连接（含熔断器状态）"""
         
         if is_admin:
             help_text += """
 
 👑 管理员命令：
 • /添加积分 <QQ> <积分> [备注]  # 给用户添加积分
+• /批量添加积分 [备注|file=文件名]  # 批量添加积分（之后每行一条：QQ 积分 [备注]）
 • /添加管理员 <QQ>         # 添加管理员
 • /移除管理员 <QQ>         # 移除管理员
 • /管理员列表             # 查看管理员列表
-• /用户列表 [页码]        # 查看所有用户
-• /充值记录 [数量]        # 查看充值记录
+• /用户列表 [排序] [页码|after=游标]  # 查看所有用户（排序：points/earned/streak/qq）
+• /充值记录 [数量] [qq=QQ] [type=类型] [日期..日期] [page=页码]  # 查看/筛选充值记录
+• /缓存统计              # 查看账号查询缓存
+• /充值队列              # 查看充值队列状态
+• /性能                  # 查看命令/API/写盘耗时统计
+• /统计 [天数]            # 查看每日运营统计（/统计 重建：根据历史数据重建）
 • /设置初始管理员 <QQ>    # 设置初始管理员（仅第一次使用）"""
         else:
             help_text += """
@@ -277,6 +781,7 @@ class GameBindPlugin(Star):
     
     # ========== 设置初始管理员功能 ==========
     @filter.command("设置初始管理员")
+    @timed_command
     async def set_initial_admin_cmd(self, event: AstrMessageEvent):
         """设置初始管理员（第一次使用时设置）"""
         parts = event.message_str.strip().split()
@@ -321,6 +826,7 @@ class GameBindPlugin(Star):
     
     # ========== 绑定功能 ==========
     @filter.command("绑定账号")
+    @timed_command
     async def bind_account_cmd(self, event: AstrMessageEvent):
         """绑定PHP游戏账号"""
         parts = event.message_str.strip().split()
@@ -335,38 +841,42 @@ class GameBindPlugin(Star):
             yield event.plain_result("❌ 身份验证失败，无法获取QQ信息")
             return
         
-        # 检查此QQ是否已绑定
-        if qq_id in self.bindings:
-            old_account = self.bindings[qq_id]["game_account"]
-            bind_time = self.bindings[qq_id]["bind_time"]
-            yield event.plain_result(f"⚠️ 已绑定账号\n当前绑定：{old_account}\n绑定时间：{bind_time}\n\n如需更换账号：\n1. 先使用 /解绑账号\n2. 再重新绑定新账号")
-            return
-        
-        # 检查账号是否已被绑定
-        is_bound, bound_qq, bind_info = self._is_account_already_bound(game_account)
-        if is_bound:
-            yield event.plain_result(f"❌ 账号已被绑定\n游戏账号：{game_account}\n已被QQ：{bound_qq} 绑定\n绑定时间：{bind_info.get('bind_time', '未知')}")
-            return
-        
-        # 验证账号是否存在
-        try:
-            account_info = await self._get_account_info(game_account)
-            if not account_info:
-                yield event.plain_result(f"❌ 账号不存在\n游戏账号：{game_account}\n在系统中未找到此账号")
+        # 同一QQ、同一游戏账号的绑定操作串行执行，验证账号期间不会被其他绑定抢先
+        async with self.user_locks.acquire(qq_id, f"account:{game_account}"):
+            conflict = self._bind_conflict(qq_id, game_account)
+            if conflict:
+                yield event.plain_result(conflict)
                 return
-        except Exception as e:
-            logger.error(f"验证游戏账号失败: {e}")
-            yield event.plain_result("❌ 验证失败，网络连接异常，请稍后重试")
-            return
-        
-        # 保存绑定
-        self.bindings[qq_id] = {
-            "game_account": game_account,
-            "account_name": account_info.get("passport", game_account),
-            "bind_time": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-            "qq_id": qq_id
-        }
-        self._save_json(self.bind_file, self.bindings)
+            
+            # 验证账号是否存在
+            try:
+                account_info = await self._get_account_info(game_account)
+                if not account_info:
+                    yield event.plain_result(f"❌ 账号不存在\n游戏账号：{game_account}\n在系统中未找到此账号")
+                    return
+            except CircuitOpenError as e:
+                yield event.plain_result(f"❌ 验证失败，{e}")
+                return
+            except Exception as e:
+                logger.error(f"验证游戏账号失败: {e}")
+                yield event.plain_result("❌ 验证失败，网络连接异常，请稍后重试")
+                return
+            
+            # 等待API期间绑定关系可能已变化，写入前再检查一次（之后到写入完成之间没有 await）
+            conflict = self._bind_conflict(qq_id, game_account)
+            if conflict:
+                yield event.plain_result(conflict)
+                return
+            
+            # 保存绑定
+            self.bindings[qq_id] = {
+                "game_account": game_account,
+                "account_name": account_info.get("passport", game_account),
+                "bind_time": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                "qq_id": qq_id
+            }
+            self._index_binding(game_account, qq_id)
+            self._persist("bindings")
         
         account_name = account_info.get("passport", game_account)
         content = f"""✅ 绑定成功！
@@ -380,6 +890,7 @@ class GameBindPlugin(Star):
     
     # ========== 我的积分功能 ==========
     @filter.command("我的积分")
+    @timed_command
     async def my_points_cmd(self, event: AstrMessageEvent):
         """查看我的积分"""
         qq_id = self._get_user_id(event)
@@ -410,71 +921,153 @@ class GameBindPlugin(Star):
         
         yield event.plain_result(content)
     
-    # ========== 签到功能 ==========
-    @filter.command("签到")
-    async def sign_cmd(self, event: AstrMessageEvent):
-        """每日签到获得积分"""
+    @filter.command("排行榜")
+    @timed_command
+    async def leaderboard_cmd(self, event: AstrMessageEvent):
+        """查看排行榜"""
         qq_id = self._get_user_id(event)
         
-        if qq_id == "unknown":
-            yield event.plain_result("❌ 身份验证失败，无法获取QQ信息")
-            return
+        sort = "points"
+        top_n = 10
+        for token in event.message_str.strip().split()[1:]:
+            if token.isdigit():
+                top_n = min(max(int(token), 1), 50)
+            elif USER_SORT_ALIASES.get(token) in UserRankIndex.FIELDS:
+                sort = USER_SORT_ALIASES[token]
+            else:
+                yield event.plain_result("❌ 参数错误\n正确格式：/排行榜 [points|earned|streak] [数量]\n例如：/排行榜 streak 20")
+                return
         
-        today = date.today().isoformat()
+        board_titles = {
+            "points": ("积分排行榜", "积分"),
+            "total_earned": ("累计获得排行榜", "积分"),
+            "continuous_days": ("连续签到排行榜", "天")
+        }
+        title, unit = board_titles[sort]
+        medals = {1: "🥇", 2: "🥈", 3: "🥉"}
+        
+        entries = self.user_rank.top(sort, top_n)
+        content = f"🏆 {title}（前 {top_n} 名）\n--------------------------"
+        if not entries:
+            content += "\n暂无上榜用户"
+        for rank, qq, value in entries:
+            content += f"\n{medals.get(rank, f'{rank}.')} {qq}  {value} {unit}"
+        
+        if qq_id != "unknown" and qq_id in self.user_points:
+            my_rank = self.user_rank.rank(sort, qq_id)
+            my_value = self.user_rank.value(sort, qq_id)
+            if my_value > 0:
+                content += f"\n\n📍 我的排名：第 {my_rank} 名（{my_value} {unit}）"
+            else:
+                content += "\n\n📍 我的排名：暂未上榜"
         
-        # 检查是否已签到
-        if qq_id in self.sign_records and self.sign_records[qq_id].get("last_sign") == today:
-            user_points = self._get_user_points(qq_id)
-            yield event.plain_result(f"⏳ 今日已签到\n签到时间：今天\n下次签到：明天\n当前积分：{user_points['points']} 积分")
-            return
+        yield event.plain_result(content)
+    
+    @filter.command("我的记录")
+    @timed_command
+    async def my_logs_cmd(self, event: AstrMessageEvent):
+        """查看自己的积分流水"""
+        qq_id = self._get_user_id(event)
         
-        user_points = self._get_user_points(qq_id)
+        if qq_id == "unknown":
+            yield event.plain_result("❌ 身份验证失败，无法获取QQ信息")
+            return
         
-        # 计算连续天数
-        yesterday = (date.today() - timedelta(days=1)).isoformat()
-        if user_points["last_sign_date"] == yesterday:
-            user_points["continuous_days"] += 1
-        elif user_points["last_sign_date"] != today:
-            user_points["continuous_days"] = 1
+        parts = event.message_str.strip().split()
+        page = 1
+        if len(parts) >= 2 and parts[1].isdigit():
+            page = max(int(parts[1]), 1)
         
-        # 计算签到奖励（积分）
-        continuous_days = user_points["continuous_days"]
+        page_size = 10
+        logs, has_more = self.log_index.query(qq_id=qq_id, offset=(page - 1) * page_size, limit=page_size)
         
-        # 基础奖励
-        base_reward = 1  # 默认1积分
+        content = f"""📜 我的积分流水
+
+第 {page} 页：
+--------------------------"""
         
-        # 特殊天数奖励
-        for day, reward in self.system_config["points"]["sign_rewards"].items():
-            if continuous_days == day:
-                base_reward = reward
-                break
+        if not logs:
+            content += "\n暂无记录"
         else:
-            # 如果不在特殊天数列表中，使用连续天数作为奖励（最高10积分）
-            base_reward = min(continuous_days, 10)
-        
-        total_reward = base_reward
+            for i, (log_id, log) in enumerate(logs, (page - 1) * page_size + 1):
+                content += self._format_log_entry(i, log)
         
-        # 更新积分
-        user_points["points"] += total_reward
-        user_points["total_earned"] += total_reward
-        user_points["last_sign_date"] = today
+        if has_more:
+            content += f"\n\n📄 下一页：/我的记录 {page + 1}"
         
-        if not user_points["first_sign_date"]:
-            user_points["first_sign_date"] = today
-        
-        self._update_user_points(qq_id, user_points)
+        yield event.plain_result(content)
+    
+    # ========== 签到功能 ==========
+    @filter.command("签到")
+    @timed_command
+    async def sign_cmd(self, event: AstrMessageEvent):
+        """每日签到获得积分"""
+        qq_id = self._get_user_id(event)
         
-        # 保存签到记录
-        self.sign_records[qq_id] = {
-            "last_sign": today,
-            "reward": total_reward,
-            "continuous_days": continuous_days
-        }
-        self._save_json(self.sign_file, self.sign_records)
+        if qq_id == "unknown":
+            yield event.plain_result("❌ 身份验证失败，无法获取QQ信息")
+            return
         
-        # 构建响应
-        recharge_ratio = self.system_config["points"]["recharge_ratio"]
-        content = f"""✨ 签到成功！
+        # 同一用户的积分变动串行执行
+        async with self.user_locks.acquire(qq_id):
+            today = date.today().isoformat()
+            
+            # 检查是否已签到
+            if qq_id in self.sign_records and self.sign_records[qq_id].get("last_sign") == today:
+                user_points = self._get_user_points(qq_id)
+                yield event.plain_result(f"⏳ 今日已签到\n签到时间：今天\n下次签到：明天\n当前积分：{user_points['points']} 积分")
+                return
+            
+            user_points = self._get_user_points(qq_id)
+            
+            # 计算连续天数
+            yesterday = (date.today() - timedelta(days=1)).isoformat()
+            if user_points["last_sign_date"] == yesterday:
+                user_points["continuous_days"] += 1
+            elif user_points["last_sign_date"] != today:
+                user_points["continuous_days"] = 1
+            
+            # 计算签到奖励（积分）
+            continuous_days = user_points["continuous_days"]
+            
+            # 基础奖励
+            base_reward = 1  # 默认1积分
+            
+            # 特殊天数奖励
+            for day, reward in self.system_config["points"]["sign_rewards"].items():
+                if continuous_days == day:
+                    base_reward = reward
+                    break
+            else:
+                # 如果不在特殊天数列表中，使用连续天数作为奖励（最高10积分）
+                base_reward = min(continuous_days, 10)
+            
+            total_reward = base_reward
+            
+            # 更新积分
+            user_points["points"] += total_reward
+            user_points["total_earned"] += total_reward
+            user_points["last_sign_date"] = today
+            
+            if not user_points["first_sign_date"]:
+                user_points["first_sign_date"] = today
+            
+            # 积分、签到记录与每日统计在同一个事务中提交
+            with self._db_transaction():
+                self._update_user_points(qq_id, user_points)
+                
+                # 保存签到记录
+                self.sign_records[qq_id] = {
+                    "last_sign": today,
+                    "reward": total_reward,
+                    "continuous_days": continuous_days
+                }
+                self._persist("sign_records")
+                self._record_stats(today, {"sign_count": 1, "sign_points": total_reward})
+            
+            # 构建响应
+            recharge_ratio = self.system_config["points"]["recharge_ratio"]
+            content = f"""✨ 签到成功！
 
 获得积分：{total_reward} 积分
 连续签到：{continuous_days} 天
@@ -486,11 +1079,12 @@ class GameBindPlugin(Star):
 • 总可兑换：{user_points['points'] * recharge_ratio:,} 元宝
 
 ⏰ 签到时间：{datetime.now().strftime('%Y-%m-%d %H:%M')}"""
-        
-        yield event.plain_result(content)
+            
+            yield event.plain_result(content)
     
     # ========== 积分充值功能 ==========
     @filter.command("积分充值")
+    @timed_command
     async def points_recharge_cmd(self, event: AstrMessageEvent):
         """使用积分充值游戏账号"""
         parts = event.message_str.strip().split()
@@ -518,46 +1112,64 @@ class GameBindPlugin(Star):
             yield event.plain_result("❌ 未绑定账号\n请先绑定游戏账号\n使用命令：/绑定账号 <游戏账号>")
             return
         
-        user_points = self._get_user_points(qq_id)
-        
-        if user_points["points"] < points_to_use:
-            yield event.plain_result(f"❌ 积分不足\n需要积分：{points_to_use}\n当前积分：{user_points['points']}\n\n💡 获取积分：每日签到，多签多得")
-            return
-        
-        # 计算充值金额（1积分=10000元宝）
-        recharge_ratio = self.system_config["points"]["recharge_ratio"]
-        recharge_amount = points_to_use * recharge_ratio
-        
-        game_account = self.bindings[qq_id]["game_account"]
-        account_name = self.bindings[qq_id].get("account_name", game_account)
-        
-        # 执行充值
-        try:
-            result = await self._execute_account_recharge(game_account, recharge_amount, remark)
+        # 持锁完成 检查余额 -> 调用充值API -> 扣减积分，防止并发重复消费
+        async with self.user_locks.acquire(qq_id):
+            user_points = self._get_user_points(qq_id)
             
-            if result.get("success"):
-                # 扣减积分
-                user_points["points"] -= points_to_use
-                user_points["total_spent"] += points_to_use
-                self._update_user_points(qq_id, user_points)
-                
-                # 记录充值日志
-                recharge_id = f"P{datetime.now().strftime('%Y%m%d%H%M%S')}_{qq_id}"
-                self.recharge_logs[recharge_id] = {
-                    "qq_id": qq_id,
-                    "game_account": game_account,
-                    "account_name": account_name,
-                    "points_used": points_to_use,
-                    "recharge_amount": recharge_amount,
-                    "remark": remark,
-                    "recharge_time": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                    "api_response": result
-                }
-                self._save_json(self.recharge_file, self.recharge_logs)
-                
-                response_data = result.get("data", {})
+            if user_points["points"] < points_to_use:
+                yield event.plain_result(f"❌ 积分不足\n需要积分：{points_to_use}\n当前积分：{user_points['points']}\n\n💡 获取积分：每日签到，多签多得")
+                return
+            
+            # 计算充值金额（1积分=10000元宝）
+            recharge_ratio = self.system_config["points"]["recharge_ratio"]
+            recharge_amount = points_to_use * recharge_ratio
+            
+            game_account = self.bindings[qq_id]["game_account"]
+            account_name = self.bindings[qq_id].get("account_name", game_account)
+            
+            # 执行充值
+            try:
+                ticket = self.recharge_pool.submit(
+                    lambda: self._execute_account_recharge(game_account, recharge_amount, remark)
+                )
+                if ticket is None:
+                    yield event.plain_result("⏳ 充值繁忙\n当前充值请求过多，请稍后再试\n积分未扣除")
+                    return
+                future, position = ticket
+                if position:
+                    yield event.plain_result(f"⏳ 充值排队中\n当前排在第 {position} 位，请稍候")
+                result = await future
                 
-                content = f"""✅ 充值成功！
+                if result.get("success"):
+                    # 扣减积分与充值日志在同一个事务中提交
+                    try:
+                        with self._db_transaction():
+                            # 扣减积分
+                            user_points["points"] -= points_to_use
+                            user_points["total_spent"] += points_to_use
+                            self._update_user_points(qq_id, user_points)
+                            
+                            # 记录充值日志
+                            recharge_id = self._new_log_id("P", qq_id)
+                            self._append_recharge_log(recharge_id, {
+                                "qq_id": qq_id,
+                                "game_account": game_account,
+                                "account_name": account_name,
+                                "points_used": points_to_use,
+                                "recharge_amount": recharge_amount,
+                                "remark": remark,
+                                "recharge_time": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                                "api_response": result
+                            })
+                    except Exception as e:
+                        # 充值已到账但扣减未保存（SQLite已整体回滚）：提示联系管理员，避免用户重复充值
+                        logger.error(f"充值已到账但保存积分扣减失败：QQ {qq_id} 账号 {game_account} {recharge_amount} 元宝: {e}")
+                        yield event.plain_result("⚠️ 充值已到账，但积分扣除记录保存失败\n请勿重复充值，请联系管理员核对")
+                        return
+                    
+                    response_data = result.get("data", {})
+                    
+                    content = f"""✅ 充值成功！
 
 游戏账号：{account_name}
 消耗积分：{points_to_use} 积分
@@ -570,18 +1182,19 @@ class GameBindPlugin(Star):
 剩余积分：{user_points['points']} 积分
 
 ⏰ 充值时间：{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"""
-                
-                yield event.plain_result(content)
-            else:
-                error_msg = result.get("error", "未知错误")
-                yield event.plain_result(f"❌ 充值失败\n错误信息：{error_msg}")
-                
-        except Exception as e:
-            logger.error(f"充值异常：{e}")
-            yield event.plain_result("❌ 充值异常，请稍后重试或联系管理员")
+                    
+                    yield event.plain_result(content)
+                else:
+                    error_msg = result.get("error", "未知错误")
+                    yield event.plain_result(f"❌ 充值失败\n错误信息：{error_msg}")
+                    
+            except Exception as e:
+                logger.error(f"充值异常：{e}")
+                yield event.plain_result("❌ 充值异常，请稍后重试或联系管理员")
     
     # ========== 给别人账号充值功能 ==========
     @filter.command("给别人充值")
+    @timed_command
     async def recharge_for_others_cmd(self, event: AstrMessageEvent):
         """给他人游戏账号充值（消耗自己的积分）"""
         parts = event.message_str.strip().split()
@@ -610,49 +1223,67 @@ class GameBindPlugin(Star):
             yield event.plain_result(f"❌ 目标用户未绑定账号\nQQ {target_qq} 未绑定游戏账号")
             return
         
-        # 检查自己是否有足够积分
-        from_points = self._get_user_points(from_qq)
-        if from_points["points"] < points_to_use:
-            yield event.plain_result(f"❌ 积分不足\n需要积分：{points_to_use}\n当前积分：{from_points['points']}")
-            return
-        
-        # 获取目标用户的游戏账号
-        game_account = self.bindings[target_qq]["game_account"]
-        account_name = self.bindings[target_qq].get("account_name", game_account)
-        
-        # 计算充值金额
-        recharge_ratio = self.system_config["points"]["recharge_ratio"]
-        recharge_amount = points_to_use * recharge_ratio
-        
-        # 执行充值
-        try:
-            result = await self._execute_account_recharge(game_account, recharge_amount, remark)
+        # 持锁完成 检查余额 -> 调用充值API -> 扣减积分，防止并发重复消费
+        async with self.user_locks.acquire(from_qq):
+            # 检查自己是否有足够积分
+            from_points = self._get_user_points(from_qq)
+            if from_points["points"] < points_to_use:
+                yield event.plain_result(f"❌ 积分不足\n需要积分：{points_to_use}\n当前积分：{from_points['points']}")
+                return
             
-            if result.get("success"):
-                # 扣减自己的积分
-                from_points["points"] -= points_to_use
-                from_points["total_spent"] += points_to_use
-                self._update_user_points(from_qq, from_points)
-                
-                # 记录充值日志
-                recharge_id = f"G{datetime.now().strftime('%Y%m%d%H%M%S')}_{from_qq}"
-                self.recharge_logs[recharge_id] = {
-                    "type": "gift_recharge",
-                    "from_qq": from_qq,
-                    "to_qq": target_qq,
-                    "game_account": game_account,
-                    "account_name": account_name,
-                    "points_used": points_to_use,
-                    "recharge_amount": recharge_amount,
-                    "remark": remark,
-                    "recharge_time": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                    "api_response": result
-                }
-                self._save_json(self.recharge_file, self.recharge_logs)
-                
-                response_data = result.get("data", {})
+            # 获取目标用户的游戏账号
+            game_account = self.bindings[target_qq]["game_account"]
+            account_name = self.bindings[target_qq].get("account_name", game_account)
+            
+            # 计算充值金额
+            recharge_ratio = self.system_config["points"]["recharge_ratio"]
+            recharge_amount = points_to_use * recharge_ratio
+            
+            # 执行充值
+            try:
+                ticket = self.recharge_pool.submit(
+                    lambda: self._execute_account_recharge(game_account, recharge_amount, remark)
+                )
+                if ticket is None:
+                    yield event.plain_result("⏳ 充值繁忙\n当前充值请求过多，请稍后再试\n积分未扣除")
+                    return
+                future, position = ticket
+                if position:
+                    yield event.plain_result(f"⏳ 充值排队中\n当前排在第 {position} 位，请稍候")
+                result = await future
                 
-                content = f"""🎁 赠送充值成功！
+                if result.get("success"):
+                    # 扣减积分与充值日志在同一个事务中提交
+                    try:
+                        with self._db_transaction():
+                            # 扣减自己的积分
+                            from_points["points"] -= points_to_use
+                            from_points["total_spent"] += points_to_use
+                            self._update_user_points(from_qq, from_points)
+                            
+                            # 记录充值日志
+                            recharge_id = self._new_log_id("G", from_qq)
+                            self._append_recharge_log(recharge_id, {
+                                "type": "gift_recharge",
+                                "from_qq": from_qq,
+                                "to_qq": target_qq,
+                                "game_account": game_account,
+                                "account_name": account_name,
+                                "points_used": points_to_use,
+                                "recharge_amount": recharge_amount,
+                                "remark": remark,
+                                "recharge_time": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                                "api_response": result
+                            })
+                    except Exception as e:
+                        # 充值已到账但扣减未保存（SQLite已整体回滚）：提示联系管理员，避免用户重复充值
+                        logger.error(f"充值已到账但保存积分扣减失败：QQ {from_qq} 账号 {game_account} {recharge_amount} 元宝: {e}")
+                        yield event.plain_result("⚠️ 充值已到账，但积分扣除记录保存失败\n请勿重复充值，请联系管理员核对")
+                        return
+                    
+                    response_data = result.get("data", {})
+                    
+                    content = f"""🎁 赠送充值成功！
 
 赠送对象：QQ {target_qq}
 游戏账号：{account_name}
@@ -666,21 +1297,25 @@ class GameBindPlugin(Star):
 您剩余积分：{from_points['points']} 积分
 
 ⏰ 赠送时间：{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"""
-                
-                yield event.plain_result(content)
-            else:
-                error_msg = result.get("error", "未知错误")
-                yield event.plain_result(f"❌ 充值失败\n错误信息：{error_msg}")
-                
-        except Exception as e:
-            logger.error(f"给他人充值异常：{e}")
-            yield event.plain_result("❌ 充值异常，请稍后重试或联系管理员")
+                    
+                    yield event.plain_result(content)
+                else:
+                    error_msg = result.get("error", "未知错误")
+                    yield event.plain_result(f"❌ 充值失败\n错误信息：{error_msg}")
+                    
+            except Exception as e:
+                logger.error(f"给他人充值异常：{e}")
+                yield event.plain_result("❌ 充值异常，请稍后重试或联系管理员")
     
     # ========== 查询账号功能 ==========
     @filter.command("查询账号")
+    @timed_command
     async def query_account_cmd(self, event: AstrMessageEvent):
-        """查询游戏账号信息"""
+        """查询游戏账号信息（绑定账号优先读取余额快照，加"刷新"实时查询）"""
         parts = event.message_str.strip().split()
+        force_refresh = len(parts) >= 2 and parts[-1] in ("刷新", "refresh")
+        if force_refresh:
+            parts = parts[:-1]
         
         if len(parts) >= 2:
             # 查询指定账号
@@ -695,15 +1330,25 @@ class GameBindPlugin(Star):
             game_account = self.bindings[qq_id]["game_account"]
             show_extra_info = False
         
-        try:
-            account_info = await self._get_account_info(game_account)
-            if not account_info:
-                yield event.plain_result(f"❌ 账号不存在\n游戏账号 {game_account} 不存在")
+        account_info = None
+        if not force_refresh and self.balance_snapshot is not None:
+            account_info = self.balance_snapshot.get(game_account, self.api_config["balance_sync"]["max_age"])
+        
+        if account_info is None:
+            if force_refresh:
+                self.account_cache.invalidate(game_account)
+            try:
+                account_info = await self._get_account_info(game_account)
+                if not account_info:
+                    yield event.plain_result(f"❌ 账号不存在\n游戏账号 {game_account} 不存在")
+                    return
+            except CircuitOpenError as e:
+                yield event.plain_result(f"❌ 查询失败，{e}")
+                return
+            except Exception as e:
+                logger.error(f"查询账号失败：{e}")
+                yield event.plain_result("❌ 查询失败，网络连接异常，请稍后重试")
                 return
-        except Exception as e:
-            logger.error(f"查询账号失败：{e}")
-            yield event.plain_result("❌ 查询失败，网络连接异常，请稍后重试")
-            return
         
         # 构建基本信息
         content = f"""🎮 账号信息
@@ -727,10 +1372,16 @@ class GameBindPlugin(Star):
         else:
             content += f"\n💡 使用 /绑定账号 可绑定此账号"
         
+        if "synced_at" in account_info:
+            refresh_cmd = f"/查询账号 {game_account} 刷新" if show_extra_info else "/查询账号 刷新"
+            synced_time = datetime.fromtimestamp(account_info["synced_at"]).strftime("%Y-%m-%d %H:%M:%S")
+            content += f"\n\n🕒 余额同步于 {synced_time}\n💡 {refresh_cmd} 获取实时余额"
+        
         yield event.plain_result(content)
     
     # ========== 赠送积分功能 ==========
     @filter.command("赠送积分")
+    @timed_command
     async def gift_points_cmd(self, event: AstrMessageEvent):
         """赠送积分给其他用户"""
         parts = event.message_str.strip().split()
@@ -758,21 +1409,23 @@ class GameBindPlugin(Star):
             yield event.plain_result("❌ 不能给自己赠送积分")
             return
         
-        # 检查是否有足够积分
-        from_points = self._get_user_points(from_qq)
-        if from_points["points"] < points_to_gift:
-            yield event.plain_result(f"❌ 积分不足\n需要积分：{points_to_gift}\n当前积分：{from_points['points']}")
-            return
-        
-        # 转移积分
-        success, message = self._transfer_points(from_qq, target_qq, points_to_gift, remark)
-        
-        if success:
-            # 获取转移后的积分
+        # 同时锁定双方（按QQ号顺序加锁，避免死锁）
+        async with self.user_locks.acquire(from_qq, target_qq):
+            # 检查是否有足够积分
             from_points = self._get_user_points(from_qq)
-            to_points = self._get_user_points(target_qq)
+            if from_points["points"] < points_to_gift:
+                yield event.plain_result(f"❌ 积分不足\n需要积分：{points_to_gift}\n当前积分：{from_points['points']}")
+                return
+            
+            # 转移积分
+            success, message = self._transfer_points(from_qq, target_qq, points_to_gift, remark)
             
-            content = f"""🎁 积分赠送成功！
+            if success:
+                # 获取转移后的积分
+                from_points = self._get_user_points(from_qq)
+                to_points = self._get_user_points(target_qq)
+                
+                content = f"""🎁 积分赠送成功！
 
 赠送对象：QQ {target_qq}
 赠送积分：{points_to_gift} 积分
@@ -783,13 +1436,14 @@ class GameBindPlugin(Star):
 对方积分：{to_points['points']}（已增加 {points_to_gift}）
 
 ⏰ 赠送时间：{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"""
-            
-            yield event.plain_result(content)
-        else:
-            yield event.plain_result(f"❌ 赠送失败\n{message}")
+                
+                yield event.plain_result(content)
+            else:
+                yield event.plain_result(f"❌ 赠送失败\n{message}")
     
     # ========== 查询他人积分功能 ==========
     @filter.command("查询积分")
+    @timed_command
     async def query_points_cmd(self, event: AstrMessageEvent):
         """查询其他用户的积分"""
         parts = event.message_str.strip().split()
@@ -838,6 +1492,7 @@ class GameBindPlugin(Star):
     
     # ========== 管理员添加积分功能 ==========
     @filter.command("添加积分")
+    @timed_command
     async def add_points_cmd(self, event: AstrMessageEvent):
         """管理员给用户添加积分"""
         parts = event.message_str.strip().split()
@@ -861,14 +1516,16 @@ class GameBindPlugin(Star):
             yield event.plain_result("❌ 权限不足\n只有管理员可以使用此命令")
             return
         
-        # 添加积分
-        success, message = self._add_points_to_user(target_qq, points_to_add, remark)
-        
-        if success:
-            user_points = self._get_user_points(target_qq)
-            recharge_ratio = self.system_config["points"]["recharge_ratio"]
+        # 与该用户的其他积分变动串行执行
+        async with self.user_locks.acquire(target_qq):
+            # 添加积分
+            success, message = self._add_points_to_user(target_qq, points_to_add, remark)
             
-            content = f"""👑 管理员操作成功！
+            if success:
+                user_points = self._get_user_points(target_qq)
+                recharge_ratio = self.system_config["points"]["recharge_ratio"]
+                
+                content = f"""👑 管理员操作成功！
 
 目标用户：QQ {target_qq}
 添加积分：{points_to_add} 积分
@@ -881,13 +1538,106 @@ class GameBindPlugin(Star):
 
 操作管理员：{admin_qq}
 操作时间：{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"""
-            
-            yield event.plain_result(content)
+                
+                yield event.plain_result(content)
+            else:
+                yield event.plain_result(f"❌ 操作失败\n{message}")
+    
+    @filter.command("批量添加积分")
+    @timed_command
+    async def bulk_add_points_cmd(self, event: AstrMessageEvent):
+        """管理员批量添加积分（全部校验后一次写入）"""
+        admin_qq = self._get_user_id(event)
+        
+        if not self._is_admin(admin_qq):
+            yield event.plain_result("❌ 权限不足\n只有管理员可以使用此命令")
+            return
+        
+        # 第一行：命令 [默认备注] [file=文件名]；之后每行一条：QQ 积分 [备注]
+        lines = event.message_str.strip().splitlines()
+        options = lines[0].split()[1:] if lines else []
+        file_names = [option[5:] for option in options if option.startswith("file=")]
+        default_remark = " ".join(option for option in options if not option.startswith("file=")) or "管理员批量添加"
+        
+        if file_names:
+            # 文件放在插件 data 目录下，只允许读取该目录中的文件
+            file_path = os.path.realpath(os.path.join(self.data_dir, file_names[0]))
+            if os.path.dirname(file_path) != os.path.realpath(self.data_dir) or not os.path.isfile(file_path):
+                yield event.plain_result(f"❌ 文件不存在\n请将文件放在插件 data 目录下：{file_names[0]}")
+                return
+            try:
+                with open(file_path, "r", encoding="utf-8-sig") as f:
+                    rows = f.read().splitlines()
+            except (OSError, UnicodeDecodeError) as e:
+                yield event.plain_result(f"❌ 读取文件失败\n{e}")
+                return
+            source = f"文件 {file_names[0]}"
         else:
-            yield event.plain_result(f"❌ 操作失败\n{message}")
+            rows = lines[1:]
+            source = "消息"
+        
+        max_rows = self.system_config["points"]["bulk_grant_max"]
+        grants, failures = self._parse_grant_rows(rows, default_remark)
+        if not grants and not failures:
+            yield event.plain_result("❌ 格式错误\n正确格式（每行一条）：\n/批量添加积分 [默认备注]\nQQ 积分 [备注]\nQQ 积分 [备注]\n\n或：/批量添加积分 file=文件名（data 目录下的文本文件）")
+            return
+        if len(grants) + len(failures) > max_rows:
+            yield event.plain_result(f"❌ 条数过多\n单次最多 {max_rows} 条，本次 {len(grants) + len(failures)} 条，请分批操作")
+            return
+        
+        total_points = sum(points for _, points, _ in grants)
+        start = time.perf_counter()
+        if grants:
+            async with self.user_locks.acquire(*{qq_id for qq_id, _, _ in grants}):
+                self._add_points_batch(grants)
+        elapsed = time.perf_counter() - start
+        
+        content = f"""👑 批量添加积分完成
+
+来源：{source}
+成功：{len(grants)} 条（{len({qq_id for qq_id, _, _ in grants})} 个用户），共 {total_points:,} 积分
+失败：{len(failures)} 条"""
+        if failures:
+            content += "\n" + "\n".join(f"• 第{line_no}行 {text[:30]}：{reason}" for line_no, text, reason in failures[:20])
+            if len(failures) > 20:
+                content += f"\n…… 另有 {len(failures) - 20} 条失败未显示"
+        content += f"""
+
+耗时：{elapsed * 1000:.1f}ms
+操作管理员：{admin_qq}
+操作时间：{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"""
+        
+        yield event.plain_result(content)
+    
+    def _parse_grant_rows(self, rows: List[str], default_remark: str) -> tuple:
+        """解析批量添加积分的每一行，返回 ([(QQ, 积分, 备注)], [(行号, 原文, 失败原因)])
+        
+        空行和 # 开头的注释行跳过；QQ、积分、备注之间可用空格、制表符或逗号分隔。
+        """
+        grants, failures = [], []
+        for line_no, row in enumerate(rows, 1):
+            text = row.strip()
+            if not text or text.startswith("#"):
+                continue
+            fields = re.split(r"[\s,，]+", text, maxsplit=2)
+            if len(fields) < 2:
+                failures.append((line_no, text, "格式错误，应为：QQ 积分 [备注]"))
+                continue
+            qq_id, points_text = fields[0], fields[1]
+            remark = fields[2].strip() if len(fields) > 2 and fields[2].strip() else default_remark
+            if not qq_id.isdecimal():
+                failures.append((line_no, text, "QQ号无效"))
+            elif not points_text.isdecimal() or int(points_text) <= 0:
+                failures.append((line_no, text, "积分数量必须是正整数"))
+            elif qq_id not in self.user_points:
+                failures.append((line_no, text, "用户不存在"))
+            else:
+                grants.append((qq_id, int(points_text), remark))
+        return grants, failures
     
     # ========== 管理员管理功能 ==========
     @filter.command("添加管理员")
+    @timed_command
     async def add_admin_cmd(self, event: AstrMessageEvent):
         """添加管理员"""
         parts = event.message_str.strip().split()
@@ -918,6 +1668,7 @@ class GameBindPlugin(Star):
             yield event.plain_result(f"⚠️ 操作提示\nQQ {target_qq} 已经是管理员")
     
     @filter.command("移除管理员")
+    @timed_command
     async def remove_admin_cmd(self, event: AstrMessageEvent):
         """移除管理员"""
         parts = event.message_str.strip().split()
@@ -948,6 +1699,7 @@ class GameBindPlugin(Star):
             yield event.plain_result(f"⚠️ 操作提示\nQQ {target_qq} 不是管理员")
     
     @filter.command("管理员列表")
+    @timed_command
     async def admin_list_cmd(self, event: AstrMessageEvent):
         """查看管理员列表"""
         admin_qq = self._get_user_id(event)
@@ -976,6 +1728,7 @@ class GameBindPlugin(Star):
         yield event.plain_result(content)
     
     @filter.command("用户列表")
+    @timed_command
     async def user_list_cmd(self, event: AstrMessageEvent):
         """查看所有用户列表"""
         admin_qq = self._get_user_id(event)
@@ -985,41 +1738,57 @@ class GameBindPlugin(Star):
             return
         
         parts = event.message_str.strip().split()
+        sort = "qq"
         page = 1
-        if len(parts) >= 2:
-            try:
-                page = int(parts[1])
-                if page < 1:
+        cursor = None
+        for token in parts[1:]:
+            if token in USER_SORT_ALIASES:
+                sort = USER_SORT_ALIASES[token]
+            elif token.startswith("after="):
+                cursor = token[6:]
+            else:
+                try:
+                    page = max(int(token), 1)
+                except ValueError:
                     page = 1
-            except ValueError:
-                page = 1
         
         page_size = 10
-        start_index = (page - 1) * page_size
-        end_index = start_index + page_size
-        
-        # 获取用户列表
-        all_users = list(self.user_points.keys())
-        total_users = len(all_users)
+        total_users = len(self.user_points)
         total_pages = (total_users + page_size - 1) // page_size
         
-        if page > total_pages and total_pages > 0:
-            page = total_pages
+        if cursor is not None:
+            # 游标翻页：从上一页最后一个用户之后继续，不受翻页期间排名变动影响
+            try:
+                current_users = self.user_rank.page_after(sort, cursor, page_size)
+            except ValueError:
+                yield event.plain_result(f"❌ 无效的游标：{cursor}\n请使用上一页末尾给出的翻页命令")
+                return
+            start_index = self.user_rank.position(sort, current_users[0]) if current_users else total_users
+            page = start_index // page_size + 1
+        else:
+            if page > total_pages and total_pages > 0:
+                page = total_pages
             start_index = (page - 1) * page_size
-            end_index = start_index + page_size
-        
-        current_users = all_users[start_index:end_index]
-        
+            current_users = self.user_rank.page(sort, start_index, page_size)
+        end_index = start_index + len(current_users)
+        
+        sort_labels = {
+            "points": "积分",
+            "total_earned": "累计获得",
+            "continuous_days": "连续签到",
+            "qq": "QQ号"
+        }
         content = f"""👥 用户列表
 
 总用户数：{total_users} 人
+排序方式：{sort_labels[sort]}
 当前页数：{page}/{total_pages}
 每页显示：{page_size} 人"""
 
         if not current_users:
             content += "\n\n当前页无用户数据"
         else:
-            content += f"\n\n用户列表（{start_index + 1}-{min(end_index, total_users)}）："
+            content += f"\n\n用户列表（{start_index + 1}-{end_index}）："
             
             for i, qq in enumerate(current_users, start_index + 1):
                 user_data = self.user_points[qq]
@@ -1036,14 +1805,16 @@ class GameBindPlugin(Star):
                     game_account = self.bindings[qq]["game_account"]
                     content += f" ({game_account})"
         
-        if total_pages > 1:
-            content += f"\n\n📄 翻页：/用户列表 <页码>"
+        if current_users and end_index < total_users:
+            sort_args = {"points": "points ", "total_earned": "earned ", "continuous_days": "streak ", "qq": ""}
+            content += f"\n\n📄 下一页：/用户列表 {sort_args[sort]}after={self.user_rank.cursor(sort, current_users[-1])}"
         
         yield event.plain_result(content)
     
     @filter.command("充值记录")
+    @timed_command
     async def recharge_logs_cmd(self, event: AstrMessageEvent):
-        """查看充值记录"""
+        """查看充值记录（可按用户、类型、日期筛选）"""
         admin_qq = self._get_user_id(event)
         
         if not self._is_admin(admin_qq):
@@ -1051,62 +1822,288 @@ class GameBindPlugin(Star):
             return
         
         parts = event.message_str.strip().split()
-        limit = 10
-        if len(parts) >= 2:
-            try:
-                limit = int(parts[1])
-                if limit < 1:
-                    limit = 10
-                elif limit > 50:
-                    limit = 50
-            except ValueError:
-                limit = 10
-        
-        # 获取最近的充值记录
-        recharge_ids = list(self.recharge_logs.keys())
-        recharge_ids.sort(reverse=True)  # 按时间倒序
-        recent_logs = recharge_ids[:limit]
+        try:
+            filters, limit, page = self._parse_log_query(parts[1:])
+        except ValueError as e:
+            yield event.plain_result(f"❌ 参数错误：{e}\n正确格式：/充值记录 [数量] [qq=QQ] [type=类型] [开始日期..结束日期] [page=页码]\n例如：/充值记录 qq=123456 type=gift 2026-10-01..2026-10-15\n类型：normal 普通充值 / gift 赠送充值 / transfer 积分转移 / admin 管理员添加")
+            return
         
-        content = f"""📋 充值记录
+        if not filters and page == 1 and len(self.recent_logs) > limit:
+            # 最近记录直接取环形缓冲区（缓冲区不足一页时无法判断是否还有下一页，走索引查询）
+            recent_ids = list(islice(reversed(self.recent_logs), limit + 1))  # 按时间倒序
+            logs = [(log_id, self.recharge_logs[log_id]) for log_id in recent_ids[:limit]]
+            has_more = len(recent_ids) > limit
+        else:
+            logs, has_more = self.log_index.query(offset=(page - 1) * limit, limit=limit, **filters)
+        
+        if filters:
+            type_labels = {
+                "normal": "普通充值",
+                "gift_recharge": "赠送充值",
+                "points_transfer": "积分转移",
+                "admin_add_points": "管理员添加"
+            }
+            conditions = []
+            if "qq_id" in filters:
+                conditions.append(f"QQ {filters['qq_id']}")
+            if "type_name" in filters:
+                conditions.append(type_labels[filters["type_name"]])
+            if "start_day" in filters:
+                conditions.append(f"{filters['start_day']} ~ {filters['end_day']}")
+            condition_text = "，".join(conditions)
+            content = f"""📋 充值记录
+
+筛选条件：{condition_text}
+第 {page} 页，每页 {limit} 条：
+--------------------------"""
+        else:
+            content = f"""📋 充值记录
 
 显示最近 {limit} 条记录：
 --------------------------"""
         
-        if not recent_logs:
+        if not logs:
             content += "\n暂无充值记录"
         else:
-            for i, log_id in enumerate(recent_logs, 1):
-                log = self.recharge_logs[log_id]
-                log_type = log.get("type", "normal")
-                
-                if log_type == "normal":
-                    content += f"\n\n{i}. 普通充值"
-                    content += f"\n   用户: {log.get('qq_id', '未知')}"
-                    content += f"\n   账号: {log.get('account_name', '未知')}"
-                    content += f"\n   积分: {log.get('points_used', 0)}"
-                elif log_type == "gift_recharge":
-                    content += f"\n\n{i}. 赠送充值"
-                    content += f"\n   赠送者: {log.get('from_qq', '未知')}"
-                    content += f"\n   接收者: {log.get('to_qq', '未知')}"
-                    content += f"\n   积分: {log.get('points_used', 0)}"
-                elif log_type == "points_transfer":
-                    content += f"\n\n{i}. 积分转移"
-                    content += f"\n   转出: {log.get('from_qq', '未知')}"
-                    content += f"\n   转入: {log.get('to_qq', '未知')}"
-                    content += f"\n   积分: {log.get('points', 0)}"
-                elif log_type == "admin_add_points":
-                    content += f"\n\n{i}. 管理员添加"
-                    content += f"\n   目标用户: {log.get('target_qq', '未知')}"
-                    content += f"\n   积分: {log.get('points', 0)}"
-                
-                content += f"\n   时间: {log.get('recharge_time', log.get('transfer_time', log.get('action_time', '未知')))}"
-                if log.get("remark"):
-                    content += f"\n   备注: {log['remark']}"
+            for i, (log_id, log) in enumerate(logs, (page - 1) * limit + 1):
+                content += self._format_log_entry(i, log)
+        
+        if has_more:
+            content += f"\n\n📄 下一页：在命令末尾加上 page={page + 1}"
+        
+        yield event.plain_result(content)
+    
+    def _parse_log_query(self, tokens: List[str]) -> tuple:
+        """解析充值记录查询参数，返回 (筛选条件, 每页数量, 页码)"""
+        filters = {}
+        limit = 10
+        page = 1
+        for token in tokens:
+            if token.isdigit():
+                limit = min(max(int(token), 1), 50)
+            elif token.startswith("qq="):
+                filters["qq_id"] = token[3:]
+            elif token.startswith("type="):
+                type_name = LOG_TYPE_ALIASES.get(token[5:].lower())
+                if type_name is None:
+                    raise ValueError(f"未知类型 {token[5:]}")
+                filters["type_name"] = type_name
+            elif token.startswith("page="):
+                if not token[5:].isdigit() or int(token[5:]) < 1:
+                    raise ValueError("页码必须是正整数")
+                page = int(token[5:])
+            else:
+                start_text, _, end_text = token.partition("..")
+                try:
+                    start_day = date.fromisoformat(start_text)
+                    end_day = date.fromisoformat(end_text) if end_text else start_day
+                except ValueError:
+                    raise ValueError(f"无法识别的参数 {token}")
+                if start_day > end_day:
+                    start_day, end_day = end_day, start_day
+                filters["start_day"] = start_day.isoformat()
+                filters["end_day"] = end_day.isoformat()
+        return filters, limit, page
+    
+    def _format_log_entry(self, i: int, log: dict) -> str:
+        """格式化一条充值记录"""
+        content = ""
+        log_type = log.get("type", "normal")
+        
+        if log_type == "normal":
+            content += f"\n\n{i}. 普通充值"
+            content += f"\n   用户: {log.get('qq_id', '未知')}"
+            content += f"\n   账号: {log.get('account_name', '未知')}"
+            content += f"\n   积分: {log.get('points_used', 0)}"
+        elif log_type == "gift_recharge":
+            content += f"\n\n{i}. 赠送充值"
+            content += f"\n   赠送者: {log.get('from_qq', '未知')}"
+            content += f"\n   接收者: {log.get('to_qq', '未知')}"
+            content += f"\n   积分: {log.get('points_used', 0)}"
+        elif log_type == "points_transfer":
+            content += f"\n\n{i}. 积分转移"
+            content += f"\n   转出: {log.get('from_qq', '未知')}"
+            content += f"\n   转入: {log.get('to_qq', '未知')}"
+            content += f"\n   积分: {log.get('points', 0)}"
+        elif log_type == "admin_add_points":
+            content += f"\n\n{i}. 管理员添加"
+            content += f"\n   目标用户: {log.get('target_qq', '未知')}"
+            content += f"\n   积分: {log.get('points', 0)}"
+        
+        content += f"\n   时间: {log.get('recharge_time', log.get('transfer_time', log.get('action_time', '未知')))}"
+        if log.get("remark"):
+            content += f"\n   备注: {log['remark']}"
+        return content
+    
+    @filter.command("统计")
+    @timed_command
+    async def daily_stats_cmd(self, event: AstrMessageEvent):
+        """查看每日运营统计"""
+        admin_qq = self._get_user_id(event)
+        
+        if not self._is_admin(admin_qq):
+            yield event.plain_result("❌ 权限不足\n只有管理员可以查看统计")
+            return
+        
+        parts = event.message_str.strip().split()
+        if len(parts) >= 2 and parts[1] == "重建":
+            start = time.perf_counter()
+            logs = self.db.recharge_logs.iter_rows() if self.db is not None else self.recharge_logs.items()
+            rebuilt = rebuild_daily_stats(logs, self.sign_records, self.daily_stats)
+            for day, row in rebuilt.items():
+                self.daily_stats[day] = row
+            self._persist("daily_stats")
+            logger.info(f"📊 管理员 {admin_qq} 重建了每日统计，共 {len(rebuilt)} 天")
+            yield event.plain_result(
+                f"✅ 每日统计已重建\n共 {len(rebuilt)} 天，耗时 {time.perf_counter() - start:.2f} 秒\n"
+                f"💡 签到记录只保存每人最后一次签到，更早的签到次数以已有统计为准"
+            )
+            return
+        
+        days = 7
+        if len(parts) >= 2:
+            if not parts[1].isdigit() or int(parts[1]) < 1:
+                yield event.plain_result("❌ 参数错误\n正确格式：/统计 [天数]\n例如：/统计 30")
+                return
+            days = min(int(parts[1]), 90)
+        
+        totals = dict.fromkeys(STAT_FIELDS, 0)
+        content = f"📊 运营统计（最近 {days} 天）\n--------------------------"
+        today = date.today()
+        for offset in range(days):
+            day = (today - timedelta(days=offset)).isoformat()
+            row = self.daily_stats.get(day)
+            if not row or not any(row.values()):
+                continue
+            for field in totals:
+                totals[field] += row.get(field, 0)
+            content += f"\n\n📅 {day}"
+            content += f"\n   签到：{row.get('sign_count', 0)} 次，发放 {row.get('sign_points', 0)} 积分"
+            content += f"\n   充值：{row.get('recharge_count', 0)} 笔，兑换 {row.get('recharge_points', 0)} 积分，共 {row.get('recharge_yuanbao', 0):,} 元宝"
+            if row.get("transfer_count"):
+                content += f"\n   转移：{row['transfer_count']} 笔，{row.get('transfer_points', 0)} 积分"
+            if row.get("admin_count"):
+                content += f"\n   管理员添加：{row['admin_count']} 笔，{row.get('admin_points', 0)} 积分"
+        
+        if not any(totals.values()):
+            content += "\n暂无统计数据"
+        else:
+            content += f"""
+
+📈 合计：
+• 签到 {totals['sign_count']} 次
+• 发放积分 {totals['sign_points'] + totals['admin_points']}（签到 {totals['sign_points']} + 管理员 {totals['admin_points']}）
+• 兑换积分 {totals['recharge_points']}，充值 {totals['recharge_yuanbao']:,} 元宝（{totals['recharge_count']} 笔）
+• 积分转移 {totals['transfer_points']}（{totals['transfer_count']} 笔）"""
+        
+        yield event.plain_result(content)
+    
+    @filter.command("充值队列")
+    @timed_command
+    async def recharge_queue_cmd(self, event: AstrMessageEvent):
+        """查看充值队列状态"""
+        admin_qq = self._get_user_id(event)
+        
+        if not self._is_admin(admin_qq):
+            yield event.plain_result("❌ 权限不足\n只有管理员可以查看充值队列")
+            return
+        
+        stats = self.recharge_pool.stats()
+        content = f"""🚦 充值队列
+
+排队中：{stats['depth']}/{stats['max_depth']}
+执行中：{stats['busy']}/{stats['workers']}
+工作利用率：{stats['utilization']:.1%}
+已处理：{stats['processed']} 笔
+因繁忙拒绝：{stats['rejected']} 笔
+平均排队：{stats['avg_wait']:.2f} 秒"""
+        
+        yield event.plain_result(content)
+    
+    @filter.command("缓存统计")
+    @timed_command
+    async def cache_stats_cmd(self, event: AstrMessageEvent):
+        """查看账号查询缓存统计"""
+        admin_qq = self._get_user_id(event)
+        
+        if not self._is_admin(admin_qq):
+            yield event.plain_result("❌ 权限不足\n只有管理员可以查看缓存统计")
+            return
+        
+        stats = self.account_cache.stats()
+        cache_config = self.api_config["cache"]
+        content = f"""📦 账号查询缓存
+
+缓存条目：{stats['size']}/{stats['max_size']}
+命中次数：{stats['hits']}
+未命中次数：{stats['misses']}
+命中率：{stats['hit_rate']:.1%}
+淘汰次数：{stats['evictions']}
+过期次数：{stats['expirations']}
+合并请求：{self.api_flight.shared}
+
+⚙️ 缓存时间：存在 {cache_config['ttl']} 秒 / 不存在 {cache_config['negative_ttl']} 秒
+
+{self._balance_sync_status_text()}"""
+        
+        yield event.plain_result(content)
+    
+    # ========== 性能统计功能 ==========
+    @filter.command("性能")
+    @timed_command
+    async def metrics_cmd(self, event: AstrMessageEvent):
+        """查看命令、API调用与持久化的耗时统计"""
+        admin_qq = self._get_user_id(event)
+        
+        if not self._is_admin(admin_qq):
+            yield event.plain_result("❌ 权限不足\n只有管理员可以查看性能统计")
+            return
+        
+        uptime = max(time.time() - self.metrics.started, 1e-9)
+        sections = []
+        for kind, title in (("command", "🤖 命令"), ("api", "🌐 API调用"), ("persistence", "💾 持久化")):
+            series_list = self.metrics.series(kind)
+            if not series_list:
+                continue
+            lines = [title]
+            for name, series in series_list:
+                lines.append(
+                    f"{name}：{series.count} 次（{series.count / uptime * 60:.1f}/分钟），失败 {series.errors}，"
+                    f"平均 {series.total / series.count * 1000:.1f}ms，"
+                    f"p50 {series.quantile(0.5) * 1000:.1f}ms，p99 {series.quantile(0.99) * 1000:.1f}ms"
+                )
+            sections.append("\n".join(lines))
+        
+        if not sections:
+            yield event.plain_result("📈 暂无性能数据")
+            return
         
+        export_interval = self.system_config["metrics"]["export_interval"]
+        export_note = f"每 {export_interval} 秒写入 metrics.prom" if export_interval > 0 else "未启用导出"
+        content = f"📈 性能统计（运行 {uptime / 60:.0f} 分钟，{export_note}）\n\n" + "\n\n".join(sections)
         yield event.plain_result(content)
     
+    def _balance_sync_status_text(self) -> str:
+        """余额快照与同步进度说明"""
+        if self.api_config["balance_sync"]["interval"] <= 0:
+            return "🔄 余额同步：未启用"
+        if self.balance_snapshot is None:
+            return "🔄 余额同步：尚未开始"
+        
+        state = self.balance_snapshot.sync
+        lines = [f"🔄 余额快照：{len(self.balance_snapshot.accounts)} 个绑定账号"]
+        if state.get("last_completed"):
+            lines.append(f"上次完成：{datetime.fromtimestamp(state['last_completed']).strftime('%Y-%m-%d %H:%M:%S')}")
+        if state.get("next_page"):
+            lines.append(f"同步进行中：第 {state['next_page']}/{state.get('total_pages', '?')} 页")
+        if self.sync_breaker.state != CircuitBreaker.CLOSED:
+            lines.append(f"同步熔断：{CircuitBreaker.LABELS[self.sync_breaker.state]}"
+                         f"（{max(self.sync_breaker.retry_after(), 1)} 秒后试探）")
+        return "\n".join(lines)
+    
     # ========== 修改绑定功能 ==========
     @filter.command("修改绑定")
+    @timed_command
     async def modify_bind_cmd(self, event: AstrMessageEvent):
         """修改绑定账号"""
         parts = event.message_str.strip().split()
@@ -1121,42 +2118,58 @@ class GameBindPlugin(Star):
             yield event.plain_result("❌ 身份验证失败，无法获取QQ信息")
             return
         
-        # 检查是否已绑定
-        if qq_id not in self.bindings:
-            yield event.plain_result("❌ 未绑定账号\n您尚未绑定任何游戏账号\n请先使用 /绑定账号 命令")
-            return
-        
-        # 获取旧账号信息
-        old_account = self.bindings[qq_id]["game_account"]
-        old_bind_time = self.bindings[qq_id]["bind_time"]
-        
-        # 检查新账号是否已被绑定（排除自己）
-        is_bound, bound_qq, bind_info = self._is_account_already_bound(new_account, exclude_qq=qq_id)
-        if is_bound:
-            yield event.plain_result(f"❌ 账号已被绑定\n游戏账号：{new_account}\n已被QQ：{bound_qq} 绑定\n绑定时间：{bind_info.get('bind_time', '未知')}")
-            return
-        
-        # 验证新账号是否存在
-        try:
-            account_info = await self._get_account_info(new_account)
-            if not account_info:
-                yield event.plain_result(f"❌ 账号不存在\n游戏账号 {new_account} 不存在")
+        # 同一QQ、同一游戏账号的绑定操作串行执行，验证账号期间不会被其他绑定抢先
+        async with self.user_locks.acquire(qq_id, f"account:{new_account}"):
+            # 检查是否已绑定
+            if qq_id not in self.bindings:
+                yield event.plain_result("❌ 未绑定账号\n您尚未绑定任何游戏账号\n请先使用 /绑定账号 命令")
                 return
-        except Exception as e:
-            logger.error(f"验证游戏账号失败: {e}")
-            yield event.plain_result("❌ 验证失败，网络连接异常，请稍后重试")
-            return
-        
-        # 更新绑定信息
-        self.bindings[qq_id] = {
-            "game_account": new_account,
-            "account_name": account_info.get("passport", new_account),
-            "bind_time": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-            "qq_id": qq_id,
-            "old_account": old_account,
-            "old_bind_time": old_bind_time
-        }
-        self._save_json(self.bind_file, self.bindings)
+            
+            # 获取旧账号信息
+            old_account = self.bindings[qq_id]["game_account"]
+            old_bind_time = self.bindings[qq_id]["bind_time"]
+            
+            # 检查新账号是否已被绑定（排除自己）
+            is_bound, bound_qq, bind_info = self._is_account_already_bound(new_account, exclude_qq=qq_id)
+            if is_bound:
+                yield event.plain_result(f"❌ 账号已被绑定\n游戏账号：{new_account}\n已被QQ：{bound_qq} 绑定\n绑定时间：{bind_info.get('bind_time', '未知')}")
+                return
+            
+            # 验证新账号是否存在
+            try:
+                account_info = await self._get_account_info(new_account)
+                if not account_info:
+                    yield event.plain_result(f"❌ 账号不存在\n游戏账号 {new_account} 不存在")
+                    return
+            except CircuitOpenError as e:
+                yield event.plain_result(f"❌ 验证失败，{e}")
+                return
+            except Exception as e:
+                logger.error(f"验证游戏账号失败: {e}")
+                yield event.plain_result("❌ 验证失败，网络连接异常，请稍后重试")
+                return
+            
+            # 等待API期间绑定关系可能已变化，写入前再检查一次（之后到写入完成之间没有 await）
+            if self.bindings.get(qq_id, {}).get("game_account") != old_account:
+                yield event.plain_result("❌ 修改失败\n绑定信息已变化，请重新查看后再试")
+                return
+            is_bound, bound_qq, bind_info = self._is_account_already_bound(new_account, exclude_qq=qq_id)
+            if is_bound:
+                yield event.plain_result(f"❌ 账号已被绑定\n游戏账号：{new_account}\n已被QQ：{bound_qq} 绑定\n绑定时间：{bind_info.get('bind_time', '未知')}")
+                return
+            
+            # 更新绑定信息
+            self.bindings[qq_id] = {
+                "game_account": new_account,
+                "account_name": account_info.get("passport", new_account),
+                "bind_time": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                "qq_id": qq_id,
+                "old_account": old_account,
+                "old_bind_time": old_bind_time
+            }
+            self._unindex_binding(old_account, qq_id)
+            self._index_binding(new_account, qq_id)
+            self._persist("bindings")
         
         account_name = account_info.get("passport", new_account)
         content = f"""✅ 修改成功！
@@ -1171,6 +2184,7 @@ class GameBindPlugin(Star):
     
     # ========== 解绑功能 ==========
     @filter.command("解绑账号")
+    @timed_command
     async def unbind_account_cmd(self, event: AstrMessageEvent):
         """解绑游戏账号"""
         qq_id = self._get_user_id(event)
@@ -1182,7 +2196,8 @@ class GameBindPlugin(Star):
             
             # 删除绑定
             del self.bindings[qq_id]
-            self._save_json(self.bind_file, self.bindings)
+            self._unindex_binding(game_account, qq_id)
+            self._persist("bindings")
             
             content = f"""✅ 解绑成功！
 
@@ -1198,107 +2213,394 @@ class GameBindPlugin(Star):
     
     # ========== 测试连接功能 ==========
     @filter.command("测试连接")
+    @timed_command
     async def test_connection_cmd(self, event: AstrMessageEvent):
-        """测试API连接"""
+        """测试API连接（直接探测，不受熔断器限制）"""
+        breaker_status = self._api_status_text()
         try:
-            async with aiohttp.ClientSession() as session:
-                params = {
-                    "action": "search",
-                    "page": 1,
-                    "pageSize": 1
-                }
-                
-                async with session.get(
-                    self.api_config["base_url"],
-                    params=params,
-                    timeout=aiohttp.ClientTimeout(total=self.api_config["timeout"])
-                ) as response:
-                    if response.status == 200:
-                        result = await response.json()
-                        if result.get("success"):
-                            content = f"""✅ API连接正常！
+            status, result = await self.api_flight.do(("search", None), self._probe_api)
+            if status == 200:
+                if result.get("success"):
+                    content = f"""✅ API连接正常！
 
 连接状态：正常
 账号数量：{result['data']['total']:,} 个
 响应时间：正常
-服务状态：在线"""
-                            yield event.plain_result(content)
-                        else:
-                            error_msg = result.get('error', '未知错误')
-                            yield event.plain_result(f"⚠️ API异常\nAPI响应异常：{error_msg}")
-                    else:
-                        yield event.plain_result(f"❌ 连接失败\nAPI连接失败，状态码：{response.status}")
-                        
+服务状态：在线
+
+{breaker_status}"""
+                    yield event.plain_result(content)
+                else:
+                    error_msg = result.get('error', '未知错误')
+                    yield event.plain_result(f"⚠️ API异常\nAPI响应异常：{error_msg}\n\n{breaker_status}")
+            else:
+                yield event.plain_result(f"❌ 连接失败\nAPI连接失败，状态码：{status}\n\n{breaker_status}")
+                
         except Exception as e:
-            yield event.plain_result(f"❌ 连接失败\nAPI连接失败：{str(e)}\n请检查API地址和网络配置")
+            yield event.plain_result(f"❌ 连接失败\nAPI连接失败：{str(e)}\n请检查API地址和网络配置\n\n{breaker_status}")
+    
+    def _api_status_text(self) -> str:
+        """熔断器状态与当前超时说明"""
+        breaker = self.api_breaker
+        lines = [f"🔌 熔断器：{CircuitBreaker.LABELS[breaker.state]}"]
+        if breaker.state == CircuitBreaker.OPEN:
+            lines.append(f"恢复试探：{breaker.retry_after()} 秒后")
+        lines.append(f"连续失败：{breaker.failures}/{breaker.failure_threshold}")
+        lines.append(f"累计熔断：{breaker.trips} 次，拒绝请求 {breaker.rejected} 次")
+        lines.append("")
+        lines.append(f"⏱️ 自适应超时（上限 {self.api_config['timeout']} 秒）：")
+        for action, label in (("connect", "建立连接"), ("search", "查询"), ("list", "余额同步"), ("recharge", "充值")):
+            tracker = self.api_timeouts[action]
+            p99 = tracker.p99()
+            observed = f"p99 {p99 * 1000:.0f}ms" if p99 is not None else f"样本不足（{len(tracker.samples)}）"
+            lines.append(f"{label}：{min(tracker.timeout(), self.api_config['timeout']):.1f} 秒（{observed}）")
+        return "\n".join(lines)
     
     # ========== API调用方法 ==========
+    def _get_http_session(self) -> aiohttp.ClientSession:
+        """获取共享的HTTP会话（连接池复用keep-alive连接）"""
+        if self.http_session is None or self.http_session.closed:
+            pool = self.api_config["pool"]
+            connector = aiohttp.TCPConnector(
+                limit=pool["limit"],
+                limit_per_host=pool["limit_per_host"],
+                ttl_dns_cache=pool["dns_cache_ttl"],
+                keepalive_timeout=pool["keepalive_timeout"]
+            )
+            # 记录新建连接的耗时，用于计算连接超时（复用keep-alive连接时不触发）
+            trace_config = aiohttp.TraceConfig()
+            trace_config.on_connection_create_start.append(self._on_connection_start)
+            trace_config.on_connection_create_end.append(self._on_connection_end)
+            self.http_session = aiohttp.ClientSession(connector=connector, trace_configs=[trace_config])
+        return self.http_session
+    
+    async def _on_connection_start(self, session, trace_ctx, params):
+        trace_ctx.connect_start = time.perf_counter()
+    
+    async def _on_connection_end(self, session, trace_ctx, params):
+        self.api_timeouts["connect"].observe(time.perf_counter() - trace_ctx.connect_start)
+    
+    def _client_timeout(self, action: str) -> aiohttp.ClientTimeout:
+        """按接口最近耗时计算的超时（连接、读取分开），配置的 timeout 作为总耗时上限"""
+        cap = self.api_config["timeout"]
+        return aiohttp.ClientTimeout(
+            total=cap,
+            sock_connect=min(self.api_timeouts["connect"].timeout(), cap),
+            sock_read=min(self.api_timeouts[action].timeout(), cap)
+        )
+    
+    async def _probe_api(self) -> tuple:
+        """探测API可用性（action=search 取1条），返回 (状态码, 响应JSON)"""
+        session = self._get_http_session()
+        params = {
+            "action": "search",
+            "page": 1,
+            "pageSize": 1
+        }
+        
+        start = time.perf_counter()
+        async with session.get(
+            self.api_config["base_url"],
+            params=params,
+            timeout=self._client_timeout("search")
+        ) as response:
+            self.api_timeouts["search"].observe(time.perf_counter() - start)
+            result = await response.json() if response.status == 200 else None
+            self.metrics.observe("api", "probe", time.perf_counter() - start, response.status != 200)
+            return response.status, result
+    
     async def _get_account_info(self, passport: str) -> Optional[dict]:
-        """调用API查询账号信息"""
-        try:
-            async with aiohttp.ClientSession() as session:
-                # 通过passport查询账号
-                params = {
-                    "action": "search",
-                    "passport": passport,
-                    "page": 1,
-                    "pageSize": 1
-                }
-                
+        """查询账号信息（优先读取缓存，并发的相同查询合并为一次API请求）"""
+        cached = self.account_cache.get(passport)
+        if cached is MISSING:
+            cached = await self.api_flight.do(("search", passport), lambda: self._fetch_account_info(passport))
+        return dict(cached) if cached is not None else None
+    
+    async def _fetch_account_info(self, passport: str) -> Optional[dict]:
+        """调用API查询账号信息（账号不存在返回None，网络故障或熔断时抛出异常）"""
+        # 通过passport查询账号
+        params = {
+            "action": "search",
+            "passport": passport,
+            "page": 1,
+            "pageSize": 1
+        }
+        
+        status, result = await self._search_with_retry(params)
+        if status != 200:
+            logger.error(f"API请求失败，状态码：{status}")
+        elif result.get("success") and result['data']['total'] > 0:
+            # 获取第一个匹配的账号
+            player = result['data']['players'][0]
+            account_info = {
+                "passport": player.get('passport'),
+                "gold_pay": player.get('cash_gold', 0),
+                "gold_pay_total": player.get('total_recharge', 0),
+                "cid": player.get('cid'),
+                "name": player.get('name')
+            }
+            self.account_cache.set(passport, account_info)
+            if self.balance_snapshot is not None and passport in self.balance_snapshot.accounts:
+                self.balance_snapshot.update(passport, account_info)
+            return account_info
+        elif result.get("success"):
+            # 账号不存在：短时间缓存，避免输错/刷屏反复请求API
+            self.account_cache.set(passport, None, self.api_config["cache"]["negative_ttl"])
+        
+        return None
+    
+    async def _search_with_retry(self, params: dict, action: str = "search",
+                                 breaker: Optional[CircuitBreaker] = None) -> tuple:
+        """经熔断器调用 search 接口，返回 (状态码, 响应JSON)
+        
+        网络异常、超时和5xx计为失败，按指数退避加随机抖动重试；重试耗尽或熔断时抛出异常。
+        4xx说明服务可达，不重试也不计入熔断。
+        action 决定使用的超时与耗时统计，breaker 默认为交互请求共用的 api_breaker。
+        """
+        breaker = breaker or self.api_breaker
+        tracker = self.api_timeouts[action]
+        retry = self.api_config["retry"]
+        delays = backoff_delays(retry["attempts"], retry["base_delay"], retry["max_delay"])
+        while True:
+            breaker.check()
+            start = time.perf_counter()
+            try:
+                session = self._get_http_session()
                 async with session.get(
                     self.api_config["base_url"],
                     params=params,
-                    timeout=aiohttp.ClientTimeout(total=self.api_config["timeout"])
+                    timeout=self._client_timeout(action)
                 ) as response:
-                    if response.status == 200:
-                        result = await response.json()
-                        if result.get("success") and result['data']['total'] > 0:
-                            # 获取第一个匹配的账号
-                            player = result['data']['players'][0]
-                            return {
-                                "passport": player.get('passport'),
-                                "gold_pay": player.get('cash_gold', 0),
-                                "gold_pay_total": player.get('total_recharge', 0),
-                                "cid": player.get('cid'),
-                                "name": player.get('name')
-                            }
-                    else:
-                        logger.error(f"API请求失败，状态码：{response.status}")
-        except Exception as e:
-            logger.error(f"查询账号异常：{e}")
+                    tracker.observe(time.perf_counter() - start)
+                    if response.status < 500:
+                        result = await response.json() if response.status == 200 else None
+                        breaker.record_success()
+                        self.metrics.observe("api", action, time.perf_counter() - start)
+                        return response.status, result
+                    error = RuntimeError(f"API请求失败，状态码：{response.status}")
+            except asyncio.TimeoutError as e:
+                # 超时也计入耗时样本，API整体变慢时超时随之放宽（不超过上限）
+                tracker.observe(time.perf_counter() - start)
+                error = e
+            except aiohttp.ClientError as e:
+                error = e
+            
+            self.metrics.observe("api", action, time.perf_counter() - start, True)
+            breaker.record_failure()
+            delay = next(delays, None)
+            if delay is None or breaker.state == CircuitBreaker.OPEN:
+                logger.error(f"{breaker.name}请求失败：{error!r}")
+                raise error
+            logger.warning(f"⚠️ {breaker.name}请求失败（{error!r}），{delay:.2f} 秒后重试")
+            await asyncio.sleep(delay)
+    
+    def _refresh_cached_balance(self, passport: str, response_data: dict):
+        """充值成功后用返回的新余额更新缓存和余额快照，无法更新时缓存直接失效"""
+        if (self.balance_snapshot is not None
+                and "new_gold_pay" in response_data and "new_gold_pay_total" in response_data):
+            self.balance_snapshot.update_balance(
+                passport, response_data["new_gold_pay"], response_data["new_gold_pay_total"]
+            )
+        cached = self.account_cache.peek(passport)
+        if (cached is MISSING or cached is None
+                or "new_gold_pay" not in response_data or "new_gold_pay_total" not in response_data):
+            self.account_cache.invalidate(passport)
+            return
         
-        return None
+        cached = dict(cached)
+        cached["gold_pay"] = response_data["new_gold_pay"]
+        cached["gold_pay_total"] = response_data["new_gold_pay_total"]
+        self.account_cache.set(passport, cached)
     
     async def _execute_account_recharge(self, passport: str, amount: float, remark: str) -> dict:
-        """调用API为账号执行充值"""
+        """调用API为账号执行充值（非幂等，不重试；熔断期间直接失败）"""
+        if not self.api_breaker.allow():
+            return {"success": False, "error": f"游戏服务暂时不可用，请 {max(self.api_breaker.retry_after(), 1)} 秒后重试"}
+        start = time.perf_counter()
         try:
-            async with aiohttp.ClientSession() as session:
-                form_data = aiohttp.FormData()
-                form_data.add_field("action", "recharge")
-                form_data.add_field("passport", passport)  # 使用passport
-                form_data.add_field("amount", str(amount))
-                form_data.add_field("remark", remark)
-                form_data.add_field("source", "qq_bot")  # 来源标识
-                form_data.add_field("secret", self.api_config["qq_bot_secret"])  # 使用配置的密钥
-                
-                async with session.post(
-                    self.api_config["base_url"],
-                    data=form_data,
-                    timeout=aiohttp.ClientTimeout(total=self.api_config["timeout"])
-                ) as response:
-                    if response.status == 200:
-                        result = await response.json()
-                        return result
+            session = self._get_http_session()
+            form_data = aiohttp.FormData()
+            form_data.add_field("action", "recharge")
+            form_data.add_field("passport", passport)  # 使用passport
+            form_data.add_field("amount", str(amount))
+            form_data.add_field("remark", remark)
+            form_data.add_field("source", "qq_bot")  # 来源标识
+            form_data.add_field("secret", self.api_config["qq_bot_secret"])  # 使用配置的密钥
+            
+            async with session.post(
+                self.api_config["base_url"],
+                data=form_data,
+                timeout=self._client_timeout("recharge")
+            ) as response:
+                self.api_timeouts["recharge"].observe(time.perf_counter() - start)
+                if response.status == 200:
+                    result = await response.json()
+                    self.api_breaker.record_success()
+                    self.metrics.observe("api", "recharge", time.perf_counter() - start)
+                    if result.get("success"):
+                        self._refresh_cached_balance(passport, result.get("data") or {})
+                    return result
+                else:
+                    if response.status >= 500:
+                        self.api_breaker.record_failure()
                     else:
-                        logger.error(f"充值API请求失败，状态码：{response.status}")
-                        return {"success": False, "error": f"API请求失败：{response.status}"}
+                        self.api_breaker.record_success()
+                    self.metrics.observe("api", "recharge", time.perf_counter() - start, True)
+                    logger.error(f"充值API请求失败，状态码：{response.status}")
+                    return {"success": False, "error": f"API请求失败：{response.status}"}
                     
         except asyncio.TimeoutError:
+            self.api_timeouts["recharge"].observe(time.perf_counter() - start)
+            self.metrics.observe("api", "recharge", time.perf_counter() - start, True)
+            self.api_breaker.record_failure()
             logger.error("充值请求超时")
             return {"success": False, "error": "请求超时，请稍后重试"}
         except Exception as e:
+            self.metrics.observe("api", "recharge", time.perf_counter() - start, True)
+            self.api_breaker.record_failure()
             logger.error(f"充值请求异常：{e}")
             return {"success": False, "error": f"请求异常：{str(e)}"}
     
+    # ========== 余额同步 ==========
+    def _bound_accounts(self) -> set:
+        """当前已绑定的全部游戏账号"""
+        if self.db is None:
+            return set(self.account_index)
+        return {bind_info.get("game_account") for bind_info in self.bindings.values()}
+    
+    def _save_balance_snapshot(self):
+        """保存余额快照与同步进度（交给写盘线程）"""
+        data = self.balance_snapshot.to_dict()
+        if self.json_writer.running:
+            self.json_writer.submit(self.balance_file, data)
+        else:
+            self._save_json(self.balance_file, data)
+    
+    async def _balance_sync_loop(self, interval: float):
+        """后台定时同步绑定账号余额（上一轮未完成时立即从中断处继续）"""
+        if self._load_task is not None and not self._load_task.done():
+            await self._load_task
+        self.balance_snapshot = BalanceSnapshot(await asyncio.to_thread(self._load_json, self.balance_file))
+        
+        sync_state = self.balance_snapshot.sync
+        if sync_state.get("next_page"):
+            delay = 0
+        else:
+            delay = max(sync_state.get("last_completed", 0) + interval - time.time(), 0)
+        while True:
+            await asyncio.sleep(delay)
+            delay = interval
+            try:
+                await self._sync_balances()
+            except CircuitOpenError as e:
+                logger.warning(f"🔄 余额同步暂停：{e}")
+            except Exception as e:
+                logger.error(f"🔄 余额同步中断，下次从第 {self.balance_snapshot.sync.get('next_page', 1)} 页继续: {e}")
+    
+    async def _sync_balances(self):
+        """分页遍历API的玩家列表，把绑定账号的余额写入快照
+        
+        最多同时请求 concurrency 页；每完成一页推进"已连续完成的页"并定期保存进度，
+        中断（熔断、请求失败、重启）后下一轮从该页继续，而不是从头开始。
+        """
+        config = self.api_config["balance_sync"]
+        snapshot = self.balance_snapshot
+        state = snapshot.sync
+        page_size = config["page_size"]
+        if state.get("next_page") and state.get("page_size") == page_size:
+            first_page, run_started = state["next_page"], state["run_started"]
+            logger.info(f"🔄 继续上次未完成的余额同步：从第 {first_page} 页开始")
+        else:
+            first_page, run_started = 1, time.time()
+            snapshot.sync = state = {"next_page": 1, "page_size": page_size, "run_started": run_started}
+        
+        bound = self._bound_accounts()
+        start = time.perf_counter()
+        finished_pages = set()
+        progress = {"pages": 0, "matched": 0}
+        
+        async def fetch_page(page: int) -> int:
+            status, result = await self._search_with_retry(
+                {"action": "search", "page": page, "pageSize": page_size},
+                action="list", breaker=self.sync_breaker
+            )
+            if status != 200 or not result or not result.get("success"):
+                raise RuntimeError(f"第 {page} 页请求失败（状态码 {status}）")
+            synced_at = time.time()
+            for player in result["data"].get("players") or []:
+                passport = player.get("passport")
+                if passport in bound:
+                    snapshot.update(passport, {
+                        "gold_pay": player.get("cash_gold", 0),
+                        "gold_pay_total": player.get("total_recharge", 0),
+                        "cid": player.get("cid"),
+                        "name": player.get("name")
+                    }, synced_at)
+                    progress["matched"] += 1
+            # 只有之前的页都完成后才推进进度，保证中断后不会漏页
+            finished_pages.add(page)
+            while state["next_page"] in finished_pages:
+                finished_pages.discard(state["next_page"])
+                state["next_page"] += 1
+            progress["pages"] += 1
+            if progress["pages"] % config["save_every"] == 0:
+                self._save_balance_snapshot()
+            return result["data"].get("total", 0)
+        
+        workers = []
+        try:
+            total_pages = max(-(-await fetch_page(first_page) // page_size), 1)
+            state["total_pages"] = total_pages
+            pages = iter(range(first_page + 1, total_pages + 1))
+            
+            async def worker():
+                for page in pages:
+                    await fetch_page(page)
+            
+            workers = [asyncio.create_task(worker()) for _ in range(config["concurrency"])]
+            await asyncio.gather(*workers)
+        except BaseException:
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+            self._save_balance_snapshot()
+            raise
+        
+        removed = snapshot.prune(bound, run_started)
+        snapshot.sync = {"page_size": page_size, "last_completed": time.time(), "total_pages": total_pages}
+        self._save_balance_snapshot()
+        logger.info(
+            f"🔄 余额同步完成：本次 {progress['pages']} 页，更新 {progress['matched']} 个绑定账号，"
+            f"移除 {removed} 个，快照共 {len(snapshot.accounts)} 个，耗时 {time.perf_counter() - start:.1f}s"
+        )
+    
     async def terminate(self):
+        if self._load_task is not None:
+            # 正在读取的线程无法中断，等它结束再关闭，避免与关闭过程同时操作文件
+            await self._load_task
+            self._load_task = None
+        await self.recharge_pool.stop()
+        if self._balance_sync_task is not None:
+            # 取消时同步任务会保存进度，需在写盘线程关闭前完成
+            self._balance_sync_task.cancel()
+            await asyncio.gather(self._balance_sync_task, return_exceptions=True)
+            self._balance_sync_task = None
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            self._flush_task = None
+        self._flush_dirty_stores()
+        if self._metrics_task is not None:
+            self._metrics_task.cancel()
+            self._metrics_task = None
+            try:
+                self._export_metrics()
+            except Exception as e:
+                logger.error(f"📈 导出性能统计失败: {e}")
+        await self.json_writer.close()
+        if self.http_session is not None and not self.http_session.closed:
+            await self.http_session.close()
+        if self.db is not None:
+            self.db.close()
+        elif "recharge_logs" in self._loaded_stores:
+            self.recharge_ledger.close()
         logger.info("游戏账号绑定与充值插件已禁用")
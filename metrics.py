@@ -0,0 +1,153 @@
+import functools
+import threading
+import time
+from bisect import bisect_left
+from typing import Dict, List, Optional, Tuple
+
+# 耗时直方图分桶上界（秒），与 Prometheus 默认分桶相近，补充了亚毫秒区间
+BUCKETS = (0.0001, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# 指标类别 -> (Prometheus 指标名, 标签名)
+KINDS = {
+    "command": ("command", "command"),
+    "api": ("api_request", "action"),
+    "persistence": ("persistence", "operation"),
+}
+
+
+class MetricSeries:
+    """一组计数：调用次数、失败次数、总耗时与耗时直方图"""
+
+    __slots__ = ("count", "errors", "total", "buckets")
+
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.total = 0.0
+        # 最后一个为超过最大分桶的次数（+Inf）
+        self.buckets = [0] * (len(BUCKETS) + 1)
+
+    def quantile(self, q: float) -> Optional[float]:
+        """按直方图估算分位数（桶内线性插值）"""
+        if not self.count:
+            return None
+        target = q * self.count
+        cumulative = 0
+        for i, bucket_count in enumerate(self.buckets):
+            if cumulative + bucket_count >= target and bucket_count:
+                if i == len(BUCKETS):
+                    return BUCKETS[-1]
+                lower = BUCKETS[i - 1] if i else 0.0
+                return lower + (BUCKETS[i] - lower) * (target - cumulative) / bucket_count
+            cumulative += bucket_count
+        return BUCKETS[-1]
+
+
+class Metrics:
+    """命令、API调用与持久化的耗时统计（写盘线程也会记录，因此加锁）"""
+
+    def __init__(self):
+        self.started = time.time()
+        self._series: Dict[Tuple[str, str], MetricSeries] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, kind: str, name: str, seconds: float, error: bool = False):
+        with self._lock:
+            series = self._series.get((kind, name))
+            if series is None:
+                series = self._series[(kind, name)] = MetricSeries()
+            series.count += 1
+            series.total += seconds
+            series.buckets[bisect_left(BUCKETS, seconds)] += 1
+            if error:
+                series.errors += 1
+
+    def measure(self, kind: str, name: str) -> "_Timer":
+        """with metrics.measure(...): 记录代码块耗时（异常计为失败并继续抛出）"""
+        return _Timer(self, kind, name)
+
+    def timed(self, kind: str, name: str, func):
+        """包装同步函数，记录每次调用的耗时（异常计为失败并继续抛出）"""
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                result = func(*args, **kwargs)
+            except Exception:
+                self.observe(kind, name, time.perf_counter() - start, True)
+                raise
+            self.observe(kind, name, time.perf_counter() - start)
+            return result
+        return wrapper
+
+    def series(self, kind: str) -> List[Tuple[str, MetricSeries]]:
+        """某一类别的全部指标（按总耗时从高到低）"""
+        with self._lock:
+            items = [(name, series) for (series_kind, name), series in self._series.items() if series_kind == kind]
+        return sorted(items, key=lambda item: item[1].total, reverse=True)
+
+    def render_prometheus(self, prefix: str = "game_bind") -> str:
+        """导出为 Prometheus 文本格式"""
+        lines = [
+            f"# HELP {prefix}_uptime_seconds 插件运行时间",
+            f"# TYPE {prefix}_uptime_seconds gauge",
+            f"{prefix}_uptime_seconds {time.time() - self.started:.3f}",
+        ]
+        for kind, (metric, label) in KINDS.items():
+            series_list = self.series(kind)
+            if not series_list:
+                continue
+            base = f"{prefix}_{metric}"
+            lines.append(f"# TYPE {base}_duration_seconds histogram")
+            for name, series in series_list:
+                cumulative = 0
+                for bound, bucket_count in zip(BUCKETS, series.buckets):
+                    cumulative += bucket_count
+                    lines.append(f'{base}_duration_seconds_bucket{{{label}="{name}",le="{bound}"}} {cumulative}')
+                lines.append(f'{base}_duration_seconds_bucket{{{label}="{name}",le="+Inf"}} {series.count}')
+                lines.append(f'{base}_duration_seconds_sum{{{label}="{name}"}} {series.total:.6f}')
+                lines.append(f'{base}_duration_seconds_count{{{label}="{name}"}} {series.count}')
+            lines.append(f"# TYPE {base}_errors_total counter")
+            for name, series in series_list:
+                lines.append(f'{base}_errors_total{{{label}="{name}"}} {series.errors}')
+        return "\n".join(lines) + "\n"
+
+
+class _Timer:
+    __slots__ = ("metrics", "kind", "name", "start")
+
+    def __init__(self, metrics: Metrics, kind: str, name: str):
+        self.metrics = metrics
+        self.kind = kind
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.metrics.observe(self.kind, self.name, time.perf_counter() - self.start, exc_type is not None)
+        return False
+
+
+def timed_command(func):
+    """命令处理器耗时统计（放在 @filter.command 下方）
+
+    只计入处理器自身执行的时间，yield 出去等待发送消息的时间不计入。
+    """
+    name = func.__name__
+
+    @functools.wraps(func)
+    async def wrapper(self, *args, **kwargs):
+        elapsed = 0.0
+        start = time.perf_counter()
+        try:
+            async for result in func(self, *args, **kwargs):
+                elapsed += time.perf_counter() - start
+                yield result
+                start = time.perf_counter()
+        except Exception:
+            self.metrics.observe("command", name, elapsed + time.perf_counter() - start, True)
+            raise
+        self.metrics.observe("command", name, elapsed + time.perf_counter() - start)
+    return wrapper
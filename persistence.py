@@ -0,0 +1,136 @@
+import asyncio
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+from astrbot.api import logger
+
+
+def atomic_write_json(file_path: str, data: Any):
+    """原子写入JSON：先写临时文件并 fsync，再 os.replace 覆盖
+
+    写到一半崩溃只会留下临时文件，原文件始终完整。
+    """
+    if isinstance(data, RecordsSnapshot):
+        data = data.to_dict()
+    tmp_path = file_path + ".tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, file_path)
+
+
+def atomic_write_text(file_path: str, text: str):
+    """原子写入文本文件（供外部程序读取的导出文件，不需要 fsync）"""
+    tmp_path = file_path + ".tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(text)
+    os.replace(tmp_path, file_path)
+
+
+class RecordsSnapshot:
+    """紧凑记录（如 UserPoints）集合的快照
+
+    事件循环中只取出每条记录的字段元组，转回原有 dict 格式的工作留给写盘线程，
+    不在事件循环中逐条构造 dict。
+    """
+
+    __slots__ = ("keys", "states", "state_to_dict")
+
+    def __init__(self, keys: list, states: list, state_to_dict: Callable[[tuple], dict]):
+        self.keys = keys
+        self.states = states
+        self.state_to_dict = state_to_dict
+
+    def to_dict(self) -> dict:
+        return dict(zip(self.keys, map(self.state_to_dict, self.states)))
+
+
+def snapshot_store(data: dict):
+    """在事件循环中复制一份数据快照，供后台线程序列化（避免序列化时数据被修改）
+
+    全部为紧凑记录时返回 RecordsSnapshot（由 atomic_write_json 在写盘线程中转换），否则返回 dict。
+    """
+    record_type = type(next(iter(data.values()), None))
+    if hasattr(record_type, "state"):
+        try:
+            return RecordsSnapshot(list(data), list(map(record_type.state, data.values())), record_type.state_to_dict)
+        except AttributeError:
+            # 混有其他类型的值，逐条复制
+            pass
+
+    snapshot = {}
+    for key, value in data.items():
+        if isinstance(value, dict):
+            value = dict(value)
+        elif isinstance(value, list):
+            value = list(value)
+        elif hasattr(value, "to_dict"):
+            value = value.to_dict()
+        snapshot[key] = value
+    return snapshot
+
+
+class AsyncJsonWriter:
+    """在专用线程中执行序列化与写盘
+
+    每个文件同时最多只有一个写入在执行；执行期间再提交的写入只保留最新一份。
+    单线程执行器保证提交的任务按顺序落盘。
+    """
+
+    def __init__(self, save_func: Callable[[str, Any], None]):
+        self._save_func = save_func
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._pending: Dict[str, Any] = {}
+        self._writers: Dict[str, asyncio.Task] = {}
+        self._background = set()
+
+    @property
+    def running(self) -> bool:
+        return self._executor is not None
+
+    def start(self):
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="game_bind_io")
+
+    def submit(self, file_path: str, data: Any):
+        """提交一次整文件写入（data 应为快照）"""
+        self._pending[file_path] = data
+        if file_path not in self._writers:
+            self._writers[file_path] = asyncio.create_task(self._drain(file_path))
+
+    async def _drain(self, file_path: str):
+        try:
+            while file_path in self._pending:
+                data = self._pending.pop(file_path)
+                try:
+                    await asyncio.get_running_loop().run_in_executor(
+                        self._executor, self._save_func, file_path, data
+                    )
+                except Exception as e:
+                    logger.error(f"💾 保存文件失败 {file_path}: {e}")
+        finally:
+            self._writers.pop(file_path, None)
+
+    def run(self, func: Callable, *args):
+        """在写盘线程中执行任意阻塞操作（不等待结果，按提交顺序执行）"""
+        future = asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+        self._background.add(future)
+        future.add_done_callback(self._on_background_done)
+
+    def _on_background_done(self, future: asyncio.Future):
+        self._background.discard(future)
+        if not future.cancelled() and future.exception() is not None:
+            logger.error(f"💾 后台写盘失败: {future.exception()}")
+
+    async def drain(self):
+        """等待所有已提交的写入完成"""
+        while self._writers or self._background:
+            await asyncio.gather(*self._writers.values(), *self._background, return_exceptions=True)
+
+    async def close(self):
+        await self.drain()
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
@@ -0,0 +1,128 @@
+from datetime import date
+from functools import lru_cache
+from operator import attrgetter
+from typing import Any, Optional
+
+
+@lru_cache(maxsize=4096)
+def _iso(ordinal: int) -> str:
+    """日序数 -> "YYYY-MM-DD"（签到日期取值有限，缓存后同一天只生成一个字符串）"""
+    return date.fromordinal(ordinal).isoformat()
+
+
+@lru_cache(maxsize=4096)
+def _ordinal(text: str) -> int:
+    """"YYYY-MM-DD" -> 日序数（格式不符时抛出 ValueError）"""
+    return date.fromisoformat(text).toordinal()
+
+
+class UserPoints:
+    """用户积分记录（紧凑表示）
+
+    用 __slots__ 代替 dict，签到日期以日序数（date.toordinal()，0 表示无）保存。
+    仍按 record["points"] 的方式读写，日期字段读写时与原来一样使用 "YYYY-MM-DD" 字符串；
+    to_dict() / from_dict() 与原有的 JSON 格式一一对应。
+    extra 只整体替换、不原地修改，state() 取出的字段元组因此可以安全地交给写盘线程。
+    """
+
+    __slots__ = ("points", "total_earned", "total_spent", "first_sign", "last_sign", "continuous_days", "extra")
+
+    FIELDS = ("points", "total_earned", "total_spent", "first_sign_date", "last_sign_date", "continuous_days")
+    _DATE_SLOTS = {"first_sign_date": "first_sign", "last_sign_date": "last_sign"}
+    # 全部字段值组成的元组（C 层实现，用于写盘快照）
+    state = staticmethod(attrgetter(*__slots__))
+
+    def __init__(self, points: int = 0, total_earned: int = 0, total_spent: int = 0,
+                 first_sign: int = 0, last_sign: int = 0, continuous_days: int = 0):
+        self.points = points
+        self.total_earned = total_earned
+        self.total_spent = total_spent
+        self.first_sign = first_sign
+        self.last_sign = last_sign
+        self.continuous_days = continuous_days
+        # 固定字段以外的键，以及无法识别的日期原文（一般为 None）
+        self.extra: Optional[dict] = None
+
+    def _set_extra(self, key: str, value: Any):
+        self.extra = {**(self.extra or {}), key: value}
+
+    def __getitem__(self, key: str):
+        slot = self._DATE_SLOTS.get(key)
+        if slot is not None:
+            ordinal = getattr(self, slot)
+            if ordinal:
+                return _iso(ordinal)
+            return self.extra.get(key) if self.extra else None
+        if key in self.FIELDS:
+            return getattr(self, key)
+        if self.extra and key in self.extra:
+            return self.extra[key]
+        raise KeyError(key)
+
+    def __setitem__(self, key: str, value: Any):
+        slot = self._DATE_SLOTS.get(key)
+        if slot is not None:
+            if self.extra and key in self.extra:
+                self.extra = {k: v for k, v in self.extra.items() if k != key} or None
+            try:
+                setattr(self, slot, _ordinal(value) if value else 0)
+            except (TypeError, ValueError):
+                # 非 YYYY-MM-DD 的历史数据原样保留
+                setattr(self, slot, 0)
+                self._set_extra(key, value)
+        elif key in self.FIELDS:
+            setattr(self, key, value)
+        else:
+            self._set_extra(key, value)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.FIELDS or bool(self.extra and key in self.extra)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def keys(self):
+        return list(self.FIELDS) + [key for key in (self.extra or ()) if key not in self._DATE_SLOTS]
+
+    def to_dict(self) -> dict:
+        return self.state_to_dict(self.state(self))
+
+    @staticmethod
+    def state_to_dict(state: tuple) -> dict:
+        """state() 的结果 -> 原有的 dict 格式"""
+        points, total_earned, total_spent, first_sign, last_sign, continuous_days, extra = state
+        data = {
+            "points": points,
+            "total_earned": total_earned,
+            "total_spent": total_spent,
+            "first_sign_date": _iso(first_sign) if first_sign else None,
+            "last_sign_date": _iso(last_sign) if last_sign else None,
+            "continuous_days": continuous_days
+        }
+        if extra:
+            data.update(extra)
+        return data
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "UserPoints":
+        first, last = data.get("first_sign_date"), data.get("last_sign_date")
+        try:
+            record = cls(data.get("points", 0), data.get("total_earned", 0), data.get("total_spent", 0),
+                         _ordinal(first) if first else 0, _ordinal(last) if last else 0,
+                         data.get("continuous_days", 0))
+        except (TypeError, ValueError):
+            record = cls(data.get("points", 0), data.get("total_earned", 0), data.get("total_spent", 0),
+                         0, 0, data.get("continuous_days", 0))
+            record["first_sign_date"] = first
+            record["last_sign_date"] = last
+        if len(data) != len(cls.FIELDS):
+            for key, value in data.items():
+                if key not in cls.FIELDS:
+                    record._set_extra(key, value)
+        return record
+
+    def __repr__(self):
+        return f"UserPoints({self.to_dict()!r})"
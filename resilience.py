@@ -0,0 +1,127 @@
+import math
+import random
+import time
+from collections import deque
+from typing import Iterator, Optional
+from astrbot.api import logger
+
+
+class CircuitOpenError(Exception):
+    """熔断器打开期间拒绝调用"""
+
+
+class CircuitBreaker:
+    """熔断器
+
+    连续失败达到阈值后打开，打开期间直接拒绝调用；冷却时间过后进入半开状态，
+    只放行一个试探请求：成功则关闭，失败则重新打开。
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+    LABELS = {CLOSED: "关闭（正常）", OPEN: "打开（快速失败）", HALF_OPEN: "半开（试探中）"}
+
+    def __init__(self, name: str, failure_threshold: int = 5, recovery_timeout: float = 30.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probe_started = 0.0
+        self._probing = False
+        self.rejected = 0
+        self.trips = 0
+
+    def _set_state(self, state: str):
+        if state == self.state:
+            return
+        logger.warning(f"🔌 熔断器 {self.name}：{self.LABELS[self.state]} → {self.LABELS[state]}")
+        self.state = state
+
+    def allow(self) -> bool:
+        """是否放行本次调用（放行后调用方必须记录成功或失败）"""
+        now = time.monotonic()
+        if self.state == self.OPEN and now - self.opened_at >= self.recovery_timeout:
+            self._set_state(self.HALF_OPEN)
+            self._probing = False
+        if self.state == self.HALF_OPEN:
+            # 试探请求被取消而没有记录结果时，冷却时间过后允许再次试探
+            if not self._probing or now - self._probe_started >= self.recovery_timeout:
+                self._probing = True
+                self._probe_started = now
+                return True
+        elif self.state == self.CLOSED:
+            return True
+        self.rejected += 1
+        return False
+
+    def check(self):
+        """不放行时抛出 CircuitOpenError"""
+        if not self.allow():
+            raise CircuitOpenError(f"API暂时不可用（熔断中），请 {max(self.retry_after(), 1)} 秒后重试")
+
+    def record_success(self):
+        self.failures = 0
+        self._probing = False
+        self._set_state(self.CLOSED)
+
+    def record_failure(self):
+        self.failures += 1
+        self._probing = False
+        if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            if self.state != self.OPEN:
+                self.trips += 1
+            self.opened_at = time.monotonic()
+            self._set_state(self.OPEN)
+
+    def retry_after(self) -> int:
+        """距离下次允许试探的秒数（向上取整）"""
+        if self.state != self.OPEN:
+            return 0
+        return max(math.ceil(self.recovery_timeout - (time.monotonic() - self.opened_at)), 0)
+
+
+def backoff_delays(attempts: int, base_delay: float, max_delay: float) -> Iterator[float]:
+    """重试前的等待时间（指数退避 + 完全抖动），共 attempts - 1 个"""
+    for attempt in range(attempts - 1):
+        yield random.uniform(0, min(max_delay, base_delay * (2 ** attempt)))
+
+
+class AdaptiveTimeout:
+    """根据最近的耗时样本计算超时
+
+    超时 = 最近 window 次耗时的 p99 × factor，并限制在 [floor, ceiling] 之间；
+    样本不足 min_samples 时直接使用 ceiling。
+    """
+
+    def __init__(self, floor: float, ceiling: float, factor: float = 3.0,
+                 window: int = 500, min_samples: int = 20):
+        self.floor = floor
+        self.ceiling = ceiling
+        self.factor = factor
+        self.min_samples = min_samples
+        self.samples: deque = deque(maxlen=window)
+        self._p99: Optional[float] = None
+        self._stale = 0
+
+    def observe(self, seconds: float):
+        self.samples.append(seconds)
+        self._stale += 1
+
+    def p99(self) -> Optional[float]:
+        """最近样本的 p99（样本不足时为 None；每积累 10 个新样本重新排序一次）"""
+        if len(self.samples) < self.min_samples:
+            return None
+        if self._p99 is None or self._stale >= 10:
+            ordered = sorted(self.samples)
+            self._p99 = ordered[min(int(len(ordered) * 0.99), len(ordered) - 1)]
+            self._stale = 0
+        return self._p99
+
+    def timeout(self) -> float:
+        p99 = self.p99()
+        if p99 is None:
+            return self.ceiling
+        return min(max(p99 * self.factor, self.floor), self.ceiling)
@@ -0,0 +1,266 @@
+from bisect import bisect_left, bisect_right, insort
+from itertools import islice
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+
+class SortedKeyList:
+    """分桶有序列表
+
+    元素分散在若干个有序小桶中，增删只移动一个桶内的元素；
+    桶大小用树状数组维护，按位置取元素、求排名都是 O(log n)。
+    """
+
+    LOAD = 500
+
+    def __init__(self, keys: Iterable = ()):
+        keys = sorted(keys)
+        self._buckets: List[list] = [keys[i:i + self.LOAD] for i in range(0, len(keys), self.LOAD)]
+        self._maxes: List[Any] = [bucket[-1] for bucket in self._buckets]
+        self._len = len(keys)
+        self._rebuild_tree()
+
+    def _rebuild_tree(self):
+        tree = [0] * (len(self._buckets) + 1)
+        for i, bucket in enumerate(self._buckets, 1):
+            tree[i] += len(bucket)
+            parent = i + (i & -i)
+            if parent < len(tree):
+                tree[parent] += tree[i]
+        self._tree = tree
+
+    def _tree_add(self, i: int, delta: int):
+        i += 1
+        while i < len(self._tree):
+            self._tree[i] += delta
+            i += i & -i
+
+    def _prefix(self, i: int) -> int:
+        """前 i 个桶的元素总数"""
+        total = 0
+        while i > 0:
+            total += self._tree[i]
+            i -= i & -i
+        return total
+
+    def _locate(self, index: int) -> Tuple[int, int]:
+        """位置 -> (桶号, 桶内位置)"""
+        pos = 0
+        step = 1 << (len(self._tree) - 1).bit_length()
+        while step:
+            nxt = pos + step
+            if nxt < len(self._tree) and self._tree[nxt] <= index:
+                pos = nxt
+                index -= self._tree[nxt]
+            step >>= 1
+        return pos, index
+
+    def add(self, key):
+        if not self._buckets:
+            self._buckets.append([key])
+            self._maxes.append(key)
+            self._len = 1
+            self._rebuild_tree()
+            return
+
+        i = bisect_left(self._maxes, key)
+        if i == len(self._maxes):
+            i -= 1
+        bucket = self._buckets[i]
+        insort(bucket, key)
+        self._maxes[i] = bucket[-1]
+        self._len += 1
+
+        if len(bucket) > self.LOAD * 2:
+            self._buckets[i:i + 1] = [bucket[:self.LOAD], bucket[self.LOAD:]]
+            self._maxes[i:i + 1] = [bucket[self.LOAD - 1], bucket[-1]]
+            self._rebuild_tree()
+        else:
+            self._tree_add(i, 1)
+
+    def remove(self, key):
+        i = bisect_left(self._maxes, key)
+        if i == len(self._maxes):
+            raise ValueError(f"{key!r} not in list")
+        bucket = self._buckets[i]
+        j = bisect_left(bucket, key)
+        if j == len(bucket) or bucket[j] != key:
+            raise ValueError(f"{key!r} not in list")
+        del bucket[j]
+        self._len -= 1
+
+        if bucket:
+            self._maxes[i] = bucket[-1]
+            self._tree_add(i, -1)
+        else:
+            del self._buckets[i]
+            del self._maxes[i]
+            self._rebuild_tree()
+
+    def index(self, key) -> int:
+        """小于 key 的元素个数（key 在列表中时即为其位置）"""
+        i = bisect_left(self._maxes, key)
+        if i == len(self._maxes):
+            return self._len
+        return self._prefix(i) + bisect_left(self._buckets[i], key)
+
+    def islice(self, start: int, stop: Optional[int] = None) -> Iterator:
+        """按位置区间遍历"""
+        if stop is None or stop > self._len:
+            stop = self._len
+        if start >= stop:
+            return
+        i, j = self._locate(start)
+        remaining = stop - start
+        while remaining and i < len(self._buckets):
+            chunk = self._buckets[i][j:j + remaining]
+            yield from chunk
+            remaining -= len(chunk)
+            i, j = i + 1, 0
+
+    def irange_after(self, key) -> Iterator:
+        """从第一个大于 key 的元素开始遍历"""
+        i = bisect_right(self._maxes, key)
+        if i == len(self._maxes):
+            return
+        j = bisect_right(self._buckets[i], key)
+        while i < len(self._buckets):
+            yield from self._buckets[i][j:]
+            i, j = i + 1, 0
+
+    def __len__(self):
+        return self._len
+
+    def __iter__(self):
+        for bucket in self._buckets:
+            yield from bucket
+
+
+# 用户列表可用的排序别名 -> 排序字段
+USER_SORT_ALIASES = {
+    "points": "points", "积分": "points",
+    "earned": "total_earned", "total_earned": "total_earned", "累计": "total_earned",
+    "streak": "continuous_days", "continuous_days": "continuous_days", "签到": "continuous_days",
+    "qq": "qq", "QQ": "qq",
+}
+
+
+class UserRankIndex:
+    """用户排序索引：按积分、累计获得、连续签到天数（降序）或QQ号（升序）
+
+    排序键为 (-数值, QQ)，数值相同时按QQ排列，顺序稳定，排序键本身即可作为翻页游标；
+    按QQ排序时键为 (位数, QQ)，按数值大小而不是字符串顺序排列（"9999" 在 "10000" 之前）。
+    每种排序在第一次使用时才建立，之后随积分变动增量维护。
+    """
+
+    FIELDS = ("points", "total_earned", "continuous_days")
+
+    def __init__(self, source: Callable[[], Iterable[Tuple[str, Any]]]):
+        # source：返回 (QQ, 积分记录) 的可迭代对象，用于首次建立索引
+        self._source = source
+        self._lists: Dict[str, SortedKeyList] = {}
+        self._values: Dict[str, tuple] = {}
+
+    @staticmethod
+    def _record_values(record) -> tuple:
+        return tuple(record[field] or 0 for field in UserRankIndex.FIELDS)
+
+    def _key(self, sort: str, qq_id: str, values: tuple):
+        if sort == "qq":
+            return self._qq_key(qq_id)
+        return (-values[self.FIELDS.index(sort)], qq_id)
+
+    def _list(self, sort: str) -> SortedKeyList:
+        if sort not in self._lists:
+            if not self._lists:
+                self._values = {qq_id: self._record_values(record) for qq_id, record in self._source()}
+            self._lists[sort] = SortedKeyList(
+                self._key(sort, qq_id, values) for qq_id, values in self._values.items()
+            )
+        return self._lists[sort]
+
+    @staticmethod
+    def _qq_key(qq_id: str) -> tuple:
+        return (len(qq_id), qq_id)
+
+    @staticmethod
+    def _qq(key) -> str:
+        return key[1]
+
+    def reset(self):
+        """丢弃已建立的索引，下次使用时从数据源重新建立"""
+        self._lists = {}
+        self._values = {}
+
+    def update(self, qq_id: str, record):
+        """积分记录新增或变动后调用"""
+        if not self._lists:
+            return
+        values = self._record_values(record)
+        old = self._values.get(qq_id)
+        if old == values:
+            return
+        self._values[qq_id] = values
+        for sort, keys in self._lists.items():
+            if old is None:
+                keys.add(self._key(sort, qq_id, values))
+            elif sort != "qq":
+                old_key = self._key(sort, qq_id, old)
+                new_key = self._key(sort, qq_id, values)
+                if old_key != new_key:
+                    keys.remove(old_key)
+                    keys.add(new_key)
+
+    def page(self, sort: str, offset: int, limit: int) -> List[str]:
+        """按位置取一页QQ"""
+        return [self._qq(key) for key in self._list(sort).islice(offset, offset + limit)]
+
+    def page_after(self, sort: str, cursor: str, limit: int) -> List[str]:
+        """取游标之后的一页QQ"""
+        return [self._qq(key) for key in islice(self._list(sort).irange_after(self.parse_cursor(sort, cursor)), limit)]
+
+    def position(self, sort: str, qq_id: str) -> int:
+        """QQ 在指定排序中的位置（从0开始）"""
+        keys = self._list(sort)
+        return keys.index(self._key(sort, qq_id, self._values[qq_id]))
+
+    def top(self, sort: str, k: int) -> List[Tuple[int, str, int]]:
+        """前 K 名（数值为0的不上榜），返回 (名次, QQ, 数值)；数值相同名次相同"""
+        results = []
+        rank = 0
+        prev = None
+        for position, (neg_value, qq_id) in enumerate(self._list(sort).islice(0, k)):
+            if neg_value == 0:
+                break
+            if neg_value != prev:
+                rank, prev = position + 1, neg_value
+            results.append((rank, qq_id, -neg_value))
+        return results
+
+    def rank(self, sort: str, qq_id: str) -> Optional[int]:
+        """QQ 的名次（比他数值高的人数 + 1），不在索引中返回 None"""
+        keys = self._list(sort)
+        values = self._values.get(qq_id)
+        if values is None:
+            return None
+        # "" 小于任何QQ，定位到同数值的第一位
+        return keys.index((-values[self.FIELDS.index(sort)], "")) + 1
+
+    def value(self, sort: str, qq_id: str) -> int:
+        self._list(sort)
+        return self._values[qq_id][self.FIELDS.index(sort)]
+
+    def cursor(self, sort: str, qq_id: str) -> str:
+        """QQ 在指定排序下的游标文本：数值:QQ（按QQ排序时即QQ本身）"""
+        self._list(sort)
+        if sort == "qq":
+            return qq_id
+        return f"{self._values[qq_id][self.FIELDS.index(sort)]}:{qq_id}"
+
+    def parse_cursor(self, sort: str, text: str):
+        """游标文本 -> 排序键（格式错误时抛出 ValueError）"""
+        if sort == "qq":
+            return self._qq_key(text)
+        value, sep, qq_id = text.partition(":")
+        if not sep or not qq_id:
+            raise ValueError(f"无效的游标 {text}")
+        return (-int(value), qq_id)
@@ -0,0 +1,67 @@
+from collections.abc import Mapping, MutableMapping
+from typing import Dict, Iterable, Tuple
+from .log_index import log_time, log_type
+
+# 每日统计项
+STAT_FIELDS = (
+    "sign_count",        # 签到次数
+    "sign_points",       # 签到发放积分
+    "recharge_count",    # 充值笔数（含赠送充值）
+    "recharge_points",   # 充值消耗积分
+    "recharge_yuanbao",  # 充值元宝
+    "transfer_count",    # 积分转移笔数
+    "transfer_points",   # 积分转移数量
+    "admin_count",       # 管理员添加笔数
+    "admin_points",      # 管理员添加积分
+)
+
+
+def log_stats(entry: dict) -> Dict[str, int]:
+    """一条流水对应的统计增量（写入流水时和重建统计时共用）"""
+    type_name = log_type(entry)
+    if type_name in ("normal", "gift_recharge"):
+        return {
+            "recharge_count": 1,
+            "recharge_points": entry.get("points_used", 0),
+            "recharge_yuanbao": entry.get("recharge_amount", 0)
+        }
+    if type_name == "points_transfer":
+        return {"transfer_count": 1, "transfer_points": entry.get("points", 0)}
+    if type_name == "admin_add_points":
+        return {"admin_count": 1, "admin_points": entry.get("points", 0)}
+    return {}
+
+
+def add_stats(store: MutableMapping, day: str, increments: Dict[str, int]):
+    """累加某一天的统计（重新赋值以兼容SQLite后端）"""
+    if not increments:
+        return
+    row = dict(store.get(day) or {})
+    for field, value in increments.items():
+        row[field] = row.get(field, 0) + value
+    store[day] = row
+
+
+def rebuild_daily_stats(logs: Iterable[Tuple[str, dict]], sign_records: Mapping,
+                        current: Mapping) -> Dict[str, dict]:
+    """根据全部流水和签到记录重建每日统计
+
+    流水相关的统计项完全重新计算；签到记录只保存每个用户最后一次签到，
+    因此签到项取重建结果与现有计数中较大的一个，不会把已有的签到历史清零。
+    """
+    rebuilt: Dict[str, dict] = {}
+    for _, entry in logs:
+        add_stats(rebuilt, log_time(entry)[:10], log_stats(entry))
+
+    signs: Dict[str, dict] = {}
+    for record in sign_records.values():
+        if record.get("last_sign"):
+            add_stats(signs, record["last_sign"], {"sign_count": 1, "sign_points": record.get("reward") or 0})
+
+    for day in set(rebuilt) | set(signs) | set(current):
+        row = rebuilt.setdefault(day, {})
+        existing = current.get(day) or {}
+        from_signs = signs.get(day, {})
+        for field in ("sign_count", "sign_points"):
+            row[field] = max(existing.get(field, 0), from_signs.get(field, 0))
+    return rebuilt
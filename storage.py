@@ -0,0 +1,335 @@
+import json
+import sqlite3
+from collections.abc import MutableMapping
+from typing import Dict, List, Optional, Tuple
+from astrbot.api import logger
+from .log_index import log_time, log_type, log_users
+from .stats import STAT_FIELDS
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS bindings (
+    qq_id TEXT PRIMARY KEY,
+    game_account TEXT NOT NULL,
+    account_name TEXT,
+    bind_time TEXT,
+    extra TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_bindings_game_account ON bindings (game_account);
+CREATE TABLE IF NOT EXISTS user_points (
+    qq_id TEXT PRIMARY KEY,
+    points INTEGER NOT NULL DEFAULT 0,
+    total_earned INTEGER NOT NULL DEFAULT 0,
+    total_spent INTEGER NOT NULL DEFAULT 0,
+    first_sign_date TEXT,
+    last_sign_date TEXT,
+    continuous_days INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_user_points_points ON user_points (points);
+CREATE TABLE IF NOT EXISTS sign_records (
+    qq_id TEXT PRIMARY KEY,
+    last_sign TEXT,
+    reward INTEGER,
+    continuous_days INTEGER
+);
+CREATE TABLE IF NOT EXISTS recharge_logs (
+    log_id TEXT PRIMARY KEY,
+    type TEXT NOT NULL,
+    qq_id TEXT,
+    log_time TEXT,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_recharge_logs_qq ON recharge_logs (qq_id);
+CREATE INDEX IF NOT EXISTS idx_recharge_logs_type ON recharge_logs (type);
+CREATE INDEX IF NOT EXISTS idx_recharge_logs_time ON recharge_logs (log_time);
+CREATE TABLE IF NOT EXISTS recharge_log_users (
+    qq_id TEXT NOT NULL,
+    log_id TEXT NOT NULL,
+    PRIMARY KEY (qq_id, log_id)
+);
+CREATE INDEX IF NOT EXISTS idx_recharge_log_users_log ON recharge_log_users (log_id);
+CREATE TABLE IF NOT EXISTS daily_stats (
+    day TEXT PRIMARY KEY,
+    sign_count INTEGER NOT NULL DEFAULT 0,
+    sign_points INTEGER NOT NULL DEFAULT 0,
+    recharge_count INTEGER NOT NULL DEFAULT 0,
+    recharge_points INTEGER NOT NULL DEFAULT 0,
+    recharge_yuanbao INTEGER NOT NULL DEFAULT 0,
+    transfer_count INTEGER NOT NULL DEFAULT 0,
+    transfer_points INTEGER NOT NULL DEFAULT 0,
+    admin_count INTEGER NOT NULL DEFAULT 0,
+    admin_points INTEGER NOT NULL DEFAULT 0
+);
+"""
+
+
+class SqliteTable(MutableMapping):
+    """以字典方式访问的 SQLite 表（一行对应一个键）
+
+    取出的值是新构造的 dict，原地修改不会写回，修改后需重新赋值。
+    写入不会自动提交，由 SqliteStorage.commit() 统一提交。
+    """
+
+    table = ""
+    key_column = "qq_id"
+    columns: List[str] = []
+
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+        cols = ", ".join(self.columns)
+        self._select_sql = f"SELECT {cols} FROM {self.table} WHERE {self.key_column} = ?"
+        self._upsert_sql = (
+            f"INSERT OR REPLACE INTO {self.table} ({self.key_column}, {cols}) "
+            f"VALUES (?, {', '.join('?' for _ in self.columns)})"
+        )
+
+    def _to_row(self, value: dict) -> tuple:
+        return tuple(value.get(col) for col in self.columns)
+
+    def _to_value(self, key: str, row: tuple) -> dict:
+        return dict(zip(self.columns, row))
+
+    def __getitem__(self, key):
+        row = self.conn.execute(self._select_sql, (str(key),)).fetchone()
+        if row is None:
+            raise KeyError(key)
+        return self._to_value(str(key), row)
+
+    def __setitem__(self, key, value):
+        self.conn.execute(self._upsert_sql, (str(key),) + self._to_row(value))
+
+    def __delitem__(self, key):
+        cur = self.conn.execute(f"DELETE FROM {self.table} WHERE {self.key_column} = ?", (str(key),))
+        if cur.rowcount == 0:
+            raise KeyError(key)
+
+    def __contains__(self, key):
+        return self.conn.execute(
+            f"SELECT 1 FROM {self.table} WHERE {self.key_column} = ?", (str(key),)
+        ).fetchone() is not None
+
+    def __iter__(self):
+        for (key,) in self.conn.execute(f"SELECT {self.key_column} FROM {self.table} ORDER BY rowid"):
+            yield key
+
+    def __len__(self):
+        return self.conn.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+
+    def iter_rows(self):
+        """一次查询遍历整表，返回 (键, 值)（建立内存索引用，避免逐键查询）"""
+        cols = ", ".join(self.columns)
+        for row in self.conn.execute(f"SELECT {self.key_column}, {cols} FROM {self.table} ORDER BY rowid"):
+            yield row[0], self._to_value(row[0], row[1:])
+
+    def bulk_load(self, data: Dict[str, dict]):
+        """批量导入（迁移用）"""
+        self.conn.executemany(
+            self._upsert_sql,
+            ((str(key),) + self._to_row(value) for key, value in data.items())
+        )
+
+
+class BindingsTable(SqliteTable):
+    """绑定表：固定字段之外的键（如 old_account）存入 extra"""
+
+    table = "bindings"
+    columns = ["game_account", "account_name", "bind_time", "extra"]
+    _fixed = ("game_account", "account_name", "bind_time", "qq_id")
+
+    def _to_row(self, value: dict) -> tuple:
+        extra = {k: v for k, v in value.items() if k not in self._fixed}
+        return (
+            value.get("game_account"),
+            value.get("account_name"),
+            value.get("bind_time"),
+            json.dumps(extra, ensure_ascii=False) if extra else None
+        )
+
+    def _to_value(self, key: str, row: tuple) -> dict:
+        game_account, account_name, bind_time, extra = row
+        value = {
+            "game_account": game_account,
+            "account_name": account_name,
+            "bind_time": bind_time,
+            "qq_id": key
+        }
+        if extra:
+            value.update(json.loads(extra))
+        return value
+
+    def find_by_game_account(self, game_account: str) -> List[str]:
+        """按游戏账号查找绑定的QQ（走索引）"""
+        rows = self.conn.execute(
+            "SELECT qq_id FROM bindings WHERE game_account = ? ORDER BY rowid", (game_account,)
+        ).fetchall()
+        return [row[0] for row in rows]
+
+
+class UserPointsTable(SqliteTable):
+    table = "user_points"
+    columns = ["points", "total_earned", "total_spent", "first_sign_date", "last_sign_date", "continuous_days"]
+
+
+class SignRecordsTable(SqliteTable):
+    table = "sign_records"
+    columns = ["last_sign", "reward", "continuous_days"]
+
+
+class DailyStatsTable(SqliteTable):
+    """每日统计表：一天一行"""
+
+    table = "daily_stats"
+    key_column = "day"
+    columns = list(STAT_FIELDS)
+
+    def _to_row(self, value: dict) -> tuple:
+        return tuple(value.get(col, 0) for col in self.columns)
+
+
+class RechargeLogsTable(SqliteTable):
+    """充值流水表：完整内容存 JSON，类型/用户/时间单独建列并加索引
+
+    流水涉及的所有QQ（qq_id/from_qq/to_qq/target_qq）另存于 recharge_log_users，用于按用户查询。
+    """
+
+    table = "recharge_logs"
+    key_column = "log_id"
+    columns = ["type", "qq_id", "log_time", "data"]
+
+    def _to_row(self, value: dict) -> tuple:
+        return (
+            log_type(value),
+            value.get("qq_id") or value.get("from_qq") or value.get("target_qq"),
+            log_time(value),
+            json.dumps(value, ensure_ascii=False)
+        )
+
+    def _to_value(self, key: str, row: tuple) -> dict:
+        return json.loads(row[-1])
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self._index_users([(str(key), value)])
+
+    def __delitem__(self, key):
+        super().__delitem__(key)
+        self.conn.execute("DELETE FROM recharge_log_users WHERE log_id = ?", (str(key),))
+
+    def bulk_load(self, data: Dict[str, dict]):
+        super().bulk_load(data)
+        self._index_users((str(key), value) for key, value in data.items())
+
+    def _index_users(self, items):
+        self.conn.executemany(
+            "INSERT OR IGNORE INTO recharge_log_users (qq_id, log_id) VALUES (?, ?)",
+            ((qq_id, log_id) for log_id, value in items for qq_id in log_users(value))
+        )
+
+    def rebuild_user_index(self):
+        """为旧数据库补建用户索引"""
+        self.conn.execute("DELETE FROM recharge_log_users")
+        self._index_users(
+            (log_id, json.loads(data))
+            for log_id, data in self.conn.execute("SELECT log_id, data FROM recharge_logs").fetchall()
+        )
+
+    def query(self, qq_id: Optional[str] = None, type_name: Optional[str] = None,
+              start_day: Optional[str] = None, end_day: Optional[str] = None,
+              offset: int = 0, limit: int = 10) -> Tuple[List[Tuple[str, dict]], bool]:
+        """按条件查询流水（从新到旧），返回 (本页流水, 是否还有下一页)"""
+        sql = "SELECT l.log_id, l.data FROM recharge_logs l"
+        conditions, params = [], []
+        if qq_id is not None:
+            sql += " JOIN recharge_log_users u ON u.log_id = l.log_id AND u.qq_id = ?"
+            params.append(qq_id)
+        if type_name is not None:
+            conditions.append("l.type = ?")
+            params.append(type_name)
+        if start_day is not None:
+            conditions.append("l.log_time >= ? AND l.log_time <= ?")
+            params += [f"{start_day} 00:00:00", f"{end_day} 23:59:59"]
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        sql += " ORDER BY l.rowid DESC LIMIT ? OFFSET ?"
+        params += [limit + 1, offset]
+
+        rows = self.conn.execute(sql, params).fetchall()
+        results = [(log_id, json.loads(data)) for log_id, data in rows[:limit]]
+        return results, len(rows) > limit
+
+    def recent_ids(self, limit: int) -> List[str]:
+        """最近写入的流水号（按写入时间倒序）"""
+        rows = self.conn.execute(
+            "SELECT log_id FROM recharge_logs ORDER BY rowid DESC LIMIT ?", (limit,)
+        ).fetchall()
+        return [row[0] for row in rows]
+
+
+class SqliteStorage:
+    """SQLite（WAL 模式）存储后端"""
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self.conn = sqlite3.connect(db_path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+
+        self.bindings = BindingsTable(self.conn)
+        self.user_points = UserPointsTable(self.conn)
+        self.sign_records = SignRecordsTable(self.conn)
+        self.recharge_logs = RechargeLogsTable(self.conn)
+        self.daily_stats = DailyStatsTable(self.conn)
+
+        if self.get_meta("log_users_indexed") is None:
+            with self.conn:
+                self.recharge_logs.rebuild_user_index()
+                self.set_meta("log_users_indexed", "1")
+
+    def get_meta(self, key: str) -> Optional[str]:
+        row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def set_meta(self, key: str, value: str):
+        self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))
+
+    def load_admins(self) -> dict:
+        raw = self.get_meta("admins")
+        return json.loads(raw) if raw else {}
+
+    def save_admins(self, admins: dict):
+        self.set_meta("admins", json.dumps(admins, ensure_ascii=False))
+
+    def needs_json_import(self) -> bool:
+        return self.get_meta("json_imported") is None
+
+    def import_json(self, bindings: dict, user_points: dict, sign_records: dict,
+                    recharge_logs: dict, admins: dict, daily_stats: dict):
+        """一次性导入旧版 JSON 数据（单个事务）"""
+        with self.conn:
+            self.bindings.bulk_load(bindings)
+            self.user_points.bulk_load(user_points)
+            self.sign_records.bulk_load(sign_records)
+            self.recharge_logs.bulk_load(recharge_logs)
+            self.daily_stats.bulk_load(daily_stats)
+            if admins:
+                self.save_admins(admins)
+            self.set_meta("json_imported", "1")
+        logger.info(
+            f"🗄️ 已导入JSON数据到SQLite：绑定 {len(bindings)}，用户 {len(user_points)}，"
+            f"签到 {len(sign_records)}，流水 {len(recharge_logs)}"
+        )
+
+    def commit(self):
+        self.conn.commit()
+
+    def rollback(self):
+        self.conn.rollback()
+
+    def close(self):
+        self.conn.commit()
+        self.conn.close()